@@ -0,0 +1,135 @@
+"""Loading and saving arrays without going through Python lists.
+
+Binary files are raw little-endian int32, int64 or float64 values, or NumPy
+.npy files. Both are opened with numpy.memmap, so a writable map can be
+handed to a sorting engine and sorted in the file itself with no copy:
+
+    values = load_array("data.bin", "int64", writable=True)
+    HeadlessSortingAlgorithms().radix_sort(values)
+    values.flush()
+
+Text files (.csv, .txt) hold numbers separated by commas, semicolons or
+whitespace and are parsed in fixed-size chunks instead of one big split.
+"""
+import io
+import os
+from typing import Iterator, List, Optional, TextIO
+
+import numpy as np
+
+from headless_sorting import HeadlessSortingAlgorithms, SortCounter, check_sort_algorithm
+
+# Element types of raw binary files, stored little-endian
+BINARY_DTYPES = {"int32": np.dtype("<i4"), "int64": np.dtype("<i8"), "float64": np.dtype("<f8")}
+# File extensions read as text; everything else except .npy is raw binary
+TEXT_EXTENSIONS = (".csv", ".txt")
+# Characters read from a text stream at a time
+TEXT_CHUNK_CHARS = 1 << 16
+
+# Separators are mapped to spaces so str.split() can cut the tokens in C
+_SEPARATORS = str.maketrans(",;", "  ")
+
+
+def _binary_dtype(dtype: str) -> np.dtype:
+    try:
+        return BINARY_DTYPES[dtype]
+    except KeyError:
+        raise ValueError(f"Unknown dtype: {dtype} (choose from {', '.join(BINARY_DTYPES)})") from None
+
+
+def iter_text_numbers(stream: TextIO, number=int) -> Iterator:
+    """Yield the numbers in a text stream, reading TEXT_CHUNK_CHARS at a time.
+
+    Numbers may be separated by commas, semicolons, spaces or newlines;
+    ``number`` converts each token (int or float) and raises ValueError on
+    anything that is not a number.
+    """
+    tail = ""
+    while True:
+        chunk = stream.read(TEXT_CHUNK_CHARS)
+        if not chunk:
+            break
+        text = (tail + chunk).translate(_SEPARATORS)
+        tokens = text.split()
+        # Unless the chunk ends on a separator, its last token may continue in the next one
+        tail = tokens.pop() if tokens and not text[-1].isspace() else ""
+        yield from map(number, tokens)
+    if tail:
+        yield number(tail)
+
+
+def parse_numbers(text: str, number=int) -> List:
+    """Parse comma/whitespace separated numbers, e.g. the GUI's custom array"""
+    return list(iter_text_numbers(io.StringIO(text), number))
+
+
+def load_array(path: str, dtype: str = "int64", writable: bool = False) -> np.ndarray:
+    """Open an array file without reading it into a list.
+
+    .npy files and raw binary files of ``dtype`` are memory-mapped (read-only
+    unless ``writable``; changes to a writable map go to the file). .csv and
+    .txt files are parsed in chunks into a new array of ``dtype``.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        return np.load(path, mmap_mode="r+" if writable else "r")
+    element_type = _binary_dtype(dtype)
+    if extension in TEXT_EXTENSIONS:
+        number = float if element_type.kind == "f" else int
+        with open(path) as f:
+            return np.fromiter(iter_text_numbers(f, number), dtype=element_type)
+    size = os.path.getsize(path)
+    if size % element_type.itemsize:
+        raise ValueError(f"{path} is not a whole number of {dtype} values")
+    if size == 0:
+        # mmap cannot map an empty file
+        return np.empty(0, dtype=element_type)
+    return np.memmap(path, dtype=element_type, mode="r+" if writable else "r")
+
+
+def save_array(path: str, values, dtype: Optional[str] = None) -> None:
+    """Write ``values`` (a list or array) to a .npy, .csv/.txt or raw binary file.
+
+    ``dtype`` defaults to the values' own type for .npy, and to float64 or
+    int64 (by the values' kind) for raw files. Arrays saved as .npy are
+    copied into a memory map of the file rather than buffered.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    values = np.asarray(values) if dtype is None else np.asarray(values, dtype=_binary_dtype(dtype))
+    if extension == ".npy":
+        target = np.lib.format.open_memmap(path, mode="w+", dtype=values.dtype, shape=values.shape)
+        target[...] = values
+        target.flush()
+        del target
+    elif extension in TEXT_EXTENSIONS:
+        np.savetxt(path, values.reshape(-1, 1), fmt="%.17g" if values.dtype.kind == "f" else "%d")
+    else:
+        if dtype is None:
+            dtype = "float64" if values.dtype.kind == "f" else "int64"
+        values.astype(BINARY_DTYPES[dtype], copy=False).tofile(path)
+
+
+def sort_file(path: str, dtype: str = "int64", algorithm: Optional[str] = None) -> SortCounter:
+    """Sort an .npy or raw binary file in place through a writable memory map.
+
+    ``algorithm`` is a headless method name. The default, radix_sort for
+    integers, runs vectorized over the map itself. Any other algorithm
+    sorts a list copy of the values, which is written back into the map
+    only once the sort has succeeded, so a failing sort (e.g. counting_sort
+    on floats) leaves the file unchanged. intro_sort is the float default.
+    """
+    if algorithm is not None:
+        # Checked before the file is mapped writable
+        check_sort_algorithm(algorithm)
+    values = load_array(path, dtype, writable=True)
+    if algorithm is None:
+        algorithm = "radix_sort" if values.dtype.kind in "iu" else "intro_sort"
+    if algorithm == "radix_sort" and values.dtype.kind in "iu":
+        counter = HeadlessSortingAlgorithms().radix_sort(values)
+    else:
+        items = values.tolist()
+        counter = getattr(HeadlessSortingAlgorithms(), algorithm)(items)
+        values[:] = items
+    if isinstance(values, np.memmap):
+        values.flush()
+    return counter
@@ -0,0 +1,121 @@
+"""Sort many independent small arrays at once with NumPy.
+
+Rows up to ``max_network_width`` long are sorted by running a comparator
+network over all rows together. The rows are transposed so each position
+is one contiguous column, and every comparator is a vectorized min/max of
+two columns: the interpreter cost is paid per comparator, not per row.
+Wider rows, and float rows holding NaN (min/max would copy a NaN into
+both outputs), fall back to NumPy's own sort, which puts NaN last. Every
+function returns the number of comparisons made for each row, or
+UNKNOWN_COMPARISONS where the fallback sort does not expose it.
+"""
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from sorting_networks import get_network, network_size
+
+# Rows up to this width are sorted with a comparator network
+BATCH_NETWORK_MAX_WIDTH = 16
+# Per-row comparison count reported for rows sorted by the np.sort fallback
+UNKNOWN_COMPARISONS = -1
+
+
+def _nan_mask(values: np.ndarray) -> np.ndarray:
+    """True where a value is NaN; all False for integer arrays"""
+    if values.dtype.kind in "fc":
+        return np.isnan(values)
+    return np.zeros(values.shape, dtype=bool)
+
+
+def _apply_network(columns: np.ndarray, name: str) -> int:
+    """Sort every column of a (width, count) array with the named network; returns its size"""
+    network = get_network(name, columns.shape[0])
+    if not network:
+        return 0
+    low = np.empty_like(columns[0])
+    for layer in network:
+        for i, j in layer:
+            # Branch-free: min goes to row i, max to row j
+            np.minimum(columns[i], columns[j], out=low)
+            np.maximum(columns[i], columns[j], out=columns[j])
+            columns[i] = low
+    return network_size(network)
+
+
+def sort_rows(rows: np.ndarray, network: str = "best",
+              max_network_width: int = BATCH_NETWORK_MAX_WIDTH) -> np.ndarray:
+    """Sort every row of a 2D array in place.
+
+    ``network`` is any name in sorting_networks.NETWORKS. Returns an int64
+    array with the comparisons made for each row.
+    """
+    if rows.ndim != 2:
+        raise ValueError("rows must be a 2D array")
+    count, width = rows.shape
+    if width > max_network_width:
+        rows.sort(axis=1)
+        return np.full(count, UNKNOWN_COMPARISONS, dtype=np.int64)
+    with_nan = _nan_mask(rows).any(axis=1)
+    if not with_nan.any():
+        columns = np.ascontiguousarray(rows.T)
+        comparisons = _apply_network(columns, network)
+        rows[...] = columns.T
+        return np.full(count, comparisons, dtype=np.int64)
+
+    comparisons = np.full(count, UNKNOWN_COMPARISONS, dtype=np.int64)
+    rows[with_nan] = np.sort(rows[with_nan], axis=1)
+    plain = ~with_nan
+    columns = np.ascontiguousarray(rows[plain].T)
+    comparisons[plain] = _apply_network(columns, network)
+    rows[plain] = columns.T
+    return comparisons
+
+
+def sort_ragged(values: np.ndarray, offsets: np.ndarray, network: str = "best",
+                max_network_width: int = BATCH_NETWORK_MAX_WIDTH) -> np.ndarray:
+    """Sort ragged rows stored back to back in ``values``, in place.
+
+    Row r is ``values[offsets[r]:offsets[r + 1]]``, so ``offsets`` has one
+    more entry than there are rows. Rows of equal length are gathered into
+    one column block per length and sorted by the network together; rows
+    longer than ``max_network_width`` or holding NaN are sorted with a
+    single lexsort keyed on the row number. Returns the comparisons made
+    for each row.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if values.ndim != 1 or offsets.ndim != 1 or len(offsets) == 0:
+        raise ValueError("values and offsets must be 1D and offsets must not be empty")
+    lengths = np.diff(offsets)
+    if (lengths < 0).any() or offsets[0] != 0 or offsets[-1] != len(values):
+        raise ValueError("offsets must rise from 0 to len(values)")
+
+    row_of = np.repeat(np.arange(len(lengths)), lengths)
+    with_nan = np.bincount(row_of[_nan_mask(values)], minlength=len(lengths)) > 0
+    networked = (lengths > 1) & (lengths <= max_network_width) & ~with_nan
+
+    comparisons = np.zeros(len(lengths), dtype=np.int64)
+    for width in np.unique(lengths[networked]):
+        selected = np.flatnonzero(networked & (lengths == width))
+        # index[k, r] is the position of element k of the r-th selected row
+        index = np.arange(width)[:, None] + offsets[selected]
+        columns = values[index]
+        comparisons[selected] = _apply_network(columns, network)
+        values[index] = columns
+
+    wide = (lengths > max_network_width) | with_nan
+    if wide.any():
+        # Rows are contiguous and in order, so sorting by (row, value) sorts each row in place
+        positions = np.flatnonzero(wide[row_of])
+        order = np.lexsort((values[positions], row_of[positions]))
+        values[positions] = values[positions][order]
+        comparisons[wide] = UNKNOWN_COMPARISONS
+    return comparisons
+
+
+def to_ragged(arrays: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack a list of 1D arrays into (values, offsets) for sort_ragged"""
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum([len(array) for array in arrays], out=offsets[1:])
+    values = np.concatenate(arrays) if len(arrays) else np.empty(0)
+    return values, offsets
@@ -0,0 +1,274 @@
+"""Headless benchmark suite for every sorting algorithm.
+
+Runs each algorithm in HeadlessSortingAlgorithms over a grid of sizes and
+input distributions and writes the timing statistics as JSON or CSV.
+Needs no display, so it can track performance regressions on a server:
+
+    python bench.py --sizes 1e3,1e4,1e5 --dist random,sorted,reversed,few-unique,zipf --output results.json
+
+From the repository root it also runs as ``python -m sorting_Simulator.bench``.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Sequence
+
+if __package__:
+    # Run as python -m sorting_Simulator.bench: the modules beside this one import each other by flat name
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark import (ENGINES, HEADLESS_SPEEDUP_FLOORS, benchmark_sort, check_stability, format_result,
+                       get_sort_method, measure_headless_speedup, method_label)
+from distributions import DISTRIBUTIONS, generate_array
+from parallel_sorting import ParallelSortingAlgorithms
+from sorting_algorithms import PARTIAL_SORTS, RADIX_BITS_CHOICES, STABLE_ALGORITHMS
+
+ALGORITHMS = sorted(name for engine in ENGINES for name in dir(engine) if name.endswith("_sort"))
+
+# Algorithms that take a ``workers`` option
+PARALLEL_ALGORITHMS = sorted(name for name in dir(ParallelSortingAlgorithms) if name.endswith("_sort"))
+
+# O(n^2) algorithms, skipped above --max-quadratic-size
+QUADRATIC_ALGORITHMS = {"bubble_sort", "selection_sort", "insertion_sort"}
+
+# Inputs on which an otherwise O(n log n) algorithm degrades to O(n^2)
+QUADRATIC_INPUTS = {"quick_sort": {"sorted", "reversed", "nearly-sorted", "organ-pipe", "few-unique", "zipf"}}
+
+# Inputs an algorithm cannot handle (none at the moment)
+UNSUPPORTED_INPUTS: Dict[str, set] = {}
+
+
+def parse_sizes(text: str) -> List[int]:
+    """Parse a comma-separated size list; scientific notation such as 1e4 is accepted"""
+    sizes = []
+    for part in text.split(","):
+        value = float(part.strip())
+        if value < 1 or value != int(value):
+            raise argparse.ArgumentTypeError(f"invalid size: {part.strip()}")
+        sizes.append(int(value))
+    return sizes
+
+
+def parse_names(text: str, choices: List[str], kind: str) -> List[str]:
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in choices]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown {kind}: {', '.join(unknown)} (choose from {', '.join(choices)})")
+    return names
+
+
+def parse_ints(text: str, choices: Sequence[int], kind: str) -> List[int]:
+    """Parse a comma-separated integer list whose values must satisfy ``choices``"""
+    values = []
+    for part in text.split(","):
+        try:
+            value = int(part.strip())
+        except ValueError:
+            value = None
+        if value not in choices:
+            raise argparse.ArgumentTypeError(f"invalid {kind}: {part.strip()}")
+        values.append(value)
+    return values
+
+
+def build_variants(heap_arities: Sequence[int], radix_bits: Sequence[int],
+                   workers: Optional[Sequence[int]] = None,
+                   oversample: Optional[Sequence[int]] = None,
+                   top_k: Optional[Sequence[int]] = None) -> Dict[str, List[dict]]:
+    """Keyword options to benchmark each parameterized algorithm with; defaults are left out"""
+    variants = {}
+    if list(heap_arities) != [2]:
+        variants["heap_sort"] = [{"arity": arity} for arity in heap_arities]
+    if list(radix_bits) != [8]:
+        variants["radix_sort"] = [{"radix_bits": bits} for bits in radix_bits]
+    if workers:
+        for name in PARALLEL_ALGORITHMS:
+            variants[name] = [{"workers": count} for count in workers]
+    if oversample:
+        # Every worker count is tried with every oversampling factor
+        variants["parallel_sample_sort"] = [{**options, "oversample": factor}
+                                            for options in variants.get("parallel_sample_sort", [{}])
+                                            for factor in oversample]
+    if top_k:
+        for name in PARTIAL_SORTS:
+            variants[name] = [{"k": k} for k in top_k]
+    return variants
+
+
+def is_quadratic(algorithm: str, distribution: str) -> bool:
+    return algorithm in QUADRATIC_ALGORITHMS or distribution in QUADRATIC_INPUTS.get(algorithm, ())
+
+
+def run_suite(algorithms: List[str], sizes: List[int], distributions: List[str], repeats: int = 5,
+              warmup: int = 1, disable_gc: bool = True, max_quadratic_size: int = 10000,
+              seed: int = 0, verify: bool = False, variants: Optional[Dict[str, List[dict]]] = None,
+              verify_stability: bool = False, log=sys.stderr) -> List[dict]:
+    """Benchmark every (distribution, size, algorithm) combination and return result rows.
+
+    ``variants`` maps a method name to the keyword options to run it with,
+    one result row per option set (e.g. several heap_sort arities). With
+    ``verify_stability`` each case is also sorted once with index-tagged
+    elements (benchmark.check_stability): rows get ``stable`` (None when
+    the algorithm rebuilds values) and ``stability_check``, the seconds
+    the check took, and an algorithm in STABLE_ALGORITHMS that reorders
+    equal elements raises AssertionError.
+    """
+    variants = variants or {}
+    rows = []
+    for distribution in distributions:
+        for size in sizes:
+            data = generate_array(distribution, size, seed).tolist()
+            expected = sorted(data) if verify else None
+            for algorithm in algorithms:
+                if distribution in UNSUPPORTED_INPUTS.get(algorithm, ()):
+                    print(f"skip {algorithm:<16} n={size:<8} {distribution} (unsupported input)", file=log)
+                    continue
+                if size > max_quadratic_size and is_quadratic(algorithm, distribution):
+                    print(f"skip {algorithm:<16} n={size:<8} {distribution} (quadratic)", file=log)
+                    continue
+                if algorithm in PARTIAL_SORTS and algorithm not in variants:
+                    print(f"skip {algorithm:<16} n={size:<8} {distribution} (needs --top-k)", file=log)
+                    continue
+
+                for options in variants.get(algorithm, [{}]):
+                    # Partial sorts only order the first k elements
+                    prefix = options.get("k", size)
+                    if prefix > size:
+                        print(f"skip {method_label(algorithm, options):<16} n={size:<8} {distribution} (k > n)",
+                              file=log)
+                        continue
+                    if verify:
+                        arr = data.copy()
+                        get_sort_method(algorithm)(arr, **options)
+                        if arr[:prefix] != expected[:prefix]:
+                            raise AssertionError(f"{method_label(algorithm, options)} produced unsorted output "
+                                                 f"on {distribution} n={size}")
+
+                    result = benchmark_sort(algorithm, data, repeats, warmup, disable_gc, **options)
+                    row = result.as_dict()
+                    row["distribution"] = distribution
+                    line = f"{format_result(result)}  [{distribution}]"
+                    if verify_stability:
+                        stable, seconds = check_stability(algorithm, data, **options)
+                        if stable is False and algorithm in STABLE_ALGORITHMS:
+                            raise AssertionError(f"{method_label(algorithm, options)} reordered equal elements "
+                                                 f"on {distribution} n={size}")
+                        row["stable"] = stable
+                        row["stability_check"] = seconds
+                        verdict = "n/a" if stable is None else ("yes" if stable else "no")
+                        line += f"  stable {verdict} (check {seconds * 1000:.3f} ms)"
+                    rows.append(row)
+                    print(line, file=log)
+    return rows
+
+
+def run_speedups(algorithms: List[str], sizes: List[int], distributions: List[str], repeats: int = 5,
+                 max_quadratic_size: int = 10000, seed: int = 0, log=sys.stderr) -> List[dict]:
+    """Measure the headless engine's speedup over the instrumented one for every case.
+
+    Algorithms the instrumented engine lacks (the parallel ones, partial
+    sorts) are skipped. Rows get ``speedup`` and the algorithm's
+    HEADLESS_SPEEDUP_FLOORS entry as ``floor``.
+    """
+    rows = []
+    for distribution in distributions:
+        for size in sizes:
+            data = generate_array(distribution, size, seed).tolist()
+            for algorithm in algorithms:
+                if algorithm not in HEADLESS_SPEEDUP_FLOORS:
+                    continue
+                if size > max_quadratic_size and is_quadratic(algorithm, distribution):
+                    print(f"skip {algorithm:<16} n={size:<8} {distribution} (quadratic)", file=log)
+                    continue
+                speedup = measure_headless_speedup(algorithm, data, repeats)
+                floor = HEADLESS_SPEEDUP_FLOORS[algorithm]
+                rows.append({"algorithm": algorithm, "distribution": distribution, "size": size,
+                             "speedup": speedup, "floor": floor})
+                print(f"{algorithm:<18} n={size:<8} speedup {speedup:6.1f}x  floor {floor:.1f}x"
+                      f"{'' if speedup >= floor else '  BELOW FLOOR'}  [{distribution}]", file=log)
+    return rows
+
+
+def write_results(rows: List[dict], path: str, fmt: Optional[str] = None) -> None:
+    """Write result rows as JSON or CSV (chosen by ``fmt`` or the file extension)"""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "json")
+    if fmt == "csv":
+        # Algorithm-specific columns (e.g. memory_bytes) are left empty in other rows
+        fields = ["algorithm", "distribution"]
+        for row in rows:
+            fields.extend(key for key in row if key not in fields)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark all sorting algorithms without a display")
+    parser.add_argument("--sizes", type=parse_sizes, default=[1000, 10000],
+                        help="comma-separated sizes, e.g. 1e3,1e4,1e5")
+    parser.add_argument("--dist", default="random",
+                        help=f"comma-separated input distributions ({', '.join(DISTRIBUTIONS)})")
+    parser.add_argument("--algorithms", default=",".join(ALGORITHMS),
+                        help="comma-separated method names (default: all)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before timing")
+    parser.add_argument("--keep-gc", action="store_true", help="leave the garbage collector running while timing")
+    parser.add_argument("--max-quadratic-size", type=int, default=10000,
+                        help="skip O(n^2) cases above this size")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated inputs")
+    parser.add_argument("--verify", action="store_true", help="check every output is sorted before timing")
+    parser.add_argument("--verify-stability", action="store_true",
+                        help="also sort index-tagged copies, report whether equal elements kept their order "
+                             "and how long the check took")
+    parser.add_argument("--heap-arity", type=lambda text: parse_ints(text, range(2, 65), "heap arity"),
+                        default=[2], help="comma-separated heap arities to benchmark heap_sort with, e.g. 2,4,8")
+    parser.add_argument("--radix-bits", type=lambda text: parse_ints(text, RADIX_BITS_CHOICES, "radix bits"),
+                        default=[8], help="comma-separated digit widths to benchmark radix_sort with (8, 11, 16)")
+    parser.add_argument("--workers", type=lambda text: parse_ints(text, range(1, 1025), "worker count"),
+                        help="comma-separated worker counts for the parallel algorithms, e.g. 1,2,4,8 "
+                             "(default: one per CPU)")
+    parser.add_argument("--oversample", type=lambda text: parse_ints(text, range(1, 1025), "oversampling factor"),
+                        help="comma-separated sample elements per bucket to benchmark parallel_sample_sort with, "
+                             "e.g. 1,4,32")
+    parser.add_argument("--top-k", type=lambda text: parse_ints(text, range(1 << 40), "k"),
+                        help="comma-separated k values to benchmark partial_sort with, e.g. 10,100,1000 "
+                             "(partial_sort is skipped without it)")
+    parser.add_argument("--speedup", action="store_true",
+                        help="instead of timing the suite, report how many times faster the headless engine is "
+                             "than the instrumented one with a no-op callback; exits with status 1 if an "
+                             "algorithm falls below its benchmark.HEADLESS_SPEEDUP_FLOORS entry")
+    parser.add_argument("--output", help="write results to this .json or .csv file")
+    parser.add_argument("--format", choices=["json", "csv"], help="output format (default: from the file extension)")
+    args = parser.parse_args(argv)
+
+    try:
+        distributions = parse_names(args.dist, list(DISTRIBUTIONS), "distribution")
+        algorithms = parse_names(args.algorithms, ALGORITHMS, "algorithm")
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    if args.speedup:
+        rows = run_speedups(algorithms, args.sizes, distributions, args.repeats, args.max_quadratic_size, args.seed)
+    else:
+        rows = run_suite(algorithms, args.sizes, distributions, args.repeats, args.warmup,
+                         not args.keep_gc, args.max_quadratic_size, args.seed, args.verify,
+                         build_variants(args.heap_arity, args.radix_bits, args.workers, args.oversample, args.top_k),
+                         args.verify_stability)
+
+    if args.output:
+        write_results(rows, args.output, args.format)
+    else:
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    if args.speedup and any(row["speedup"] < row["floor"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import argparse
+import functools
+import gc
+import math
+import random
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+from headless_sorting import HeadlessSortingAlgorithms, SortCounter
+from parallel_sorting import ParallelSortingAlgorithms
+from sorting_algorithms import SortingAlgorithms
+
+# Engine classes searched, in order, for a method name
+ENGINES = (HeadlessSortingAlgorithms, ParallelSortingAlgorithms)
+
+# Speedup HeadlessSortingAlgorithms reaches over SortingAlgorithms with a
+# no-op update callback (measure_headless_speedup), about half the ratio
+# measured on 2000 random ints (500 for the O(n^2) sorts) to leave room for
+# timing noise. Only
+# the algorithms whose counts are derived arithmetically come near 10x; for
+# the rest the Python loop itself dominates, and network_sort spends most of
+# its time building the network in both engines
+HEADLESS_SPEEDUP_FLOORS = {
+    "bottom_up_merge_sort": 2.5, "bubble_sort": 4.0, "bucket_sort": 3.5, "counting_sort": 4.0, "heap_sort": 7.0,
+    "insertion_sort": 6.0, "intro_sort": 4.0, "merge_sort": 4.5, "network_sort": 0.9, "quick_sort": 3.5,
+    "radix_sort": 6.0, "selection_sort": 6.0, "tim_sort": 4.0,
+}
+
+# Two-sided 95% critical values of Student's t distribution by degrees of freedom
+_T_CRITICAL_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+
+def _t_critical(degrees_of_freedom: int) -> float:
+    if degrees_of_freedom <= 0:
+        return math.inf
+    if degrees_of_freedom <= len(_T_CRITICAL_95):
+        return _T_CRITICAL_95[degrees_of_freedom - 1]
+    return 1.960
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Linearly interpolated percentile (q in 0..100) of already sorted values"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+class BenchmarkResult:
+    """Timing statistics of repeated runs of one algorithm on one input.
+
+    All times are in seconds. ``ci_low``/``ci_high`` bound the 95%
+    confidence interval of the mean run time.
+    """
+
+    def __init__(self, algorithm: str, size: int, times_ns: List[int], counter: SortCounter,
+                 warmup: int, gc_disabled: bool):
+        self.algorithm = algorithm
+        self.size = size
+        self.times = [t / 1e9 for t in times_ns]
+        self.counter = counter
+        self.warmup = warmup
+        self.gc_disabled = gc_disabled
+
+        ordered = sorted(self.times)
+        self.repeats = len(ordered)
+        self.min = ordered[0]
+        self.max = ordered[-1]
+        self.mean = statistics.fmean(ordered)
+        self.median = statistics.median(ordered)
+        self.p95 = _percentile(ordered, 95)
+        self.stddev = statistics.stdev(ordered) if self.repeats > 1 else 0.0
+        margin = _t_critical(self.repeats - 1) * self.stddev / math.sqrt(self.repeats)
+        if self.repeats == 1:
+            margin = 0.0
+        self.ci_low = self.mean - margin
+        self.ci_high = self.mean + margin
+
+    def as_dict(self) -> dict:
+        return {
+            "algorithm": self.algorithm,
+            "size": self.size,
+            "repeats": self.repeats,
+            "warmup": self.warmup,
+            "gc_disabled": self.gc_disabled,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "median": self.median,
+            "p95": self.p95,
+            "stddev": self.stddev,
+            "ci_low": self.ci_low,
+            "ci_high": self.ci_high,
+            **self.counter.as_dict(),
+        }
+
+    def __repr__(self):
+        return (f"BenchmarkResult({self.algorithm}, n={self.size}, median={self.median:.6f}s, "
+                f"p95={self.p95:.6f}s, stddev={self.stddev:.6f}s)")
+
+
+def get_sort_method(method_name: str):
+    """Bound method ``method_name`` of the first engine in ENGINES that has it"""
+    for engine in ENGINES:
+        if hasattr(engine, method_name):
+            return getattr(engine(), method_name)
+    raise ValueError(f"Unknown sorting algorithm: {method_name}")
+
+
+class _TaggedInt(int):
+    """An int that remembers its position in the unsorted input; compares by value only"""
+
+
+class _TaggedFloat(float):
+    """A float that remembers its position in the unsorted input; compares by value only"""
+
+
+def _tag(value, index: int):
+    tagged = _TaggedFloat(value) if isinstance(value, float) else _TaggedInt(value)
+    tagged.index = index
+    return tagged
+
+
+def check_stability(method_name: str, data: List, **options) -> Tuple[Optional[bool], float]:
+    """Sort ``data`` with every element tagged by its original index and check equal values kept their order.
+
+    Returns (stable, seconds): ``stable`` is None when the output holds
+    untagged values, i.e. the algorithm rebuilt values (counting_sort's
+    histogram, the NumPy paths) instead of moving elements, so there is
+    nothing to check; ``seconds`` is the cost of tagging, sorting and
+    checking. Raises AssertionError if the output is not sorted. With a
+    ``k`` option (partial_sort) only the first k elements are checked.
+    """
+    start = time.perf_counter_ns()
+    arr = [_tag(value, index) for index, value in enumerate(data)]
+    get_sort_method(method_name)(arr, **options)
+    del arr[options.get("k", len(arr)):]
+    if any(arr[i + 1] < arr[i] for i in range(len(arr) - 1)):
+        raise AssertionError(f"{method_label(method_name, options)} produced unsorted output")
+    stable = None
+    if all(type(value) in (_TaggedInt, _TaggedFloat) for value in arr):
+        stable = all(arr[i].index < arr[i + 1].index for i in range(len(arr) - 1) if arr[i] == arr[i + 1])
+    return stable, (time.perf_counter_ns() - start) / 1e9
+
+
+def method_label(method_name: str, options: dict) -> str:
+    """Name of a method run with keyword options, e.g. heap_sort(arity=4)"""
+    if not options:
+        return method_name
+    return f"{method_name}({', '.join(f'{key}={value}' for key, value in options.items())})"
+
+
+def benchmark_sort(method_name: str, data: List[int], repeats: int = 5, warmup: int = 1,
+                   disable_gc: bool = True, **options) -> BenchmarkResult:
+    """Time a headless sorting method on copies of ``data``.
+
+    Runs ``warmup`` untimed sorts first, then ``repeats`` timed ones with
+    perf_counter_ns. Copying the input happens outside the timed region,
+    and the garbage collector is paused during it when ``disable_gc`` is set.
+    Extra keyword ``options`` are passed to the method (e.g. ``arity`` for
+    heap_sort). Module-level so it can be submitted to a process pool.
+    """
+    if repeats < 1:
+        raise ValueError("repeats must be at least 1")
+
+    sort_method = functools.partial(get_sort_method(method_name), **options)
+    for _ in range(warmup):
+        sort_method(data.copy())
+
+    times_ns = []
+    counter = None
+    gc_was_enabled = gc.isenabled()
+    try:
+        for _ in range(repeats):
+            arr = data.copy()
+            if disable_gc:
+                gc.collect()
+                gc.disable()
+            start = time.perf_counter_ns()
+            counter = sort_method(arr)
+            end = time.perf_counter_ns()
+            if disable_gc and gc_was_enabled:
+                gc.enable()
+            times_ns.append(end - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return BenchmarkResult(method_label(method_name, options), len(data), times_ns, counter, warmup, disable_gc)
+
+
+def _best_time(sort_method, data: List, repeats: int) -> float:
+    # Fastest of ``repeats`` sorts of copies of ``data``, with the garbage collector paused
+    best = math.inf
+    gc_was_enabled = gc.isenabled()
+    try:
+        for _ in range(repeats):
+            arr = data.copy()
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter_ns()
+            sort_method(arr)
+            best = min(best, time.perf_counter_ns() - start)
+            if gc_was_enabled:
+                gc.enable()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best / 1e9
+
+
+def measure_headless_speedup(method_name: str, data: List, repeats: int = 3) -> float:
+    """How many times faster HeadlessSortingAlgorithms sorts ``data`` than
+    SortingAlgorithms with a no-op update callback (best of ``repeats`` each)"""
+    headless = getattr(HeadlessSortingAlgorithms(), method_name)
+    instrumented = getattr(SortingAlgorithms(lambda arr, stats, highlight: None), method_name)
+    headless_seconds = _best_time(headless, data, repeats)
+    instrumented_seconds = _best_time(lambda arr: instrumented(arr, {"comparisons": 0, "swaps": 0}), data, repeats)
+    return instrumented_seconds / max(headless_seconds, 1e-9)
+
+
+def compare_results(first: BenchmarkResult, second: BenchmarkResult) -> Optional[BenchmarkResult]:
+    """Return the faster result, or None when the confidence intervals overlap"""
+    if first.ci_high < second.ci_low:
+        return first
+    if second.ci_high < first.ci_low:
+        return second
+    return None
+
+
+def format_result(result: BenchmarkResult) -> str:
+    return (f"{result.algorithm:<18} n={result.size:<8} median {result.median * 1000:10.3f} ms  "
+            f"p95 {result.p95 * 1000:10.3f} ms  stddev {result.stddev * 1000:8.3f} ms  "
+            f"95% CI [{result.ci_low * 1000:.3f}, {result.ci_high * 1000:.3f}] ms  "
+            f"comparisons {result.counter.comparisons:,}  swaps {result.counter.swaps:,}"
+            + "".join(f"  {key} {value:,}" for key, value in result.counter.extra.items()))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark headless sorting algorithms")
+    parser.add_argument("algorithms", nargs="+", help="method names, e.g. quick_sort merge_sort")
+    parser.add_argument("--size", type=int, default=1000, help="number of elements")
+    parser.add_argument("--repeats", type=int, default=10, help="timed runs per algorithm")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed runs before timing")
+    parser.add_argument("--keep-gc", action="store_true", help="leave the garbage collector running while timing")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random input")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    data = [rng.randint(1, 1000) for _ in range(args.size)]
+    results = []
+    for algorithm in args.algorithms:
+        result = benchmark_sort(algorithm, data, args.repeats, args.warmup, not args.keep_gc)
+        results.append(result)
+        print(format_result(result))
+
+    if len(results) == 2:
+        faster = compare_results(*results)
+        if faster is None:
+            print("No significant difference (95% confidence intervals overlap)")
+        else:
+            print(f"Faster: {faster.algorithm}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import math
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+def uniform(size: int, rng: np.random.Generator, low: int = 1, high: int = 1000) -> np.ndarray:
+    """Uniform integers in [low, high]"""
+    return rng.integers(low, high, size=size, endpoint=True, dtype=np.int64)
+
+
+def sorted_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """1..size in ascending order"""
+    return np.arange(1, size + 1, dtype=np.int64)
+
+
+def reversed_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """size..1 in descending order"""
+    return np.arange(size, 0, -1, dtype=np.int64)
+
+
+def nearly_sorted(size: int, rng: np.random.Generator, swaps: Optional[int] = None) -> np.ndarray:
+    """Ascending 1..size with ``swaps`` random pairs exchanged (default 1% of size)"""
+    arr = np.arange(1, size + 1, dtype=np.int64)
+    if swaps is None:
+        swaps = max(1, size // 100)
+    swaps = min(swaps, size // 2)
+    if swaps:
+        # Distinct positions, so every swap moves two elements and the result stays a permutation
+        positions = rng.choice(size, size=2 * swaps, replace=False)
+        left, right = positions[:swaps], positions[swaps:]
+        arr[left], arr[right] = arr[right], arr[left]
+    return arr
+
+
+def organ_pipe(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Ascending to the middle, then descending"""
+    half = (size + 1) // 2
+    return np.concatenate((np.arange(1, half + 1, dtype=np.int64),
+                           np.arange(size - half, 0, -1, dtype=np.int64)))
+
+
+def few_unique(size: int, rng: np.random.Generator, unique: int = 10) -> np.ndarray:
+    """Uniform over only ``unique`` distinct values"""
+    return rng.integers(1, unique, size=size, endpoint=True, dtype=np.int64)
+
+
+def zipf(size: int, rng: np.random.Generator, exponent: float = 1.2, unique: int = 1000) -> np.ndarray:
+    """Zipf-distributed ranks 1..unique: rank k occurs with weight k ** -exponent"""
+    # Inverse-CDF sampling over a bounded support is much faster than rng.zipf's rejection sampling
+    weights = np.arange(1, unique + 1, dtype=np.float64) ** -exponent
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+    ranks = np.searchsorted(cdf, rng.random(size), side="right") + 1
+    return np.minimum(ranks, unique).astype(np.int64)
+
+
+def gaussian(size: int, rng: np.random.Generator, mean: float = 500.0, stddev: float = 100.0) -> np.ndarray:
+    """Normally distributed values rounded to integers"""
+    return np.rint(rng.normal(mean, stddev, size=size)).astype(np.int64)
+
+
+def sawtooth(size: int, rng: np.random.Generator, period: Optional[int] = None) -> np.ndarray:
+    """Repeated ascending runs of length ``period`` (default sqrt(size))"""
+    if period is None:
+        period = max(1, math.isqrt(size))
+    return np.arange(size, dtype=np.int64) % period + 1
+
+
+def wide_range(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Uniform over the full signed 64-bit range"""
+    info = np.iinfo(np.int64)
+    return rng.integers(info.min, info.max, size=size, endpoint=True, dtype=np.int64)
+
+
+DISTRIBUTIONS: Dict[str, Callable[..., np.ndarray]] = {
+    "random": uniform,
+    "sorted": sorted_values,
+    "reversed": reversed_values,
+    "nearly-sorted": nearly_sorted,
+    "organ-pipe": organ_pipe,
+    "few-unique": few_unique,
+    "zipf": zipf,
+    "gaussian": gaussian,
+    "sawtooth": sawtooth,
+    "wide-range": wide_range,
+}
+
+
+def generate_array(name: str, size: int, seed: Optional[int] = None, **params) -> np.ndarray:
+    """Generate ``size`` values from the named distribution as an int64 array.
+
+    The same ``seed`` always produces the same array; extra keyword
+    arguments are passed to the generator (e.g. ``swaps`` for nearly-sorted).
+    """
+    try:
+        generator = DISTRIBUTIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown distribution: {name}") from None
+    if size < 0:
+        raise ValueError("size must not be negative")
+    return generator(size, np.random.default_rng(seed), **params)
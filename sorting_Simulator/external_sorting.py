@@ -0,0 +1,236 @@
+"""External (out-of-core) sort for binary files larger than memory.
+
+The input is a raw little-endian array of int32, int64 or float64 values.
+It is read in chunks that fit the memory budget, each chunk is sorted with
+a headless in-memory algorithm and spilled to a temporary run file, and the
+runs are combined by k-way heap merges of at most ``fan_in`` runs at a time
+with buffered reads and writes, until one run is left:
+
+    python external_sorting.py data.bin sorted.bin --dtype int64 --memory 256M --fan-in 16
+"""
+import argparse
+import os
+import tempfile
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from array_io import BINARY_DTYPES
+from headless_sorting import HeadlessSortingAlgorithms, SortCounter, check_sort_algorithm
+
+# Default memory budget and number of runs merged at once
+EXTERNAL_MEMORY_BUDGET = 64 << 20
+EXTERNAL_FAN_IN = 16
+# Approximate bytes each element takes while sorted in memory: its list slot
+# plus the Python number object, on top of the raw value
+EXTERNAL_ITEM_OVERHEAD = 40
+
+
+class _RunReader:
+    """Iterates the values of a binary run file, reading ``block`` elements at a time"""
+
+    def __init__(self, path: str, dtype: np.dtype, block: int, counter: SortCounter):
+        self.file = open(path, "rb")
+        self.dtype = dtype
+        self.block = block
+        self.counter = counter
+
+    def __iter__(self) -> Iterator:
+        try:
+            while True:
+                values = np.fromfile(self.file, dtype=self.dtype, count=self.block)
+                if not len(values):
+                    return
+                self.counter.extra["bytes_read"] += values.nbytes
+                yield from values.tolist()
+        finally:
+            self.file.close()
+
+
+class _RunWriter:
+    """Buffers values and appends them to a binary file ``block`` elements at a time"""
+
+    def __init__(self, path: str, dtype: np.dtype, block: int, counter: SortCounter):
+        self.file = open(path, "wb")
+        self.dtype = dtype
+        self.block = block
+        self.counter = counter
+        self.buffer: List = []
+
+    def write(self, value) -> None:
+        self.buffer.append(value)
+        if len(self.buffer) >= self.block:
+            self.flush()
+
+    def write_all(self, values: List) -> None:
+        self.flush()
+        self.buffer = values
+        self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            data = np.array(self.buffer, dtype=self.dtype)
+            data.tofile(self.file)
+            self.counter.extra["bytes_written"] += data.nbytes
+            self.buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        self.file.close()
+
+
+def _heap_merge(readers: List[_RunReader], writer: _RunWriter) -> int:
+    """Merge sorted runs through a binary min-heap of their head values; returns comparisons"""
+    comparisons = 0
+    heap = []
+    for reader in readers:
+        values = iter(reader)
+        for value in values:
+            heap.append([value, values])
+            break
+
+    def sift_down(root: int) -> None:
+        nonlocal comparisons
+        size = len(heap)
+        entry = heap[root]
+        while True:
+            child = 2 * root + 1
+            if child >= size:
+                break
+            if child + 1 < size:
+                comparisons += 1
+                if heap[child + 1][0] < heap[child][0]:
+                    child += 1
+            comparisons += 1
+            if not heap[child][0] < entry[0]:
+                break
+            heap[root] = heap[child]
+            root = child
+        heap[root] = entry
+
+    for start in range(len(heap) // 2 - 1, -1, -1):
+        sift_down(start)
+    while heap:
+        top = heap[0]
+        writer.write(top[0])
+        for value in top[1]:
+            top[0] = value
+            break
+        else:
+            last = heap.pop()
+            if not heap:
+                break
+            heap[0] = last
+        sift_down(0)
+    return comparisons
+
+
+def parse_bytes(text: str) -> int:
+    """Parse a byte count such as 65536, 512K, 256M or 2G"""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper().rstrip("B")
+    scale = units.get(text[-1:], 1)
+    value = float(text[:-1] if text[-1:] in units else text)
+    if value <= 0:
+        raise ValueError(f"invalid byte count: {text}")
+    return int(value * scale)
+
+
+def external_sort(input_path: str, output_path: str, dtype: str = "int64",
+                  memory_budget: int = EXTERNAL_MEMORY_BUDGET, temp_dir: Optional[str] = None,
+                  fan_in: int = EXTERNAL_FAN_IN, algorithm: str = "intro_sort") -> SortCounter:
+    """Sort the binary file ``input_path`` into ``output_path``.
+
+    ``memory_budget`` bounds the bytes held in memory at once: a chunk being
+    sorted, or the read buffers of the runs being merged plus the write
+    buffer. Runs are spilled to a private directory under ``temp_dir``
+    (default: the system temp dir) that is removed afterwards. Returns the
+    comparisons and swaps of the chunk sorts and merges, with ``runs``,
+    ``merge_passes``, ``bytes_read`` and ``bytes_written`` in ``extra``.
+    """
+    if dtype not in BINARY_DTYPES:
+        raise ValueError(f"Unknown dtype: {dtype} (choose from {', '.join(BINARY_DTYPES)})")
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+    check_sort_algorithm(algorithm)
+    element_type = BINARY_DTYPES[dtype]
+    if os.path.getsize(input_path) % element_type.itemsize:
+        raise ValueError(f"{input_path} is not a whole number of {dtype} values")
+
+    item_bytes = element_type.itemsize + EXTERNAL_ITEM_OVERHEAD
+    chunk_size = max(1, memory_budget // item_bytes)
+    # While merging, the budget is shared by fan_in read buffers and one write buffer
+    block = max(1, memory_budget // ((fan_in + 1) * item_bytes))
+    counter = SortCounter(runs=0, merge_passes=0, bytes_read=0, bytes_written=0)
+    sort_chunk = getattr(HeadlessSortingAlgorithms(), algorithm)
+
+    with tempfile.TemporaryDirectory(prefix="external_sort_", dir=temp_dir) as work_dir:
+        runs = []
+        with open(input_path, "rb") as source:
+            while True:
+                chunk = np.fromfile(source, dtype=element_type, count=chunk_size)
+                if not len(chunk) and runs:
+                    break
+                counter.extra["bytes_read"] += chunk.nbytes
+                values = chunk.tolist()
+                del chunk
+                sort_chunk(values, counter)
+                # A file that fits in one chunk is written straight to the output
+                single = not runs and source.tell() == os.fstat(source.fileno()).st_size
+                path = output_path if single else os.path.join(work_dir, f"run{len(runs)}.bin")
+                writer = _RunWriter(path, element_type, block, counter)
+                writer.write_all(values)
+                writer.close()
+                runs.append(path)
+                if single:
+                    break
+        counter.extra["runs"] = len(runs)
+
+        next_run = len(runs)
+        while len(runs) > 1:
+            # One pass merges every group of fan_in runs into a new run
+            merged = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                if len(runs) <= fan_in:
+                    path = output_path
+                elif len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                else:
+                    path = os.path.join(work_dir, f"run{next_run}.bin")
+                    next_run += 1
+                writer = _RunWriter(path, element_type, block, counter)
+                readers = [_RunReader(run, element_type, block, counter) for run in group]
+                counter.comparisons += _heap_merge(readers, writer)
+                writer.close()
+                for run in group:
+                    os.remove(run)
+                merged.append(path)
+            runs = merged
+            counter.extra["merge_passes"] += 1
+    return counter
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sort a binary file of numbers that may not fit in memory")
+    parser.add_argument("input", help="raw little-endian input file")
+    parser.add_argument("output", help="file to write the sorted values to")
+    parser.add_argument("--dtype", choices=list(BINARY_DTYPES), default="int64", help="element type")
+    parser.add_argument("--memory", type=parse_bytes, default=EXTERNAL_MEMORY_BUDGET,
+                        help="memory budget, e.g. 512M or 2G (default 64M)")
+    parser.add_argument("--fan-in", type=int, default=EXTERNAL_FAN_IN, help="runs merged at once")
+    parser.add_argument("--temp-dir", help="directory for the temporary run files")
+    parser.add_argument("--algorithm", default="intro_sort", help="in-memory algorithm for the chunks")
+    args = parser.parse_args(argv)
+
+    try:
+        counter = external_sort(args.input, args.output, args.dtype, args.memory, args.temp_dir,
+                                args.fan_in, args.algorithm)
+    except ValueError as e:
+        parser.error(str(e))
+    print(", ".join(f"{key} {value:,}" for key, value in counter.as_dict().items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1143 @@
+import bisect
+import functools
+import inspect
+import itertools
+import math
+import operator
+from array import array
+from collections import Counter
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from sorting_algorithms import (BUCKET_SIZE, FLOYD_RIVEST_CUTOFF, INSERTION_CUTOFF, MIN_GALLOP, NETWORK_CUTOFF,
+                                NINTHER_THRESHOLD, PARTIAL_SORTS, RADIX_BITS_CHOICES, STABLE_ALGORITHMS,
+                                STABLE_FALLBACK, bucket_splitters, counting_strategy, decorate_keys, lsd_radix_sort,
+                                min_run_length, undecorate_order)
+from sorting_networks import NETWORK_MAX_SIZE, get_network, network_size, network_sorter
+
+
+# Lists at least this long are radix sorted through NumPy when their values fit in 64 bits
+RADIX_NUMPY_THRESHOLD = 256
+
+# (compiled sorter, comparisons) of the best known network for each base case size
+_BASE_NETWORKS = [(network_sorter("best", n), network_size(get_network("best", n)))
+                  for n in range(NETWORK_CUTOFF + 1)]
+
+
+def _radix_sort_array(values: np.ndarray, radix_bits: int) -> int:
+    """LSD radix sort an integer ndarray in place; returns the number of scatter passes"""
+    if values.dtype.kind not in "iu":
+        raise TypeError(f"radix_sort needs integer keys, not {values.dtype}")
+    # Subtracting the minimum wraps around in the array's width, so viewing the
+    # result as unsigned gives the exact non-negative offset even for huge ranges
+    minimum = values.min()
+    keys = (values - minimum).view(np.dtype(f"u{values.dtype.itemsize}"))
+    max_key = int(keys.max())
+    digit_type = np.uint8 if radix_bits <= 8 else np.uint16
+    # Digit bits above the key width are always zero; clamp so the mask fits the dtype
+    mask = keys.dtype.type(((1 << radix_bits) - 1) & int(np.iinfo(keys.dtype).max))
+    passes = 0
+    shift = 0
+    while max_key >> shift:
+        digits = ((keys >> shift) & mask).astype(digit_type)
+        if digits.min() != digits.max():
+            # A stable argsort of 8/16-bit digits is NumPy's vectorized
+            # counting sort; gathering by it is the scatter step
+            keys = keys[np.argsort(digits, kind="stable")]
+            passes += 1
+        shift += radix_bits
+    values[...] = keys.view(values.dtype) + minimum
+    return passes
+
+
+class SortCounter:
+    """Compact operation counter returned by the headless algorithms.
+
+    ``extra`` holds algorithm-specific measurements (such as counting_sort's
+    ``memory_bytes``) under the same keys the instrumented version adds to
+    its stats dict.
+    """
+    __slots__ = ("comparisons", "swaps", "extra")
+
+    def __init__(self, comparisons: int = 0, swaps: int = 0, **extra):
+        self.comparisons = comparisons
+        self.swaps = swaps
+        self.extra = extra
+
+    def as_dict(self) -> dict:
+        """Return the counts in the same shape as the visualizer's stats dict"""
+        return {"comparisons": self.comparisons, "swaps": self.swaps, **self.extra}
+
+    def __eq__(self, other):
+        if not isinstance(other, SortCounter):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value}" for key, value in self.as_dict().items())
+        return f"SortCounter({fields})"
+
+
+def stable_fallback(engine, args: tuple, kwargs: dict) -> Tuple[Callable[..., SortCounter], dict]:
+    """The method stable=True runs on ``engine`` and the keyword arguments to pass it.
+
+    An engine can name its own fallback in a ``stable_fallback_name``
+    attribute, with default arguments in ``stable_fallback_defaults``. Other
+    engines run STABLE_FALLBACK, taken from HeadlessSortingAlgorithms if the
+    engine does not have it. Arguments the fallback does not take raise TypeError instead
+    of being dropped, and a *_algorithm argument must name a stable algorithm.
+    """
+    name = getattr(engine, "stable_fallback_name", STABLE_FALLBACK)
+    kwargs = {**getattr(engine, "stable_fallback_defaults", {}), **kwargs}
+    fallback = getattr(engine if hasattr(engine, name) else HeadlessSortingAlgorithms(), name)
+    parameters = inspect.signature(fallback).parameters
+    unsupported = [f"{len(args)} positional argument(s)"] if args else []
+    unsupported += [keyword for keyword in kwargs if keyword not in parameters]
+    if unsupported:
+        raise TypeError(f"stable=True sorts with {name}, which does not take {', '.join(unsupported)}")
+    for keyword, value in kwargs.items():
+        if keyword.endswith("_algorithm") and value not in STABLE_ALGORITHMS:
+            raise ValueError(f"stable=True needs a stable {keyword}, not {value}")
+    return fallback, kwargs
+
+
+def with_key_support(cls):
+    """Class decorator giving every full *_sort method of a SortCounter engine
+    key=, reverse= and stable= arguments.
+
+    Keyed and reversed sorts are decorate-sort-undecorate (keys computed
+    once, ties broken by position, so always stable) and count the key
+    calls in ``extra["key_evaluations"]``. stable=True on a plain sort by
+    an algorithm outside STABLE_ALGORITHMS runs the engine's stable_fallback
+    instead, with the caller's other arguments.
+    """
+    def keyed(method):
+        @functools.wraps(method)
+        def sort(self, arr, counter=None, *args, key=None, reverse=False, stable=False, **kwargs):
+            if key is None and not reverse:
+                if stable and method.__name__ not in STABLE_ALGORITHMS:
+                    fallback, fallback_kwargs = stable_fallback(self, args, kwargs)
+                    return fallback(arr, counter, **fallback_kwargs)
+                return method(self, arr, counter, *args, **kwargs)
+            counter = counter if counter is not None else SortCounter()
+            decorated = decorate_keys(arr, key, reverse)
+            counter.extra["key_evaluations"] = (counter.extra.get("key_evaluations", 0)
+                                                + (len(arr) if key is not None else 0))
+            method(self, decorated, counter, *args, **kwargs)
+            arr[:] = [arr[i] for i in undecorate_order(decorated, reverse)]
+            return counter
+        return sort
+
+    for name in dir(cls):
+        if name.endswith("_sort") and name not in PARTIAL_SORTS:
+            setattr(cls, name, keyed(getattr(cls, name)))
+    return cls
+
+
+def check_sort_algorithm(name: str) -> None:
+    """Raise ValueError unless ``name`` is a full sort of HeadlessSortingAlgorithms (partial sorts need a k)"""
+    if not name.endswith("_sort") or name in PARTIAL_SORTS or not hasattr(HeadlessSortingAlgorithms, name):
+        raise ValueError(f"Unknown sorting algorithm: {name}")
+
+
+@with_key_support
+class HeadlessSortingAlgorithms:
+    """Uninstrumented versions of SortingAlgorithms for library use.
+
+    Every method sorts ``arr`` in place exactly like its counterpart in
+    SortingAlgorithms and reports the same comparison/swap totals, but
+    without callbacks or per-operation dict updates. Counts are kept in
+    local variables (or derived arithmetically where the algorithm allows)
+    and written to the counter once at the end.
+    """
+
+    def argsort(self, arr: List[Any], algorithm: str = "intro_sort", key: Optional[Callable[[Any], Any]] = None,
+                reverse: bool = False, counter: Optional[SortCounter] = None, **options) -> Tuple[List[int], SortCounter]:
+        """Indices that put ``arr`` in (stable) key order, without moving its elements.
+
+        The decorated keys are sorted with ``algorithm``; returns the index
+        permutation and the counter, whose ``key_evaluations`` is len(arr)
+        when a key function is given.
+        """
+        check_sort_algorithm(algorithm)
+        counter = counter if counter is not None else SortCounter()
+        decorated = decorate_keys(arr, key, reverse)
+        counter.extra["key_evaluations"] = (counter.extra.get("key_evaluations", 0)
+                                            + (len(arr) if key is not None else 0))
+        getattr(self, algorithm)(decorated, counter, **options)
+        return undecorate_order(decorated, reverse), counter
+
+    def _insertion_range(self, arr: List[int], low: int, high: int) -> Tuple[int, int]:
+        # Insertion sort of arr[low..high] (inclusive); returns (comparisons, swaps)
+        comparisons = shifts = 0
+        for i in range(low + 1, high + 1):
+            key = arr[i]
+            j = i - 1
+            while j >= low and arr[j] > key:
+                arr[j + 1] = arr[j]
+                j -= 1
+            shifts += i - 1 - j
+            comparisons += i - 1 - j + (1 if j >= low else 0)
+            arr[j + 1] = key
+        return comparisons, shifts
+
+    def _network_range(self, arr: List[int], low: int, high: int) -> Tuple[int, int]:
+        # Best known network sort of arr[low..high] (inclusive); returns (comparisons, swaps)
+        sort, comparisons = _BASE_NETWORKS[high - low + 1]
+        return comparisons, sort(arr, low)
+
+    def bubble_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        comparisons = swaps = 0
+        swapped = True
+
+        while swapped:
+            swapped = False
+            # Every pass compares all n - 1 adjacent pairs
+            comparisons += max(n - 1, 0)
+            for j in range(n - 1):
+                if arr[j] > arr[j + 1]:
+                    arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                    swaps += 1
+                    swapped = True
+            n -= 1
+
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        return counter
+
+    def selection_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        swaps = 0
+
+        for i in range(n):
+            min_idx = i
+            min_val = arr[i]
+            for j in range(i + 1, n):
+                if arr[j] < min_val:
+                    min_idx = j
+                    min_val = arr[j]
+
+            if min_idx != i:
+                arr[i], arr[min_idx] = arr[min_idx], arr[i]
+                swaps += 1
+
+        counter.comparisons += n * (n - 1) // 2
+        counter.swaps += swaps
+        return counter
+
+    def insertion_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        shifts = stops = 0
+
+        for i in range(1, len(arr)):
+            key = arr[i]
+            j = i - 1
+            while j >= 0 and arr[j] > key:
+                arr[j + 1] = arr[j]
+                j -= 1
+            shifts += i - 1 - j
+            if j >= 0:
+                stops += 1
+            arr[j + 1] = key
+
+        # One comparison per shift plus the one that stopped the scan (if any)
+        counter.comparisons += shifts + stops
+        counter.swaps += shifts
+        return counter
+
+    def merge_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        comparisons = swaps = 0
+
+        def sort(values: List[int]) -> List[int]:
+            nonlocal comparisons, swaps
+            if len(values) <= NETWORK_CUTOFF:
+                base_comparisons, base_swaps = self._network_range(values, 0, len(values) - 1)
+                comparisons += base_comparisons
+                swaps += base_swaps
+                return values
+
+            mid = len(values) // 2
+            left = sort(values[:mid])
+            right = sort(values[mid:])
+
+            result = []
+            append = result.append
+            left_len, right_len = len(left), len(right)
+            left_idx = right_idx = 0
+            while left_idx < left_len and right_idx < right_len:
+                # Ties take the left element, so the merge keeps equal elements in order
+                if right[right_idx] < left[left_idx]:
+                    append(right[right_idx])
+                    right_idx += 1
+                else:
+                    append(left[left_idx])
+                    left_idx += 1
+            # Each loop iteration emitted exactly one element after one comparison
+            comparisons += left_idx + right_idx
+            result.extend(left[left_idx:])
+            result.extend(right[right_idx:])
+            return result
+
+        arr[:] = sort(arr)
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        return counter
+
+    def bottom_up_merge_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        comparisons = 0
+
+        def gallop(key, values: List[int], lo: int, hi: int, strict: bool) -> int:
+            # First index in values[lo:hi] that is > key (strict=False: >= key)
+            nonlocal comparisons
+            prev, bound = lo, 1
+            while True:
+                probe = lo + bound - 1
+                if probe >= hi:
+                    high = hi
+                    break
+                comparisons += 1
+                if values[probe] > key or (not strict and values[probe] == key):
+                    high = probe
+                    break
+                prev = probe + 1
+                bound *= 2
+            while prev < high:
+                middle = (prev + high) // 2
+                comparisons += 1
+                if values[middle] > key or (not strict and values[middle] == key):
+                    high = middle
+                else:
+                    prev = middle + 1
+            return prev
+
+        def merge(src: List[int], dst: List[int], lo: int, mid: int, hi: int) -> None:
+            nonlocal comparisons
+            i, j, k = lo, mid, lo
+            left_wins = right_wins = 0
+            while i < mid and j < hi:
+                comparisons += 1
+                if src[i] <= src[j]:
+                    dst[k] = src[i]
+                    i += 1
+                    k += 1
+                    left_wins += 1
+                    right_wins = 0
+                    if left_wins >= MIN_GALLOP and i < mid:
+                        end = gallop(src[j], src, i, mid, strict=True)
+                        dst[k:k + end - i] = src[i:end]
+                        k += end - i
+                        i = end
+                        left_wins = 0
+                else:
+                    dst[k] = src[j]
+                    j += 1
+                    k += 1
+                    right_wins += 1
+                    left_wins = 0
+                    if right_wins >= MIN_GALLOP and j < hi:
+                        end = gallop(src[i], src, j, hi, strict=False)
+                        dst[k:k + end - j] = src[j:end]
+                        k += end - j
+                        j = end
+                        right_wins = 0
+            dst[k:k + mid - i] = src[i:mid]
+            k += mid - i
+            dst[k:hi] = src[j:hi]
+
+        for lo in range(0, n, INSERTION_CUTOFF):
+            base_comparisons, base_swaps = self._insertion_range(arr, lo, min(lo + INSERTION_CUTOFF, n) - 1)
+            comparisons += base_comparisons
+            counter.swaps += base_swaps
+
+        # Ping-pong between arr and a single auxiliary buffer: each pass reads one
+        # and writes the other, so no per-merge copies are needed. list() rather
+        # than arr[:], which is a view of arr for NumPy arrays
+        src, dst = arr, list(arr)
+        width = INSERTION_CUTOFF
+        while width < n:
+            for lo in range(0, n, 2 * width):
+                mid = min(lo + width, n)
+                hi = min(lo + 2 * width, n)
+                if mid < hi:
+                    comparisons += 1
+                    if src[mid - 1] > src[mid]:
+                        merge(src, dst, lo, mid, hi)
+                        continue
+                # Lone run or runs already in order: copy through unchanged
+                dst[lo:hi] = src[lo:hi]
+            src, dst = dst, src
+            width *= 2
+
+        if src is not arr:
+            arr[:] = src
+        counter.comparisons += comparisons
+        return counter
+
+    def tim_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        comparisons = swaps = 0
+
+        def count_run(lo: int) -> int:
+            nonlocal comparisons, swaps
+            if lo + 1 == n:
+                return 1
+            i = lo + 2
+            comparisons += 1
+            if arr[lo + 1] < arr[lo]:
+                while i < n:
+                    comparisons += 1
+                    if not arr[i] < arr[i - 1]:
+                        break
+                    i += 1
+                arr[lo:i] = arr[lo:i][::-1]
+                swaps += (i - lo) // 2
+            else:
+                while i < n:
+                    comparisons += 1
+                    if arr[i] < arr[i - 1]:
+                        break
+                    i += 1
+            return i - lo
+
+        def binary_insertion(lo: int, hi: int, start: int) -> None:
+            nonlocal comparisons, swaps
+            for i in range(start, hi):
+                pivot = arr[i]
+                left, right = lo, i
+                while left < right:
+                    middle = (left + right) // 2
+                    comparisons += 1
+                    if pivot < arr[middle]:
+                        right = middle
+                    else:
+                        left = middle + 1
+                swaps += i - left
+                arr[left + 1:i + 1] = arr[left:i]
+                arr[left] = pivot
+
+        def gallop(values: List[int], key: int, lo: int, hi: int, after_equal: bool, from_right: bool) -> int:
+            nonlocal comparisons
+
+            def past(idx: int) -> bool:
+                return key < values[idx] if after_equal else not values[idx] < key
+
+            low, high, bound = lo, hi, 1
+            if from_right:
+                while hi - bound >= lo:
+                    comparisons += 1
+                    if not past(hi - bound):
+                        low = hi - bound + 1
+                        break
+                    high = hi - bound
+                    bound *= 2
+            else:
+                while lo + bound - 1 < hi:
+                    comparisons += 1
+                    if past(lo + bound - 1):
+                        high = lo + bound - 1
+                        break
+                    low = lo + bound
+                    bound *= 2
+            while low < high:
+                middle = (low + high) // 2
+                comparisons += 1
+                if past(middle):
+                    high = middle
+                else:
+                    low = middle + 1
+            return low
+
+        def merge_at(idx: int) -> None:
+            base_a, len_a = run_base[idx], run_len[idx]
+            base_b, len_b = run_base[idx + 1], run_len[idx + 1]
+            run_len[idx] = len_a + len_b
+            del run_base[idx + 1], run_len[idx + 1]
+
+            start = gallop(arr, arr[base_b], base_a, base_a + len_a, True, False)
+            len_a -= start - base_a
+            base_a = start
+            if len_a == 0:
+                return
+            len_b = gallop(arr, arr[base_a + len_a - 1], base_b, base_b + len_b, False, True) - base_b
+
+            if len_a <= len_b:
+                merge_lo(base_a, len_a, base_b, len_b)
+            else:
+                merge_hi(base_a, len_a, base_b, len_b)
+
+        def merge_lo(base_a: int, len_a: int, base_b: int, len_b: int) -> None:
+            nonlocal comparisons
+            # list() copies the run even when arr is a NumPy array, whose slices are views
+            temp = list(arr[base_a:base_a + len_a])
+            i, j, k = 0, base_b, base_a
+            end_b = base_b + len_b
+            a_wins = b_wins = 0
+            while i < len_a and j < end_b:
+                comparisons += 1
+                if arr[j] < temp[i]:
+                    arr[k] = arr[j]
+                    j += 1
+                    k += 1
+                    b_wins += 1
+                    a_wins = 0
+                    if b_wins >= MIN_GALLOP and j < end_b:
+                        end = gallop(arr, temp[i], j, end_b, False, False)
+                        arr[k:k + end - j] = arr[j:end]
+                        k += end - j
+                        j = end
+                        b_wins = 0
+                else:
+                    arr[k] = temp[i]
+                    i += 1
+                    k += 1
+                    a_wins += 1
+                    b_wins = 0
+                    if a_wins >= MIN_GALLOP and i < len_a:
+                        end = gallop(temp, arr[j], i, len_a, True, False)
+                        arr[k:k + end - i] = temp[i:end]
+                        k += end - i
+                        i = end
+                        a_wins = 0
+            arr[k:k + len_a - i] = temp[i:]
+
+        def merge_hi(base_a: int, len_a: int, base_b: int, len_b: int) -> None:
+            nonlocal comparisons
+            temp = list(arr[base_b:base_b + len_b])
+            i, j, k = base_a + len_a - 1, len_b - 1, base_b + len_b - 1
+            a_wins = b_wins = 0
+            while i >= base_a and j >= 0:
+                comparisons += 1
+                if temp[j] < arr[i]:
+                    arr[k] = arr[i]
+                    i -= 1
+                    k -= 1
+                    a_wins += 1
+                    b_wins = 0
+                    if a_wins >= MIN_GALLOP and i >= base_a:
+                        start = gallop(arr, temp[j], base_a, i + 1, True, True)
+                        count = i + 1 - start
+                        arr[k - count + 1:k + 1] = arr[start:i + 1]
+                        k -= count
+                        i = start - 1
+                        a_wins = 0
+                else:
+                    arr[k] = temp[j]
+                    j -= 1
+                    k -= 1
+                    b_wins += 1
+                    a_wins = 0
+                    if b_wins >= MIN_GALLOP and j >= 0:
+                        start = gallop(temp, arr[i], 0, j + 1, False, True)
+                        count = j + 1 - start
+                        arr[k - count + 1:k + 1] = temp[start:j + 1]
+                        k -= count
+                        j = start - 1
+                        b_wins = 0
+            arr[base_a:base_a + j + 1] = temp[:j + 1]
+
+        def merge_collapse() -> None:
+            while len(run_len) > 1:
+                idx = len(run_len) - 2
+                if ((idx > 0 and run_len[idx - 1] <= run_len[idx] + run_len[idx + 1]) or
+                        (idx > 1 and run_len[idx - 2] <= run_len[idx - 1] + run_len[idx])):
+                    if run_len[idx - 1] < run_len[idx + 1]:
+                        idx -= 1
+                elif run_len[idx] > run_len[idx + 1]:
+                    break
+                merge_at(idx)
+
+        min_run = min_run_length(n)
+        run_base: List[int] = []
+        run_len: List[int] = []
+        lo = 0
+        while lo < n:
+            length = count_run(lo)
+            if length < min_run:
+                forced = min(min_run, n - lo)
+                binary_insertion(lo, lo + forced, lo + length)
+                length = forced
+            run_base.append(lo)
+            run_len.append(length)
+            merge_collapse()
+            lo += length
+
+        while len(run_len) > 1:
+            idx = len(run_len) - 2
+            if idx > 0 and run_len[idx - 1] < run_len[idx + 1]:
+                idx -= 1
+            merge_at(idx)
+
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        return counter
+
+    def quick_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        comparisons = swaps = 0
+
+        # Explicit stack instead of recursion; visiting order does not change the counts
+        stack = [(0, len(arr) - 1)]
+        while stack:
+            low, high = stack.pop()
+            if low >= high:
+                continue
+
+            pivot = arr[high]
+            i = low - 1
+            for j in range(low, high):
+                if arr[j] < pivot:
+                    i += 1
+                    arr[i], arr[j] = arr[j], arr[i]
+                    swaps += 1
+            arr[i + 1], arr[high] = arr[high], arr[i + 1]
+            comparisons += high - low
+            swaps += 1
+
+            pi = i + 1
+            stack.append((pi + 1, high))
+            stack.append((low, pi - 1))
+
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        return counter
+
+    def intro_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        comparisons, swaps = self._intro_range(arr, 0, len(arr) - 1)
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        return counter
+
+    def _intro_range(self, arr: List[int], low: int, high: int) -> Tuple[int, int]:
+        # Intro sort of arr[low..high] (inclusive); returns (comparisons, swaps)
+        comparisons = swaps = 0
+
+        def median_of_three(a: int, b: int, c: int) -> int:
+            nonlocal comparisons
+            va, vb, vc = arr[a], arr[b], arr[c]
+            if va < vb:
+                if vb < vc:
+                    comparisons += 2
+                    return b
+                comparisons += 3
+                return c if va < vc else a
+            if va < vc:
+                comparisons += 2
+                return a
+            comparisons += 3
+            return c if vb < vc else b
+
+        def choose_pivot(low: int, high: int) -> int:
+            mid = low + (high - low) // 2
+            if high - low + 1 < NINTHER_THRESHOLD:
+                return median_of_three(low, mid, high)
+            step = (high - low + 1) // 8
+            return median_of_three(
+                median_of_three(low, low + step, low + 2 * step),
+                median_of_three(mid - step, mid, mid + step),
+                median_of_three(high - 2 * step, high - step, high)
+            )
+
+        def heap_fallback(low: int, high: int) -> None:
+            nonlocal comparisons, swaps
+
+            def sift_down(root: int, end: int) -> None:
+                nonlocal comparisons, swaps
+                while True:
+                    child = 2 * root + 1
+                    if child >= end:
+                        return
+                    if child + 1 < end:
+                        comparisons += 1
+                        if arr[low + child] < arr[low + child + 1]:
+                            child += 1
+                    comparisons += 1
+                    if arr[low + root] >= arr[low + child]:
+                        return
+                    arr[low + root], arr[low + child] = arr[low + child], arr[low + root]
+                    swaps += 1
+                    root = child
+
+            size = high - low + 1
+            for start in range(size // 2 - 1, -1, -1):
+                sift_down(start, size)
+            for end in range(size - 1, 0, -1):
+                arr[low], arr[low + end] = arr[low + end], arr[low]
+                swaps += 1
+                sift_down(0, end)
+
+        size = high - low + 1
+        stack = [(low, high, 2 * int(math.log2(size)) if size > 1 else 0)]
+        while stack:
+            low, high, depth = stack.pop()
+            if high - low + 1 <= NETWORK_CUTOFF:
+                base_comparisons, base_swaps = self._network_range(arr, low, high)
+                comparisons += base_comparisons
+                swaps += base_swaps
+                continue
+            if depth == 0:
+                heap_fallback(low, high)
+                continue
+
+            pivot_idx = choose_pivot(low, high)
+            if pivot_idx != low:
+                arr[low], arr[pivot_idx] = arr[pivot_idx], arr[low]
+                swaps += 1
+            pivot = arr[low]
+
+            # Dutch flag partition: [low, lt) < pivot, [lt, i) == pivot, (gt, high] > pivot
+            lt, i, gt = low, low + 1, high
+            while i <= gt:
+                value = arr[i]
+                if value < pivot:
+                    arr[lt], arr[i] = value, arr[lt]
+                    swaps += 1
+                    comparisons += 1
+                    lt += 1
+                    i += 1
+                elif value > pivot:
+                    if i != gt:
+                        arr[i], arr[gt] = arr[gt], value
+                        swaps += 1
+                    comparisons += 2
+                    gt -= 1
+                else:
+                    comparisons += 2
+                    i += 1
+
+            # Push the larger side first so the smaller one is handled next
+            if lt - low > high - gt:
+                stack.append((low, lt - 1, depth - 1))
+                stack.append((gt + 1, high, depth - 1))
+            else:
+                stack.append((gt + 1, high, depth - 1))
+                stack.append((low, lt - 1, depth - 1))
+
+        return comparisons, swaps
+
+    def network_sort(self, arr: List[int], counter: Optional[SortCounter] = None,
+                     network: str = "best") -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        if n <= NETWORK_MAX_SIZE:
+            counter.comparisons += network_size(get_network(network, n))
+            counter.swaps += network_sorter(network, n)(arr, 0)
+            return counter
+
+        comparisons = swaps = 0
+        for layer in get_network(network, n):
+            comparisons += len(layer)
+            for i, j in layer:
+                a, b = arr[i], arr[j]
+                if a > b:
+                    arr[i], arr[j] = b, a
+                    swaps += 1
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        return counter
+
+    def heap_sort(self, arr: List[int], counter: Optional[SortCounter] = None, arity: int = 2) -> SortCounter:
+        if arity < 2:
+            raise ValueError("arity must be at least 2")
+        counter = counter if counter is not None else SortCounter()
+        comparisons = swaps = 0
+
+        def sift_down(root: int, end: int) -> None:
+            nonlocal comparisons, swaps
+            value = arr[root]
+            hole = root
+            child = arity * hole + 1
+            compared = moved = 0
+            if arity == 2:
+                while child < end:
+                    right = child + 1
+                    if right < end:
+                        compared += 1
+                        if arr[right] > arr[child]:
+                            child = right
+                    arr[hole] = arr[child]
+                    moved += 1
+                    hole = child
+                    child = 2 * hole + 1
+            else:
+                while child < end:
+                    last = min(child + arity, end)
+                    largest = child
+                    best = arr[child]
+                    for k in range(child + 1, last):
+                        if arr[k] > best:
+                            best = arr[k]
+                            largest = k
+                    compared += last - child - 1
+                    arr[hole] = best
+                    moved += 1
+                    hole = largest
+                    child = arity * hole + 1
+            if moved:
+                while hole > root:
+                    parent = (hole - 1) // arity
+                    compared += 1
+                    if not value > arr[parent]:
+                        break
+                    arr[hole] = arr[parent]
+                    moved += 1
+                    hole = parent
+                arr[hole] = value
+            comparisons += compared
+            swaps += moved
+
+        n = len(arr)
+
+        # Build max heap
+        for i in range((n - 2) // arity, -1, -1):
+            sift_down(i, n)
+
+        # Extract elements one by one
+        for i in range(n - 1, 0, -1):
+            arr[0], arr[i] = arr[i], arr[0]
+            swaps += 1
+            sift_down(0, i)
+
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        return counter
+
+    def counting_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        if n == 0:
+            counter.extra["memory_bytes"] = 0
+            return counter
+
+        # Python ints, so the range and offsets of NumPy input cannot overflow its dtype
+        keys = arr.tolist() if isinstance(arr, np.ndarray) else arr
+        min_val = min(keys)
+        max_val = max(keys)
+        strategy = counting_strategy(keys, min_val, max_val)
+        if strategy == "radix":
+            self.radix_sort(arr, counter)
+            counter.extra["memory_bytes"] = (n + (1 << RADIX_BITS_CHOICES[0])) * 8
+            return counter
+
+        if strategy == "dense":
+            span = max_val - min_val + 1
+            values = np.array(arr) if n >= RADIX_NUMPY_THRESHOLD else None
+            if values is not None and values.dtype.kind in "iu":
+                # As in _radix_sort_array, the wrapped offsets viewed as unsigned are exact
+                offsets = (values - values.dtype.type(min_val)).view(np.dtype(f"u{values.dtype.itemsize}"))
+                counts = np.bincount(offsets.astype(np.intp), minlength=span)
+                arr[:] = np.repeat(np.arange(min_val, max_val + 1, dtype=values.dtype), counts).tolist()
+            else:
+                count = array("q", bytes(8 * span))
+                for value in keys:
+                    count[value - min_val] += 1
+                # Rebuild the array directly from the counts
+                index = 0
+                for offset, occurrences in enumerate(count):
+                    if occurrences:
+                        arr[index:index + occurrences] = [offset + min_val] * occurrences
+                        index += occurrences
+            counter.extra["memory_bytes"] = (span + n) * 8
+        else:
+            histogram = Counter(keys)
+            keys = list(histogram)
+            lsd_radix_sort(keys)
+            index = 0
+            for key in keys:
+                occurrences = histogram[key]
+                arr[index:index + occurrences] = [key] * occurrences
+                index += occurrences
+            counter.extra["memory_bytes"] = (4 * len(keys) + n) * 8
+
+        counter.swaps += n
+        return counter
+
+    def radix_sort(self, arr: List[int], counter: Optional[SortCounter] = None, radix_bits: int = 8) -> SortCounter:
+        if radix_bits not in RADIX_BITS_CHOICES:
+            raise ValueError(f"radix_bits must be one of {RADIX_BITS_CHOICES}")
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        if n < 2:
+            return counter
+
+        if isinstance(arr, np.ndarray):
+            counter.swaps += n * _radix_sort_array(arr, radix_bits)
+            return counter
+
+        if n >= RADIX_NUMPY_THRESHOLD:
+            # Ints beyond 64 bits come out as an object array and take the Python path
+            values = np.array(arr)
+            if values.dtype.kind in "iu":
+                counter.swaps += n * _radix_sort_array(values, radix_bits)
+                arr[:] = values.tolist()
+                return counter
+
+        counter.swaps += n * lsd_radix_sort(arr, radix_bits)
+        return counter
+
+    def bucket_sort(self, arr: List[int], counter: Optional[SortCounter] = None) -> SortCounter:
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        if n < 2:
+            return counter
+
+        bucket_count = 1 << max(0, (n // BUCKET_SIZE).bit_length() - 1)
+        splitters, comparisons = bucket_splitters(arr, bucket_count)
+        # bisect_right over 2**k - 1 splitters always makes exactly k comparisons
+        bucket_of = list(map(functools.partial(bisect.bisect_right, splitters), arr))
+        comparisons += n * (bucket_count.bit_length() - 1)
+
+        offsets = array("q", bytes(8 * (bucket_count + 1)))
+        for bucket in bucket_of:
+            offsets[bucket + 1] += 1
+        for bucket in range(bucket_count):
+            offsets[bucket + 1] += offsets[bucket]
+        position = array("q", offsets)
+        buffer = [None] * n
+        for value, bucket in zip(arr, bucket_of):
+            buffer[position[bucket]] = value
+            position[bucket] += 1
+        arr[:] = buffer
+        swaps = n
+
+        for bucket in range(bucket_count):
+            low, high = offsets[bucket], offsets[bucket + 1]
+            if high - low > 1:
+                bucket_comparisons, bucket_swaps = self._intro_range(arr, low, high - 1)
+                comparisons += bucket_comparisons
+                swaps += bucket_swaps
+
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        return counter
+
+    def _heap_select(self, arr: List[int], low: int, middle: int, high: int,
+                     sort_heap: bool = False) -> Tuple[int, int]:
+        # Bounded heap selection of the middle - low smallest elements of
+        # arr[low..high] (inclusive) into a max-heap at arr[low:middle],
+        # heap sorted if sort_heap; returns (comparisons, swaps)
+        comparisons = swaps = 0
+
+        def sift_down(root: int, end: int) -> None:
+            # Moves the hole down instead of swapping; each level is one swap
+            nonlocal comparisons, swaps
+            value = arr[low + root]
+            while True:
+                child = 2 * root + 1
+                if child >= end:
+                    break
+                if child + 1 < end:
+                    comparisons += 1
+                    if arr[low + child] < arr[low + child + 1]:
+                        child += 1
+                comparisons += 1
+                if value >= arr[low + child]:
+                    break
+                arr[low + root] = arr[low + child]
+                swaps += 1
+                root = child
+            arr[low + root] = value
+
+        size = middle - low
+        for start in range(size // 2 - 1, -1, -1):
+            sift_down(start, size)
+        # One comparison per scanned element against the heap's largest
+        comparisons += high - middle + 1
+        top = arr[low]
+        for i, value in enumerate(itertools.islice(arr, middle, high + 1), middle):
+            if value < top:
+                arr[low], arr[i] = value, top
+                swaps += 1
+                sift_down(0, size)
+                top = arr[low]
+        if sort_heap:
+            for end in range(size - 1, 0, -1):
+                arr[low], arr[low + end] = arr[low + end], arr[low]
+                swaps += 1
+                sift_down(0, end)
+        return comparisons, swaps
+
+    def partial_sort(self, arr: List[int], counter: Optional[SortCounter] = None, *, k: int) -> SortCounter:
+        """Sort the k smallest elements into arr[:k], leaving the rest in arr[k:] unordered, in O(n log k)"""
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        if not 0 <= k <= n:
+            raise ValueError(f"k must be between 0 and {n}")
+        if k:
+            comparisons, swaps = self._heap_select(arr, 0, k, n - 1, sort_heap=True)
+            counter.comparisons += comparisons
+            counter.swaps += swaps
+        return counter
+
+    def select_kth(self, arr: List[int], counter: Optional[SortCounter] = None, *, k: int) -> SortCounter:
+        """Put the value sorting would place at index k there, smaller-or-equal values before it
+        and greater-or-equal ones after (Floyd-Rivest selection with a bounded-heap fallback)"""
+        counter = counter if counter is not None else SortCounter()
+        n = len(arr)
+        if not 0 <= k < n:
+            raise ValueError(f"k must be between 0 and {n - 1}")
+        comparisons = swaps = 0
+
+        def select(left: int, right: int) -> None:
+            nonlocal comparisons, swaps
+            depth = 2 * (right - left + 1).bit_length()
+            while right > left:
+                if depth == 0:
+                    heap_comparisons, heap_swaps = self._heap_select(arr, left, k + 1, right)
+                    comparisons += heap_comparisons
+                    swaps += heap_swaps
+                    if k != left:
+                        arr[left], arr[k] = arr[k], arr[left]
+                        swaps += 1
+                    return
+                depth -= 1
+                if right - left > FLOYD_RIVEST_CUTOFF:
+                    size = right - left + 1
+                    rank = k - left + 1
+                    z = math.log(size)
+                    s = 0.5 * math.exp(2 * z / 3)
+                    sd = 0.5 * math.sqrt(z * s * (size - s) / size) * (-1 if 2 * rank < size else 1)
+                    select(max(left, int(k - rank * s / size + sd)),
+                           min(right, int(k + (size - rank) * s / size + sd)))
+
+                if k != left:
+                    arr[left], arr[k] = arr[k], arr[left]
+                    swaps += 1
+                t = arr[left]
+                comparisons += 1
+                pivot_left = not arr[right] > t
+                if not pivot_left:
+                    arr[left], arr[right] = arr[right], arr[left]
+                    swaps += 1
+                # After the first exchange the pivot sits at the other end
+                pivot_left = not pivot_left
+                i, j = left, right
+                while i < j:
+                    arr[i], arr[j] = arr[j], arr[i]
+                    swaps += 1
+                    i += 1
+                    j -= 1
+                    start = i
+                    while arr[i] < t:
+                        i += 1
+                    comparisons += i - start + 1
+                    start = j
+                    while arr[j] > t:
+                        j -= 1
+                    comparisons += start - j + 1
+                if pivot_left:
+                    if j != left:
+                        arr[left], arr[j] = arr[j], arr[left]
+                        swaps += 1
+                else:
+                    j += 1
+                    if j != right:
+                        arr[j], arr[right] = arr[right], arr[j]
+                        swaps += 1
+
+                if j <= k:
+                    left = j + 1
+                if k <= j:
+                    right = j - 1
+
+        select(0, n - 1)
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        return counter
+
+    def _top_k(self, iterable: Iterable[Any], k: int, key: Optional[Callable[[Any], Any]], largest: bool,
+               counter: Optional[SortCounter]) -> Tuple[List[Any], SortCounter]:
+        # One pass with a bounded binary heap of the best k (rank, value) pairs
+        # seen so far; its root is the one that would leave first. A rank is
+        # (key, index) for nsmallest and (key, -index) for nlargest, so ties go
+        # to the earlier element as in sorted(...)[:k]. Ranks are compared as
+        # single comparisons, like decorated keys
+        counter = counter if counter is not None else SortCounter()
+        comparisons = swaps = evaluations = 0
+        heap = []
+
+        def worse(a, b) -> bool:
+            # a leaves the heap before b
+            nonlocal comparisons
+            comparisons += 1
+            return a[0] < b[0] if largest else b[0] < a[0]
+
+        def sift_down(root: int, end: int) -> None:
+            nonlocal swaps
+            entry = heap[root]
+            while True:
+                child = 2 * root + 1
+                if child >= end:
+                    break
+                if child + 1 < end and worse(heap[child + 1], heap[child]):
+                    child += 1
+                if not worse(heap[child], entry):
+                    break
+                heap[root] = heap[child]
+                swaps += 1
+                root = child
+            heap[root] = entry
+
+        if k > 0:
+            values = iter(iterable)
+            for index, value in zip(range(k), values):
+                item_key = key(value) if key is not None else value
+                entry = ((item_key, -index if largest else index), value)
+                # Sift the new entry up
+                heap.append(entry)
+                child = index
+                while child and worse(entry, heap[(child - 1) // 2]):
+                    heap[child] = heap[(child - 1) // 2]
+                    swaps += 1
+                    child = (child - 1) // 2
+                heap[child] = entry
+
+            # A later element has the larger index, so it beats the root exactly
+            # when its key alone does: one plain key comparison per element
+            better = operator.gt if largest else operator.lt
+            index = len(heap)
+            top = heap[0][0][0] if heap else None
+            for value in values:
+                item_key = key(value) if key is not None else value
+                if better(item_key, top):
+                    heap[0] = ((item_key, -index if largest else index), value)
+                    swaps += 1
+                    sift_down(0, k)
+                    top = heap[0][0][0]
+                index += 1
+            comparisons += index - len(heap)
+            evaluations = index
+
+            # Heap sort: the entry leaving first goes to the back
+            for end in range(len(heap) - 1, 0, -1):
+                heap[0], heap[end] = heap[end], heap[0]
+                swaps += 1
+                sift_down(0, end)
+
+        counter.comparisons += comparisons
+        counter.swaps += swaps
+        if key is not None:
+            counter.extra["key_evaluations"] = counter.extra.get("key_evaluations", 0) + evaluations
+        return [value for _, value in heap], counter
+
+    def nsmallest(self, iterable: Iterable[Any], k: int, key: Optional[Callable[[Any], Any]] = None,
+                  counter: Optional[SortCounter] = None) -> Tuple[List[Any], SortCounter]:
+        """The k smallest items of any iterable in ascending order, like sorted(iterable, key=key)[:k].
+
+        Consumes the iterable once holding only k items: O(n log k) time,
+        O(k) memory. Returns the items and the counter.
+        """
+        return self._top_k(iterable, k, key, False, counter)
+
+    def nlargest(self, iterable: Iterable[Any], k: int, key: Optional[Callable[[Any], Any]] = None,
+                 counter: Optional[SortCounter] = None) -> Tuple[List[Any], SortCounter]:
+        """The k largest items in descending order, like sorted(iterable, key=key, reverse=True)[:k]"""
+        return self._top_k(iterable, k, key, True, counter)
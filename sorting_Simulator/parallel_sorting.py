@@ -0,0 +1,347 @@
+"""Multi-core sorting engines.
+
+The input is copied once into a multiprocessing.shared_memory buffer, and
+worker processes attach to it by name: only buffer names and index ranges
+are pickled, never the data. Each engine returns a SortCounter with the
+total comparisons and swaps made by all workers, like the single-threaded
+engines in headless_sorting.
+"""
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from headless_sorting import HeadlessSortingAlgorithms, SortCounter, check_sort_algorithm, with_key_support
+from sorting_algorithms import STABLE_FALLBACK, bucket_splitters
+
+# Inputs are split into chunks of at least this many elements; smaller
+# inputs use fewer workers (a single one sorts in-process)
+PARALLEL_MIN_CHUNK = 1 << 13
+# Sample elements per bucket that parallel_sample_sort picks its splitters from
+SAMPLE_OVERSAMPLE = 32
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # One pool is kept between calls so repeated sorts don't pay process start-up
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    """Stop the worker processes kept between parallel sorts"""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown()
+        _pool, _pool_workers = None, 0
+
+
+def _to_array(arr) -> np.ndarray:
+    values = arr if isinstance(arr, np.ndarray) else np.array(arr)
+    if values.ndim != 1 or values.dtype.kind not in "iuf":
+        raise TypeError(f"parallel sorts need a flat array of numbers, not {values.dtype}")
+    return values
+
+
+class _SharedArray:
+    """A NumPy array backed by a new shared memory block, unlinked on exit"""
+
+    def __init__(self, dtype: np.dtype, size: int):
+        self.block = shared_memory.SharedMemory(create=True, size=max(1, size * dtype.itemsize))
+        self.array = np.ndarray(size, dtype=dtype, buffer=self.block.buf)
+
+    def __enter__(self) -> "_SharedArray":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        del self.array
+        self.block.close()
+        self.block.unlink()
+
+
+def _attach(name: str, dtype: str, size: int) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(size, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _sort_chunk(name: str, dtype: str, size: int, lo: int, hi: int, algorithm: str) -> SortCounter:
+    # Worker: sort shared[lo:hi] in place with a headless algorithm
+    block, shared = _attach(name, dtype, size)
+    try:
+        values = shared[lo:hi].tolist()
+        counter = getattr(HeadlessSortingAlgorithms(), algorithm)(values)
+        shared[lo:hi] = values
+        return counter
+    finally:
+        del shared
+        block.close()
+
+
+def _merge_pair(left: List, right: List) -> Tuple[List, int]:
+    # Two-way merge counted like merge_sort: one comparison per element
+    # emitted before either side runs out; ties go to the left run
+    result = []
+    append = result.append
+    left_len, right_len = len(left), len(right)
+    left_idx = right_idx = 0
+    while left_idx < left_len and right_idx < right_len:
+        if right[right_idx] < left[left_idx]:
+            append(right[right_idx])
+            right_idx += 1
+        else:
+            append(left[left_idx])
+            left_idx += 1
+    result.extend(left[left_idx:])
+    result.extend(right[right_idx:])
+    return result, left_idx + right_idx
+
+
+def _merge_runs(runs: List[List]) -> Tuple[List, int]:
+    # Balanced tree of two-way merges: every element is moved log2(k) times
+    comparisons = 0
+    while len(runs) > 1:
+        merged = []
+        for k in range(0, len(runs) - 1, 2):
+            run, count = _merge_pair(runs[k], runs[k + 1])
+            merged.append(run)
+            comparisons += count
+        if len(runs) % 2:
+            merged.append(runs[-1])
+        runs = merged
+    return (runs[0] if runs else []), comparisons
+
+
+def _merge_slice(source: str, target: str, dtype: str, size: int,
+                 pieces: Sequence[Tuple[int, int]], out_lo: int) -> int:
+    # Worker: merge the sorted source[start:stop] pieces into target[out_lo:]
+    source_block, source_array = _attach(source, dtype, size)
+    target_block, target_array = _attach(target, dtype, size)
+    try:
+        merged, comparisons = _merge_runs([source_array[start:stop].tolist() for start, stop in pieces])
+        target_array[out_lo:out_lo + len(merged)] = merged
+        return comparisons
+    finally:
+        del source_array, target_array
+        source_block.close()
+        target_block.close()
+
+
+def _bucket_counts(name: str, dtype: str, size: int, lo: int, hi: int, splitters: np.ndarray) -> np.ndarray:
+    # Worker: how many elements of shared[lo:hi] fall into each bucket
+    block, shared = _attach(name, dtype, size)
+    try:
+        buckets = np.searchsorted(splitters, shared[lo:hi], side="right")
+        return np.bincount(buckets, minlength=len(splitters) + 1)
+    finally:
+        del shared
+        block.close()
+
+
+def _scatter_chunk(source: str, target: str, dtype: str, size: int, lo: int, hi: int,
+                   splitters: np.ndarray, destinations: np.ndarray) -> None:
+    # Worker: copy each bucket's elements of source[lo:hi] to target[destinations[b]:]
+    source_block, source_array = _attach(source, dtype, size)
+    target_block, target_array = _attach(target, dtype, size)
+    try:
+        chunk = source_array[lo:hi]
+        buckets = np.searchsorted(splitters, chunk, side="right")
+        grouped = chunk[np.argsort(buckets, kind="stable")]
+        counts = np.bincount(buckets, minlength=len(splitters) + 1)
+        start = 0
+        for bucket, count in enumerate(counts):
+            destination = destinations[bucket]
+            target_array[destination:destination + count] = grouped[start:start + count]
+            start += count
+    finally:
+        del source_array, target_array
+        source_block.close()
+        target_block.close()
+
+
+def _search_costs(splitter_count: int) -> List[int]:
+    """Comparisons a binary search over ``splitter_count`` splitters makes to
+    land in each bucket; the bucket decides every step's outcome"""
+    costs = []
+    for bucket in range(splitter_count + 1):
+        low, high, steps = 0, splitter_count, 0
+        while low < high:
+            middle = (low + high) // 2
+            steps += 1
+            if middle >= bucket:
+                high = middle
+            else:
+                low = middle + 1
+        costs.append(steps)
+    return costs
+
+
+def _rank_splits(runs: List[np.ndarray], rank: int) -> List[int]:
+    """Split points in each sorted run so that exactly ``rank`` elements fall
+    before them and none of those is larger than an element after them.
+    Equal elements are taken from earlier runs first."""
+    # The rank-th smallest value v is the least element x with count(<= x) >= rank.
+    # Binary search for it in every run at once: lo/hi bracket the first such
+    # position in each run
+    lo = np.zeros(len(runs), dtype=np.int64)
+    hi = np.array([len(run) for run in runs], dtype=np.int64)
+    while (lo < hi).any():
+        active = np.flatnonzero(lo < hi)
+        middle = (lo[active] + hi[active]) // 2
+        candidates = np.array([runs[j][m] for j, m in zip(active, middle)], dtype=runs[0].dtype)
+        at_most = sum(np.searchsorted(run, candidates, side="right") for run in runs)
+        enough = at_most >= rank
+        hi[active[enough]] = middle[enough]
+        lo[active[~enough]] = middle[~enough] + 1
+    value = min(runs[j][lo[j]] for j in range(len(runs)) if lo[j] < len(runs[j]))
+
+    splits = [int(np.searchsorted(run, value, side="left")) for run in runs]
+    missing = rank - sum(splits)
+    for j, run in enumerate(runs):
+        equal = int(np.searchsorted(run, value, side="right")) - splits[j]
+        take = min(missing, equal)
+        splits[j] += take
+        missing -= take
+    return splits
+
+
+@with_key_support
+class ParallelSortingAlgorithms:
+    """Sorting engines that spread the work over a pool of worker processes.
+
+    Methods take the same ``arr``/``counter`` arguments as
+    HeadlessSortingAlgorithms and sort lists or 1D NumPy arrays of numbers
+    in place. ``workers`` defaults to the number of CPUs; inputs too small
+    to give every worker PARALLEL_MIN_CHUNK elements use fewer.
+    """
+
+    # stable=True stays parallel: the merges take ties from the earlier
+    # chunk, so a merge sort of chunks sorted by a stable algorithm is stable
+    stable_fallback_name = "parallel_merge_sort"
+    stable_fallback_defaults = {"chunk_algorithm": STABLE_FALLBACK}
+
+    def parallel_merge_sort(self, arr, counter: Optional[SortCounter] = None, workers: Optional[int] = None,
+                            chunk_algorithm: str = "merge_sort") -> SortCounter:
+        # Sort one chunk per worker with ``chunk_algorithm``, then merge in
+        # parallel: the output is cut into equal slices, each slice's share of
+        # every chunk is found by binary search (a k-way merge path), and each
+        # worker merges its shares straight into a second shared buffer
+        counter = counter if counter is not None else SortCounter()
+        check_sort_algorithm(chunk_algorithm)
+        n = len(arr)
+        workers = max(1, min(workers or default_workers(), n // PARALLEL_MIN_CHUNK))
+        if workers == 1:
+            result = getattr(HeadlessSortingAlgorithms(), chunk_algorithm)(arr)
+            counter.comparisons += result.comparisons
+            counter.swaps += result.swaps
+            counter.extra["workers"] = 1
+            return counter
+
+        values = _to_array(arr)
+        bounds = [n * k // workers for k in range(workers + 1)]
+        pool = _get_pool(workers)
+        with _SharedArray(values.dtype, n) as source, _SharedArray(values.dtype, n) as target:
+            source.array[:] = values
+            dtype = values.dtype.str
+            chunks = [pool.submit(_sort_chunk, source.block.name, dtype, n, lo, hi, chunk_algorithm)
+                      for lo, hi in zip(bounds, bounds[1:])]
+            for future in chunks:
+                result = future.result()
+                counter.comparisons += result.comparisons
+                counter.swaps += result.swaps
+
+            runs = [source.array[lo:hi] for lo, hi in zip(bounds, bounds[1:])]
+            cuts = [[0] * workers] + [_rank_splits(runs, rank) for rank in bounds[1:-1]] + [
+                [hi - lo for lo, hi in zip(bounds, bounds[1:])]]
+            merges = []
+            for k in range(workers):
+                pieces = [(lo + cuts[k][j], lo + cuts[k + 1][j]) for j, lo in enumerate(bounds[:-1])
+                          if cuts[k + 1][j] > cuts[k][j]]
+                merges.append(pool.submit(_merge_slice, source.block.name, target.block.name, dtype, n,
+                                          pieces, bounds[k]))
+            for future in merges:
+                counter.comparisons += future.result()
+
+            del runs
+            if isinstance(arr, np.ndarray):
+                arr[...] = target.array
+            else:
+                arr[:] = target.array.tolist()
+        counter.extra["workers"] = workers
+        return counter
+
+    def parallel_sample_sort(self, arr, counter: Optional[SortCounter] = None, workers: Optional[int] = None,
+                             bucket_algorithm: str = "intro_sort",
+                             oversample: int = SAMPLE_OVERSAMPLE) -> SortCounter:
+        # Splitters from a sample of ``oversample`` elements per worker cut the
+        # value range into one bucket per worker. Workers count their chunk's
+        # elements per bucket, then scatter them straight into the bucket's
+        # slots of a second shared buffer, and finally each sorts one bucket
+        # in place with ``bucket_algorithm``: the buckets are already in
+        # order, so no merge is needed. extra["imbalance"] is the largest
+        # bucket over the mean bucket size (1.0 is a perfect split)
+        counter = counter if counter is not None else SortCounter()
+        check_sort_algorithm(bucket_algorithm)
+        if oversample < 1:
+            raise ValueError("oversample must be at least 1")
+        n = len(arr)
+        workers = max(1, min(workers or default_workers(), n // PARALLEL_MIN_CHUNK))
+        if workers == 1:
+            result = getattr(HeadlessSortingAlgorithms(), bucket_algorithm)(arr)
+            counter.comparisons += result.comparisons
+            counter.swaps += result.swaps
+            counter.extra.update(workers=1, imbalance=1.0)
+            return counter
+
+        values = _to_array(arr)
+        splitter_list, sample_comparisons = bucket_splitters(values, workers, oversample)
+        splitters = np.array(splitter_list, dtype=values.dtype)
+        counter.comparisons += sample_comparisons
+        bounds = [n * k // workers for k in range(workers + 1)]
+        pool = _get_pool(workers)
+        with _SharedArray(values.dtype, n) as source, _SharedArray(values.dtype, n) as target:
+            source.array[:] = values
+            dtype = values.dtype.str
+            counts = np.array([future.result() for future in [
+                pool.submit(_bucket_counts, source.block.name, dtype, n, lo, hi, splitters)
+                for lo, hi in zip(bounds, bounds[1:])]])
+            bucket_sizes = counts.sum(axis=0)
+            counter.comparisons += int(np.dot(_search_costs(len(splitters)), bucket_sizes))
+
+            # Chunk c's part of bucket b goes after buckets < b and after
+            # the part of bucket b that comes from chunks < c
+            bucket_starts = np.concatenate(([0], np.cumsum(bucket_sizes)[:-1]))
+            destinations = bucket_starts + np.cumsum(counts, axis=0) - counts
+            for future in [pool.submit(_scatter_chunk, source.block.name, target.block.name, dtype, n,
+                                       lo, hi, splitters, destinations[chunk])
+                           for chunk, (lo, hi) in enumerate(zip(bounds, bounds[1:]))]:
+                future.result()
+            # Each scattered element counts as a placement, like bucket_sort
+            counter.swaps += n
+
+            bucket_ends = bucket_starts + bucket_sizes
+            for future in [pool.submit(_sort_chunk, target.block.name, dtype, n, int(lo), int(hi), bucket_algorithm)
+                           for lo, hi in zip(bucket_starts, bucket_ends) if hi - lo > 1]:
+                result = future.result()
+                counter.comparisons += result.comparisons
+                counter.swaps += result.swaps
+
+            if isinstance(arr, np.ndarray):
+                arr[...] = target.array
+            else:
+                arr[:] = target.array.tolist()
+        counter.extra.update(workers=workers, imbalance=round(float(bucket_sizes.max() * workers / n), 3))
+        return counter
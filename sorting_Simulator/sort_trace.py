@@ -0,0 +1,201 @@
+import queue
+from array import array
+from typing import Any, List, Optional, Tuple
+
+# Operation codes stored in the trace
+COMPARE = 0
+SWAP = 1
+WRITE = 2
+SORTED = 3
+
+_FIELDS = 4  # op, a, b, c per event
+
+
+class SortTrace:
+    """Compact, array-backed buffer of sorting operations.
+
+    Each event takes four machine integers instead of a copy of the array:
+      COMPARE i, j, n - arr[i] was compared with arr[j]; n > 0 when this is
+                        the n-th comparator of a sorting-network layer
+      SWAP i, j       - arr[i] and arr[j] were exchanged
+      WRITE i, slot   - arr[i] was overwritten; the new and old values live in a
+                        side list at ``slot`` so the write can be undone
+      SORTED lo, hi   - indices lo..hi-1 are in their final position
+    """
+
+    def __init__(self):
+        self._events = array("q")
+        self._values: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._events) // _FIELDS
+
+    def compare(self, i: int, j: int, layer_index: int = 0) -> None:
+        self._events.extend((COMPARE, i, j, layer_index))
+
+    def swap(self, i: int, j: int) -> None:
+        self._events.extend((SWAP, i, j, 0))
+
+    def write(self, i: int, value: Any, old_value: Any, counted: bool = False) -> None:
+        """Record arr[i] = value; ``counted`` marks writes the stats count as swaps"""
+        self._events.extend((WRITE, i, len(self._values), int(counted)))
+        self._values.append(value)
+        self._values.append(old_value)
+
+    def mark_sorted(self, lo: int, hi: int) -> None:
+        self._events.extend((SORTED, lo, hi, 0))
+
+    def event(self, k: int) -> Tuple[int, int, int, int]:
+        """Return the raw (op, a, b, c) fields of event ``k``"""
+        base = k * _FIELDS
+        events = self._events
+        return events[base], events[base + 1], events[base + 2], events[base + 3]
+
+    def value(self, slot: int) -> Any:
+        return self._values[slot]
+
+    def old_value(self, slot: int) -> Any:
+        return self._values[slot + 1]
+
+    def extend(self, other: "SortTrace") -> None:
+        """Append all events of ``other`` to this trace"""
+        events = other._events
+        offset = len(self._values)
+        if offset and other._values:
+            # Rebase the value slots of write events onto this trace's side list
+            events = array("q", events)
+            for base in range(0, len(events), _FIELDS):
+                if events[base] == WRITE:
+                    events[base + 2] += offset
+        self._events.extend(events)
+        self._values.extend(other._values)
+
+    def clear(self) -> None:
+        del self._events[:]
+        self._values.clear()
+
+
+class TraceStream(SortTrace):
+    """SortTrace that hands its events to a consumer in batches.
+
+    The sorting worker records into the stream as usual; every
+    ``batch_size`` events the buffered batch is put on ``events_queue``
+    as its own SortTrace. The queue should be bounded: when the consumer
+    falls behind, ``put`` blocks and the worker waits (backpressure).
+    """
+
+    def __init__(self, events_queue: "queue.Queue[Optional[SortTrace]]", batch_size: int = 256):
+        super().__init__()
+        self.events_queue = events_queue
+        self.batch_size = batch_size
+
+    def compare(self, i: int, j: int, layer_index: int = 0) -> None:
+        super().compare(i, j, layer_index)
+        if len(self) >= self.batch_size:
+            self.flush()
+
+    def swap(self, i: int, j: int) -> None:
+        super().swap(i, j)
+        if len(self) >= self.batch_size:
+            self.flush()
+
+    def write(self, i: int, value: Any, old_value: Any, counted: bool = False) -> None:
+        super().write(i, value, old_value, counted)
+        if len(self) >= self.batch_size:
+            self.flush()
+
+    def mark_sorted(self, lo: int, hi: int) -> None:
+        super().mark_sorted(lo, hi)
+        if len(self) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send the buffered events to the consumer"""
+        if len(self) == 0:
+            return
+        batch = SortTrace()
+        batch.extend(self)
+        self.clear()
+        self.events_queue.put(batch)
+
+
+class TracePlayer:
+    """Replays a SortTrace over a copy of the initial array.
+
+    The player can move forward and backward one event at a time or seek
+    to any position, so a recorded sort can be scrubbed like a video.
+    """
+
+    def __init__(self, initial: List[Any], trace: SortTrace):
+        self.initial = list(initial)
+        self.trace = trace
+        self.array = list(initial)
+        self.position = 0
+        self.comparisons = 0
+        self.swaps = 0
+        self._sorted_marks: List[Tuple[int, int]] = []
+
+    @property
+    def at_end(self) -> bool:
+        return self.position >= len(self.trace)
+
+    @property
+    def sorted_range(self) -> Optional[Tuple[int, int]]:
+        """The most recently marked sorted range, if any"""
+        return self._sorted_marks[-1] if self._sorted_marks else None
+
+    def step_forward(self) -> Optional[Tuple[int, int, int, int]]:
+        """Apply the next event and return it, or None at the end of the trace"""
+        if self.at_end:
+            return None
+        event = self.trace.event(self.position)
+        op, a, b, c = event
+        if op == COMPARE:
+            self.comparisons += 1
+        elif op == SWAP:
+            self.array[a], self.array[b] = self.array[b], self.array[a]
+            self.swaps += 1
+        elif op == WRITE:
+            self.array[a] = self.trace.value(b)
+            self.swaps += c
+        elif op == SORTED:
+            self._sorted_marks.append((a, b))
+        self.position += 1
+        return event
+
+    def step_backward(self) -> Optional[Tuple[int, int, int, int]]:
+        """Undo the last applied event and return it, or None at the start"""
+        if self.position == 0:
+            return None
+        self.position -= 1
+        event = self.trace.event(self.position)
+        op, a, b, c = event
+        if op == COMPARE:
+            self.comparisons -= 1
+        elif op == SWAP:
+            self.array[a], self.array[b] = self.array[b], self.array[a]
+            self.swaps -= 1
+        elif op == WRITE:
+            self.array[a] = self.trace.old_value(b)
+            self.swaps -= c
+        elif op == SORTED:
+            self._sorted_marks.pop()
+        return event
+
+    def seek(self, position: int) -> None:
+        """Move to ``position`` (number of applied events)"""
+        position = max(0, min(position, len(self.trace)))
+        if position < self.position // 2:
+            # Cheaper to replay from the start than to undo most of the trace
+            self.reset()
+        while self.position < position:
+            self.step_forward()
+        while self.position > position:
+            self.step_backward()
+
+    def reset(self) -> None:
+        self.array = list(self.initial)
+        self.position = 0
+        self.comparisons = 0
+        self.swaps = 0
+        self._sorted_marks.clear()
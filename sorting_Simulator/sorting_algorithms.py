@@ -1,280 +1,1135 @@
+import functools
+import math
+import numbers
+import operator
 import time
-from typing import List, Callable, Any
+from array import array
+from typing import List, Callable, Any, Optional, Tuple
+from sort_trace import SortTrace
+from sorting_networks import Network, get_network
 
+# bottom_up_merge_sort insertion sorts runs of this size before merging
+INSERTION_CUTOFF = 16
+# intro_sort and merge_sort sort ranges up to this size with the best known
+# comparator network for the range's exact size
+NETWORK_CUTOFF = 16
+# intro_sort uses a ninther (median of three medians) pivot from this size on
+NINTHER_THRESHOLD = 128
+# Consecutive wins from one run before a merge switches to galloping
+MIN_GALLOP = 7
+# tim_sort sorts arrays shorter than this with binary insertion alone
+MIN_MERGE = 64
+# Supported radix_sort digit widths in bits (radix 2**8, 2**11, 2**16)
+RADIX_BITS_CHOICES = (8, 11, 16)
+# counting_sort keeps a dense count array while the value range is at most
+# this many times n (or at most COUNTING_MIN_DENSE slots)
+COUNTING_RANGE_RATIO = 4
+COUNTING_MIN_DENSE = 1 << 16
+# Elements counting_sort samples to estimate how many distinct keys there are
+COUNTING_SAMPLE_SIZE = 1024
+# bucket_sort aims for buckets of about this many elements, and samples
+# BUCKET_OVERSAMPLE elements per bucket to choose the splitters
+BUCKET_SIZE = 32
+BUCKET_OVERSAMPLE = 2
+# Algorithms that keep equal elements in their original order. merge_sort's
+# merges do, but its comparator-network base case does not. counting_sort
+# and radix_sort take only integers, whose equal values are interchangeable
+STABLE_ALGORITHMS = frozenset({"bubble_sort", "insertion_sort", "bottom_up_merge_sort", "tim_sort",
+                               "counting_sort", "radix_sort"})
+# stable=True runs this algorithm in place of one not in STABLE_ALGORITHMS
+STABLE_FALLBACK = "tim_sort"
+# *_sort methods that only order the k smallest elements. They need a k and
+# get no key=/reverse=/stable= (HeadlessSortingAlgorithms.nsmallest and
+# nlargest take a key)
+PARTIAL_SORTS = frozenset({"partial_sort"})
+# select_kth narrows ranges longer than this to a sampled window around k
+# before partitioning (Floyd-Rivest)
+FLOYD_RIVEST_CUTOFF = 600
+
+
+def min_run_length(n: int) -> int:
+    """Minimum run length for tim_sort: n itself below MIN_MERGE, otherwise a
+    value in [MIN_MERGE / 2, MIN_MERGE] such that n / min_run is a power of
+    two or slightly below one, which keeps the final merges balanced"""
+    extra = 0
+    while n >= MIN_MERGE:
+        extra |= n & 1
+        n >>= 1
+    return n + extra
+
+
+def lsd_radix_sort(values: List[int], radix_bits: int = 8) -> int:
+    """Uninstrumented LSD radix sort of a list of integers in place.
+
+    Alternates between ``values`` and one scratch buffer and skips passes
+    where every key has the same digit. Returns the number of scatter passes.
+    """
+    n = len(values)
+    if n < 2:
+        return 0
+    min_val = min(values)
+    max_key = max(values) - min_val
+    radix = 1 << radix_bits
+    mask = radix - 1
+    src, dst = values, [0] * n
+    passes = 0
+    shift = 0
+    while max_key >> shift:
+        count = [0] * radix
+        for value in src:
+            count[((value - min_val) >> shift) & mask] += 1
+        if max(count) == n:
+            shift += radix_bits
+            continue
+        position = 0
+        for digit in range(radix):
+            count[digit], position = position, position + count[digit]
+        for value in src:
+            digit = ((value - min_val) >> shift) & mask
+            dst[count[digit]] = value
+            count[digit] += 1
+        src, dst = dst, src
+        passes += 1
+        shift += radix_bits
+    if src is not values:
+        values[:] = src
+    return passes
+
+
+def counting_strategy(arr: List[int], min_val: int, max_val: int) -> str:
+    """Choose how counting_sort counts: "dense", "hash" or "radix".
+
+    A dense count array is used while the value range is small relative to
+    n. Wider ranges use a hash-map histogram when a sample suggests many
+    repeated keys, and otherwise radix sort, so memory stays O(n).
+    """
+    n = len(arr)
+    span = max_val - min_val + 1
+    if span <= max(COUNTING_RANGE_RATIO * n, COUNTING_MIN_DENSE):
+        return "dense"
+    step = max(1, n // COUNTING_SAMPLE_SIZE)
+    sample = arr[::step]
+    if 2 * len(set(sample)) <= len(sample):
+        return "hash"
+    return "radix"
+
+
+def bucket_splitter_positions(arr: List[Any], bucket_count: int, oversample: int = BUCKET_OVERSAMPLE,
+                              compare: Optional[Callable[[int, int], None]] = None) -> Tuple[List[int], int]:
+    """Positions in ``arr`` of ``bucket_count - 1`` splitters at evenly spaced
+    quantiles of a sample.
+
+    The sample takes every k-th element (about ``oversample`` per bucket),
+    so the result is deterministic. ``compare(i, j)`` is called with the
+    positions of every pair the sample sort compares. Returns the positions
+    and the number of comparisons spent sorting the sample.
+    """
+    comparisons = 0
+
+    class CountedKey:
+        __slots__ = ("position",)
+
+        def __init__(self, position):
+            self.position = position
+
+        def __lt__(self, other):
+            nonlocal comparisons
+            comparisons += 1
+            if compare is not None:
+                compare(self.position, other.position)
+            return arr[self.position] < arr[other.position]
+
+    sample = list(range(0, len(arr), max(1, len(arr) // (bucket_count * oversample))))
+    sample.sort(key=CountedKey)
+    positions = [sample[i * len(sample) // bucket_count] for i in range(1, bucket_count)]
+    return positions, comparisons
+
+
+def bucket_splitters(arr: List[Any], bucket_count: int,
+                     oversample: int = BUCKET_OVERSAMPLE) -> Tuple[List[Any], int]:
+    """The values at bucket_splitter_positions and the comparisons spent finding them"""
+    positions, comparisons = bucket_splitter_positions(arr, bucket_count, oversample)
+    return [arr[position] for position in positions], comparisons
+
+
+def decorate_keys(arr: List[Any], key: Optional[Callable[[Any], Any]] = None, reverse: bool = False) -> List[Any]:
+    """Decorate step of decorate-sort-undecorate.
+
+    Computes ``key`` once per element and returns values whose ascending
+    order is the stable order of ``arr`` by key (descending when
+    ``reverse``, read back with undecorate_order). Each key is paired with
+    the element's position so ties keep their original order: integer keys
+    are packed into one int, key * n + position, which integer-only
+    algorithms such as radix_sort can sort; other keys become
+    (key, position) tuples. With ``reverse`` positions count from the end,
+    so equal keys still come out in their original order.
+    """
+    n = len(arr)
+    keys = [key(value) for value in arr] if key is not None else list(arr)
+    positions = range(n - 1, -1, -1) if reverse else range(n)
+    if all(isinstance(k, numbers.Integral) for k in keys):
+        return [int(k) * n + position for k, position in zip(keys, positions)]
+    return list(zip(keys, positions))
+
+
+def undecorate_order(decorated: List[Any], reverse: bool = False) -> List[int]:
+    """Original indices in sorted order, from the sorted output of decorate_keys"""
+    n = len(decorated)
+    if decorated and isinstance(decorated[0], tuple):
+        positions = [entry[1] for entry in decorated]
+    else:
+        positions = [entry % n for entry in decorated]
+    if reverse:
+        return [n - 1 - position for position in reversed(positions)]
+    return positions
+
+
+def _with_key_support(cls):
+    # Give every full *_sort method key=, reverse= and stable= arguments. Without
+    # them the method runs unchanged; with a key or reverse it sorts the
+    # decorated values (always stable) and then rearranges arr, and
+    # stats["key_evaluations"] counts the key calls. stable=True on a plain
+    # sort by an algorithm outside STABLE_ALGORITHMS runs STABLE_FALLBACK,
+    # which takes no options, so passing any (such as arity) is a TypeError
+    def keyed(method):
+        @functools.wraps(method)
+        def sort(self, arr, stats, *args, key=None, reverse=False, stable=False, **kwargs):
+            if key is None and not reverse:
+                if stable and method.__name__ not in STABLE_ALGORITHMS:
+                    if args or kwargs:
+                        options = [f"{len(args)} positional argument(s)"] if args else []
+                        raise TypeError(f"stable=True sorts with {STABLE_FALLBACK}, which does not take "
+                                        f"{', '.join(options + list(kwargs))}")
+                    return getattr(self, STABLE_FALLBACK)(arr, stats)
+                return method(self, arr, stats, *args, **kwargs)
+            decorated = decorate_keys(arr, key, reverse)
+            stats["key_evaluations"] = stats.get("key_evaluations", 0) + (len(arr) if key is not None else 0)
+            method(self, decorated, stats, *args, **kwargs)
+            arr[:] = [arr[i] for i in undecorate_order(decorated, reverse)]
+        return sort
+
+    for name in dir(cls):
+        if name.endswith("_sort") and name not in PARTIAL_SORTS:
+            setattr(cls, name, keyed(getattr(cls, name)))
+    return cls
+
+
+@_with_key_support
 class SortingAlgorithms:
-    def __init__(self, update_callback: Callable[[List[int], dict, dict], None]):
+    def __init__(self, update_callback: Optional[Callable[[List[int], dict, dict], None]] = None,
+                 trace: Optional[SortTrace] = None):
         self.update_callback = update_callback
-        
+        self.trace = trace
+
+    def _compare(self, arr: List[int], stats: dict, i: int, j: int) -> None:
+        stats["comparisons"] += 1
+        if self.trace is not None:
+            self.trace.compare(i, j)
+        if self.update_callback is not None:
+            self.update_callback(arr, stats, {'comparing': [i, j]})
+
+    def _swap(self, arr: List[int], stats: dict, i: int, j: int) -> None:
+        arr[i], arr[j] = arr[j], arr[i]
+        stats["swaps"] += 1
+        if self.trace is not None:
+            self.trace.swap(i, j)
+        if self.update_callback is not None:
+            self.update_callback(arr, stats, {'swapping': [i, j]})
+
+    def _write(self, arr: List[int], stats: dict, i: int, value: Any, counted: bool = False) -> None:
+        # counted=True for writes that the statistics report as swaps (shifts, placements)
+        if self.trace is not None:
+            self.trace.write(i, value, arr[i], counted)
+        arr[i] = value
+        if counted:
+            stats["swaps"] += 1
+        if self.update_callback is not None:
+            self.update_callback(arr, stats, {'swapping': [i]})
+
+    def _mark_sorted(self, arr: List[int], stats: dict, lo: int, hi: int) -> None:
+        if self.trace is not None:
+            self.trace.mark_sorted(lo, hi)
+        if self.update_callback is not None:
+            self.update_callback(arr, stats, {'sorted': list(range(lo, hi))})
+
+    def _insertion_range(self, arr: List[int], stats: dict, low: int, high: int) -> None:
+        # Insertion sort of arr[low..high] (inclusive), used as a small-range base case
+        for i in range(low + 1, high + 1):
+            j = i - 1
+            while j >= low:
+                self._compare(arr, stats, j, j + 1)
+                if arr[j] <= arr[j + 1]:
+                    break
+                self._swap(arr, stats, j, j + 1)
+                j -= 1
+
+    def _run_network(self, arr: List[int], stats: dict, low: int, network: Network) -> None:
+        # Apply a comparator network to arr[low:]; each layer is shown in the
+        # 'comparing' color as a whole, then its out-of-order pairs are swapped
+        for layer in network:
+            stats["comparisons"] += len(layer)
+            if self.trace is not None:
+                for index, (i, j) in enumerate(layer, 1):
+                    self.trace.compare(low + i, low + j, index)
+            if self.update_callback is not None:
+                self.update_callback(arr, stats, {'comparing': [low + k for pair in layer for k in pair]})
+            for i, j in layer:
+                if arr[low + i] > arr[low + j]:
+                    self._swap(arr, stats, low + i, low + j)
+
+    def _network_range(self, arr: List[int], stats: dict, low: int, high: int) -> None:
+        # Sort arr[low..high] (inclusive) with the best known network for its size
+        self._run_network(arr, stats, low, get_network("best", high - low + 1))
+
     def bubble_sort(self, arr: List[int], stats: dict) -> None:
         n = len(arr)
         swapped = True
-        
+
         while swapped:
             swapped = False
             for j in range(n - 1):
-                # Update state for comparison
-                state = {'comparing': [j, j + 1]}
-                stats["comparisons"] += 1
-                self.update_callback(arr, stats, state)
-                
+                self._compare(arr, stats, j, j + 1)
+
                 if arr[j] > arr[j + 1]:
-                    # Update state for swap
-                    state = {'swapping': [j, j + 1]}
-                    arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                    stats["swaps"] += 1
-                    self.update_callback(arr, stats, state)
+                    self._swap(arr, stats, j, j + 1)
                     swapped = True
-                    
+
             # Mark the last element as sorted
             n -= 1
-            state = {'sorted': list(range(n, len(arr)))}
-            self.update_callback(arr, stats, state)
-            
+            self._mark_sorted(arr, stats, n, len(arr))
+
         # Mark all elements as sorted at the end
-        state = {'sorted': list(range(len(arr)))}
-        self.update_callback(arr, stats, state)
-        
+        self._mark_sorted(arr, stats, 0, len(arr))
+
     def selection_sort(self, arr: List[int], stats: dict) -> None:
         n = len(arr)
         for i in range(n):
             min_idx = i
             for j in range(i + 1, n):
-                stats["comparisons"] += 1
-                self.update_callback(arr, stats)
-                
+                self._compare(arr, stats, j, min_idx)
+
                 if arr[j] < arr[min_idx]:
                     min_idx = j
-                    
+
             if min_idx != i:
-                arr[i], arr[min_idx] = arr[min_idx], arr[i]
-                stats["swaps"] += 1
-                self.update_callback(arr, stats)
-                
+                self._swap(arr, stats, i, min_idx)
+            self._mark_sorted(arr, stats, 0, i + 1)
+
     def insertion_sort(self, arr: List[int], stats: dict) -> None:
         for i in range(1, len(arr)):
             key = arr[i]
             j = i - 1
-            
-            stats["comparisons"] += 1
-            self.update_callback(arr, stats)
-            
-            while j >= 0 and arr[j] > key:
-                arr[j + 1] = arr[j]
+
+            # The key moves left one slot per swap until its left neighbour is not larger
+            while j >= 0:
+                self._compare(arr, stats, j, j + 1)
+                if arr[j] <= key:
+                    break
+                self._swap(arr, stats, j, j + 1)
                 j -= 1
-                stats["swaps"] += 1
-                stats["comparisons"] += 1
-                self.update_callback(arr, stats)
-                
-            arr[j + 1] = key
-            self.update_callback(arr, stats)
-            
+
+        self._mark_sorted(arr, stats, 0, len(arr))
+
     def merge_sort(self, arr: List[int], stats: dict) -> None:
-        def merge(left: List[int], right: List[int], start_idx: int) -> List[int]:
-            result = []
+        def merge(start: int, mid: int, end: int) -> None:
+            # Copies, since slices of a NumPy array are views the writes below would overwrite
+            left = list(arr[start:mid])
+            right = list(arr[mid:end])
             left_idx = right_idx = 0
-            
+            k = start
+
             while left_idx < len(left) and right_idx < len(right):
-                stats["comparisons"] += 1
-                self.update_callback(arr, stats)
-                
-                if left[left_idx] < right[right_idx]:
-                    result.append(left[left_idx])
+                self._compare(arr, stats, start + left_idx, mid + right_idx)
+
+                # Ties take the left element, so the merge keeps equal elements in order
+                if right[right_idx] < left[left_idx]:
+                    value = right[right_idx]
+                    right_idx += 1
+                else:
+                    value = left[left_idx]
                     left_idx += 1
+                self._write(arr, stats, k, value)
+                k += 1
+
+            for value in left[left_idx:] + right[right_idx:]:
+                self._write(arr, stats, k, value)
+                k += 1
+
+        def sort(start: int, end: int) -> None:
+            if end - start <= NETWORK_CUTOFF:
+                self._network_range(arr, stats, start, end - 1)
+                return
+
+            mid = start + (end - start) // 2
+            sort(start, mid)
+            sort(mid, end)
+            merge(start, mid, end)
+
+        sort(0, len(arr))
+        self._mark_sorted(arr, stats, 0, len(arr))
+
+    def bottom_up_merge_sort(self, arr: List[int], stats: dict) -> None:
+        # Bottom-up merge sort with one preallocated auxiliary buffer: runs of
+        # INSERTION_CUTOFF are insertion sorted, then widths double each pass.
+        # Each merge copies only its own range to the buffer and merges back into
+        # arr; ranges already in order are skipped, and long winning streaks
+        # switch to galloping (exponential search + bulk copy)
+        def gallop(key_idx: int, lo: int, hi: int, strict: bool) -> int:
+            # First index in aux[lo:hi] whose value is > aux[key_idx]
+            # (strict=False: >= key), probing lo, lo+1, lo+3, lo+7, ... then bisecting
+            key = aux[key_idx]
+            prev, bound = lo, 1
+            while True:
+                probe = lo + bound - 1
+                if probe >= hi:
+                    high = hi
+                    break
+                self._compare(arr, stats, probe, key_idx)
+                if aux[probe] > key or (not strict and aux[probe] == key):
+                    high = probe
+                    break
+                prev = probe + 1
+                bound *= 2
+            while prev < high:
+                middle = (prev + high) // 2
+                self._compare(arr, stats, middle, key_idx)
+                if aux[middle] > key or (not strict and aux[middle] == key):
+                    high = middle
                 else:
-                    result.append(right[right_idx])
-                    right_idx += 1
-                    
-            result.extend(left[left_idx:])
-            result.extend(right[right_idx:])
-            return result
-            
-        def sort(arr: List[int], start_idx: int = 0) -> List[int]:
-            if len(arr) <= 1:
-                return arr
-                
-            mid = len(arr) // 2
-            left = sort(arr[:mid], start_idx)
-            right = sort(arr[mid:], start_idx + mid)
-            
-            result = merge(left, right, start_idx)
-            
-            # Update the original array
-            for i, val in enumerate(result):
-                arr[i] = val
-                self.update_callback(arr, stats)
-                
-            return result
-            
-        sort(arr)
-        
+                    prev = middle + 1
+            return prev
+
+        def merge(lo: int, mid: int, hi: int) -> None:
+            aux[lo:hi] = arr[lo:hi]
+            i, j, k = lo, mid, lo
+            left_wins = right_wins = 0
+            while i < mid and j < hi:
+                self._compare(arr, stats, i, j)
+                if aux[i] <= aux[j]:
+                    self._write(arr, stats, k, aux[i])
+                    i += 1
+                    k += 1
+                    left_wins += 1
+                    right_wins = 0
+                    if left_wins >= MIN_GALLOP and i < mid:
+                        # Copy every left element <= the right head in one go
+                        end = gallop(j, i, mid, strict=True)
+                        for value in aux[i:end]:
+                            self._write(arr, stats, k, value)
+                            k += 1
+                        i = end
+                        left_wins = 0
+                else:
+                    self._write(arr, stats, k, aux[j])
+                    j += 1
+                    k += 1
+                    right_wins += 1
+                    left_wins = 0
+                    if right_wins >= MIN_GALLOP and j < hi:
+                        # Copy every right element < the left head in one go
+                        end = gallop(i, j, hi, strict=False)
+                        for value in aux[j:end]:
+                            self._write(arr, stats, k, value)
+                            k += 1
+                        j = end
+                        right_wins = 0
+            for value in aux[i:mid]:
+                self._write(arr, stats, k, value)
+                k += 1
+            for value in aux[j:hi]:
+                self._write(arr, stats, k, value)
+                k += 1
+
+        n = len(arr)
+        # A real copy: arr[:] of a NumPy array would be a view of arr
+        aux = list(arr)
+        for lo in range(0, n, INSERTION_CUTOFF):
+            self._insertion_range(arr, stats, lo, min(lo + INSERTION_CUTOFF, n) - 1)
+
+        width = INSERTION_CUTOFF
+        while width < n:
+            for lo in range(0, n - width, 2 * width):
+                mid = lo + width
+                hi = min(lo + 2 * width, n)
+                # Skip the merge when the two runs are already in order
+                self._compare(arr, stats, mid - 1, mid)
+                if arr[mid - 1] > arr[mid]:
+                    merge(lo, mid, hi)
+            width *= 2
+
+        self._mark_sorted(arr, stats, 0, n)
+
+    def tim_sort(self, arr: List[int], stats: dict) -> None:
+        # Natural-run adaptive merge sort in the style of TimSort: existing
+        # ascending/descending runs are found and kept, short runs are extended
+        # to the minimum run length with binary insertion, and runs are merged
+        # through a stack that keeps the TimSort length invariants. Merges trim
+        # the parts of both runs already in place, copy out only the shorter
+        # run, and gallop once one run wins MIN_GALLOP times in a row
+        def count_run(lo: int) -> int:
+            # Length of the run starting at lo; strictly descending runs are reversed
+            if lo + 1 == n:
+                return 1
+            i = lo + 2
+            self._compare(arr, stats, lo, lo + 1)
+            if arr[lo + 1] < arr[lo]:
+                while i < n:
+                    self._compare(arr, stats, i - 1, i)
+                    if not arr[i] < arr[i - 1]:
+                        break
+                    i += 1
+                left, right = lo, i - 1
+                while left < right:
+                    self._swap(arr, stats, left, right)
+                    left += 1
+                    right -= 1
+            else:
+                while i < n:
+                    self._compare(arr, stats, i - 1, i)
+                    if arr[i] < arr[i - 1]:
+                        break
+                    i += 1
+            return i - lo
+
+        def binary_insertion(lo: int, hi: int, start: int) -> None:
+            # arr[lo:start] is sorted; insert arr[start:hi] one by one after
+            # binary searching for the position (right of equal keys)
+            for i in range(start, hi):
+                pivot = arr[i]
+                left, right = lo, i
+                while left < right:
+                    middle = (left + right) // 2
+                    self._compare(arr, stats, i, middle)
+                    if pivot < arr[middle]:
+                        right = middle
+                    else:
+                        left = middle + 1
+                for k in range(i, left, -1):
+                    self._write(arr, stats, k, arr[k - 1], counted=True)
+                if left != i:
+                    self._write(arr, stats, left, pivot)
+
+        def gallop(values: List[int], offset: int, key: int, key_idx: int, lo: int, hi: int,
+                   after_equal: bool, from_right: bool) -> int:
+            # First index in values[lo:hi] whose value is > key (after_equal) or >= key,
+            # found by exponential probing from one end and then bisecting.
+            # values[i] is drawn at arr position offset + i
+            def past(idx: int) -> bool:
+                self._compare(arr, stats, offset + idx, key_idx)
+                return key < values[idx] if after_equal else not values[idx] < key
+
+            low, high, bound = lo, hi, 1
+            if from_right:
+                while hi - bound >= lo:
+                    if not past(hi - bound):
+                        low = hi - bound + 1
+                        break
+                    high = hi - bound
+                    bound *= 2
+            else:
+                while lo + bound - 1 < hi:
+                    if past(lo + bound - 1):
+                        high = lo + bound - 1
+                        break
+                    low = lo + bound
+                    bound *= 2
+            while low < high:
+                middle = (low + high) // 2
+                if past(middle):
+                    high = middle
+                else:
+                    low = middle + 1
+            return low
+
+        def merge_at(idx: int) -> None:
+            # Merge runs idx and idx + 1 of the stack
+            base_a, len_a = run_base[idx], run_len[idx]
+            base_b, len_b = run_base[idx + 1], run_len[idx + 1]
+            run_len[idx] = len_a + len_b
+            del run_base[idx + 1], run_len[idx + 1]
+
+            # Elements of A not greater than B[0] are already in place
+            start = gallop(arr, 0, arr[base_b], base_b, base_a, base_a + len_a, True, False)
+            len_a -= start - base_a
+            base_a = start
+            if len_a == 0:
+                return
+            # So are the elements of B not less than A[-1]
+            last_a = base_a + len_a - 1
+            len_b = gallop(arr, 0, arr[last_a], last_a, base_b, base_b + len_b, False, True) - base_b
+
+            # Only the shorter run is copied out
+            if len_a <= len_b:
+                merge_lo(base_a, len_a, base_b, len_b)
+            else:
+                merge_hi(base_a, len_a, base_b, len_b)
+
+        def merge_lo(base_a: int, len_a: int, base_b: int, len_b: int) -> None:
+            # list() copies the run even when arr is a NumPy array, whose slices are views
+            temp = list(arr[base_a:base_a + len_a])
+            i, j, k = 0, base_b, base_a
+            end_b = base_b + len_b
+            a_wins = b_wins = 0
+            while i < len_a and j < end_b:
+                self._compare(arr, stats, k, j)
+                if arr[j] < temp[i]:
+                    self._write(arr, stats, k, arr[j])
+                    j += 1
+                    k += 1
+                    b_wins += 1
+                    a_wins = 0
+                    if b_wins >= MIN_GALLOP and j < end_b:
+                        # Move every B element < the A head in one go
+                        end = gallop(arr, 0, temp[i], k, j, end_b, False, False)
+                        for src in range(j, end):
+                            self._write(arr, stats, k, arr[src])
+                            k += 1
+                        j = end
+                        b_wins = 0
+                else:
+                    self._write(arr, stats, k, temp[i])
+                    i += 1
+                    k += 1
+                    a_wins += 1
+                    b_wins = 0
+                    if a_wins >= MIN_GALLOP and i < len_a:
+                        # Copy every A element <= the B head in one go
+                        end = gallop(temp, base_a, arr[j], j, i, len_a, True, False)
+                        for value in temp[i:end]:
+                            self._write(arr, stats, k, value)
+                            k += 1
+                        i = end
+                        a_wins = 0
+            for value in temp[i:]:
+                self._write(arr, stats, k, value)
+                k += 1
+
+        def merge_hi(base_a: int, len_a: int, base_b: int, len_b: int) -> None:
+            temp = list(arr[base_b:base_b + len_b])
+            i, j, k = base_a + len_a - 1, len_b - 1, base_b + len_b - 1
+            a_wins = b_wins = 0
+            while i >= base_a and j >= 0:
+                self._compare(arr, stats, i, k)
+                if temp[j] < arr[i]:
+                    self._write(arr, stats, k, arr[i])
+                    i -= 1
+                    k -= 1
+                    a_wins += 1
+                    b_wins = 0
+                    if a_wins >= MIN_GALLOP and i >= base_a:
+                        # Move every A element > the B tail in one go
+                        start = gallop(arr, 0, temp[j], k, base_a, i + 1, True, True)
+                        for src in range(i, start - 1, -1):
+                            self._write(arr, stats, k, arr[src])
+                            k -= 1
+                        i = start - 1
+                        a_wins = 0
+                else:
+                    self._write(arr, stats, k, temp[j])
+                    j -= 1
+                    k -= 1
+                    b_wins += 1
+                    a_wins = 0
+                    if b_wins >= MIN_GALLOP and j >= 0:
+                        # Copy every B element >= the A tail in one go
+                        start = gallop(temp, base_b, arr[i], i, 0, j + 1, False, True)
+                        for value in reversed(temp[start:j + 1]):
+                            self._write(arr, stats, k, value)
+                            k -= 1
+                        j = start - 1
+                        b_wins = 0
+            for value in temp[:j + 1]:
+                self._write(arr, stats, base_a, value)
+                base_a += 1
+
+        def merge_collapse() -> None:
+            # Restore the invariants len[-3] > len[-2] + len[-1] and len[-2] > len[-1]
+            while len(run_len) > 1:
+                idx = len(run_len) - 2
+                if ((idx > 0 and run_len[idx - 1] <= run_len[idx] + run_len[idx + 1]) or
+                        (idx > 1 and run_len[idx - 2] <= run_len[idx - 1] + run_len[idx])):
+                    if run_len[idx - 1] < run_len[idx + 1]:
+                        idx -= 1
+                elif run_len[idx] > run_len[idx + 1]:
+                    break
+                merge_at(idx)
+
+        n = len(arr)
+        min_run = min_run_length(n)
+        run_base: List[int] = []
+        run_len: List[int] = []
+        lo = 0
+        while lo < n:
+            length = count_run(lo)
+            if length < min_run:
+                forced = min(min_run, n - lo)
+                binary_insertion(lo, lo + forced, lo + length)
+                length = forced
+            run_base.append(lo)
+            run_len.append(length)
+            merge_collapse()
+            lo += length
+
+        while len(run_len) > 1:
+            idx = len(run_len) - 2
+            if idx > 0 and run_len[idx - 1] < run_len[idx + 1]:
+                idx -= 1
+            merge_at(idx)
+
+        self._mark_sorted(arr, stats, 0, n)
+
     def quick_sort(self, arr: List[int], stats: dict) -> None:
         def partition(low: int, high: int) -> int:
             pivot = arr[high]
             i = low - 1
-            
+
             for j in range(low, high):
-                stats["comparisons"] += 1
-                self.update_callback(arr, stats)
-                
+                self._compare(arr, stats, j, high)
+
                 if arr[j] < pivot:
                     i += 1
-                    arr[i], arr[j] = arr[j], arr[i]
-                    stats["swaps"] += 1
-                    self.update_callback(arr, stats)
-                    
-            arr[i + 1], arr[high] = arr[high], arr[i + 1]
-            stats["swaps"] += 1
-            self.update_callback(arr, stats)
+                    self._swap(arr, stats, i, j)
+
+            self._swap(arr, stats, i + 1, high)
             return i + 1
-            
+
         def sort(low: int, high: int) -> None:
             if low < high:
                 pi = partition(low, high)
                 sort(low, pi - 1)
                 sort(pi + 1, high)
-                
+
         sort(0, len(arr) - 1)
-        
-    def heap_sort(self, arr: List[int], stats: dict) -> None:
-        def heapify(n: int, i: int) -> None:
-            largest = i
-            left = 2 * i + 1
-            right = 2 * i + 2
-            
-            if left < n:
-                stats["comparisons"] += 1
-                self.update_callback(arr, stats)
-                if arr[left] > arr[largest]:
-                    largest = left
-                    
-            if right < n:
-                stats["comparisons"] += 1
-                self.update_callback(arr, stats)
-                if arr[right] > arr[largest]:
-                    largest = right
-                    
-            if largest != i:
-                arr[i], arr[largest] = arr[largest], arr[i]
-                stats["swaps"] += 1
-                self.update_callback(arr, stats)
-                heapify(n, largest)
-                
+        self._mark_sorted(arr, stats, 0, len(arr))
+
+    def intro_sort(self, arr: List[int], stats: dict) -> None:
+        self._intro_range(arr, stats, 0, len(arr) - 1)
+        self._mark_sorted(arr, stats, 0, len(arr))
+
+    def _intro_range(self, arr: List[int], stats: dict, low: int, high: int) -> None:
+        # Production quicksort of arr[low..high] (inclusive): ninther/median-of-three
+        # pivots, three-way partitioning, sorting networks for small ranges, heapsort
+        # once recursion gets too deep, and an explicit stack instead of recursion
+        def median_of_three(a: int, b: int, c: int) -> int:
+            self._compare(arr, stats, a, b)
+            if arr[a] < arr[b]:
+                self._compare(arr, stats, b, c)
+                if arr[b] < arr[c]:
+                    return b
+                self._compare(arr, stats, a, c)
+                return c if arr[a] < arr[c] else a
+            self._compare(arr, stats, a, c)
+            if arr[a] < arr[c]:
+                return a
+            self._compare(arr, stats, b, c)
+            return c if arr[b] < arr[c] else b
+
+        def choose_pivot(low: int, high: int) -> int:
+            mid = low + (high - low) // 2
+            if high - low + 1 < NINTHER_THRESHOLD:
+                return median_of_three(low, mid, high)
+            step = (high - low + 1) // 8
+            return median_of_three(
+                median_of_three(low, low + step, low + 2 * step),
+                median_of_three(mid - step, mid, mid + step),
+                median_of_three(high - 2 * step, high - step, high)
+            )
+
+        def heap_fallback(low: int, high: int) -> None:
+            def sift_down(root: int, end: int) -> None:
+                while True:
+                    child = 2 * root + 1
+                    if child >= end:
+                        return
+                    if child + 1 < end:
+                        self._compare(arr, stats, low + child, low + child + 1)
+                        if arr[low + child] < arr[low + child + 1]:
+                            child += 1
+                    self._compare(arr, stats, low + root, low + child)
+                    if arr[low + root] >= arr[low + child]:
+                        return
+                    self._swap(arr, stats, low + root, low + child)
+                    root = child
+
+            size = high - low + 1
+            for start in range(size // 2 - 1, -1, -1):
+                sift_down(start, size)
+            for end in range(size - 1, 0, -1):
+                self._swap(arr, stats, low, low + end)
+                sift_down(0, end)
+
+        size = high - low + 1
+        stack = [(low, high, 2 * int(math.log2(size)) if size > 1 else 0)]
+        while stack:
+            low, high, depth = stack.pop()
+            if high - low + 1 <= NETWORK_CUTOFF:
+                self._network_range(arr, stats, low, high)
+                continue
+            if depth == 0:
+                heap_fallback(low, high)
+                continue
+
+            pivot_idx = choose_pivot(low, high)
+            if pivot_idx != low:
+                self._swap(arr, stats, low, pivot_idx)
+            pivot = arr[low]
+
+            # Dutch flag partition: [low, lt) < pivot, [lt, i) == pivot, (gt, high] > pivot
+            lt, i, gt = low, low + 1, high
+            while i <= gt:
+                self._compare(arr, stats, i, lt)
+                if arr[i] < pivot:
+                    self._swap(arr, stats, lt, i)
+                    lt += 1
+                    i += 1
+                    continue
+                self._compare(arr, stats, i, lt)
+                if arr[i] > pivot:
+                    if i != gt:
+                        self._swap(arr, stats, i, gt)
+                    gt -= 1
+                else:
+                    i += 1
+
+            # Push the larger side first so the smaller one is handled next
+            sides = [(low, lt - 1), (gt + 1, high)]
+            sides.sort(key=lambda side: side[1] - side[0], reverse=True)
+            for side_low, side_high in sides:
+                if side_low < side_high:
+                    stack.append((side_low, side_high, depth - 1))
+
+    def network_sort(self, arr: List[int], stats: dict, network: str = "best") -> None:
+        # Run one comparator network over the whole array: the best known
+        # network up to 16 elements, otherwise Batcher's odd-even merge sort
+        # (O(n log^2 n) comparisons whatever the input)
+        self._run_network(arr, stats, 0, get_network(network, len(arr)))
+        self._mark_sorted(arr, stats, 0, len(arr))
+
+    def heap_sort(self, arr: List[int], stats: dict, arity: int = 2) -> None:
+        # Iterative heap sort on a max-heap with ``arity`` children per node.
+        # Sifting is Floyd's bottom-up variant: the hole left by the root walks
+        # down the path of larger children to a leaf without comparing against
+        # the sifted value, which then climbs back up the usually short distance
+        if arity < 2:
+            raise ValueError("arity must be at least 2")
+
+        def sift_down(root: int, end: int) -> None:
+            value = arr[root]
+            hole = root
+            child = arity * hole + 1
+            while child < end:
+                largest = child
+                for k in range(child + 1, min(child + arity, end)):
+                    self._compare(arr, stats, k, largest)
+                    if arr[k] > arr[largest]:
+                        largest = k
+                self._write(arr, stats, hole, arr[largest], counted=True)
+                hole = largest
+                child = arity * hole + 1
+            if hole == root:
+                return
+            self._write(arr, stats, hole, value)
+            while hole > root:
+                parent = (hole - 1) // arity
+                self._compare(arr, stats, hole, parent)
+                if not arr[hole] > arr[parent]:
+                    break
+                self._swap(arr, stats, hole, parent)
+                hole = parent
+
         n = len(arr)
-        
+
         # Build max heap
-        for i in range(n // 2 - 1, -1, -1):
-            heapify(n, i)
-            
+        for i in range((n - 2) // arity, -1, -1):
+            sift_down(i, n)
+
         # Extract elements one by one
         for i in range(n - 1, 0, -1):
-            arr[0], arr[i] = arr[i], arr[0]
-            stats["swaps"] += 1
-            self.update_callback(arr, stats)
-            heapify(i, 0)
-            
+            self._swap(arr, stats, 0, i)
+            self._mark_sorted(arr, stats, i, n)
+            sift_down(0, i)
+
+        self._mark_sorted(arr, stats, 0, n)
+
     def counting_sort(self, arr: List[int], stats: dict) -> None:
-        max_val = max(arr)
-        min_val = min(arr)
-        range_of_elements = max_val - min_val + 1
-        
-        count = [0] * range_of_elements
-        output = [0] * len(arr)
-        
-        # Store count of each element
-        for i in range(len(arr)):
-            count[arr[i] - min_val] += 1
-            self.update_callback(arr, stats)
-            
-        # Change count[i] so that it contains actual position
-        for i in range(1, len(count)):
-            count[i] += count[i - 1]
-            
-        # Build the output array
-        for i in range(len(arr) - 1, -1, -1):
-            output[count[arr[i] - min_val] - 1] = arr[i]
-            count[arr[i] - min_val] -= 1
-            stats["swaps"] += 1
-            self.update_callback(arr, stats)
-            
-        # Copy the output array to arr
-        for i in range(len(arr)):
-            arr[i] = output[i]
-            self.update_callback(arr, stats)
-            
-    def radix_sort(self, arr: List[int], stats: dict) -> None:
-        def counting_sort_for_radix(exp: int) -> None:
-            n = len(arr)
-            output = [0] * n
-            count = [0] * 10
-            
-            # Store count of occurrences
-            for i in range(n):
-                index = (arr[i] // exp) % 10
-                count[index] += 1
-                self.update_callback(arr, stats)
-                
+        # Counting sort whose auxiliary memory stays O(n): the value range is
+        # compared with n up front to pick a dense count array, a hash-map
+        # histogram (wide range but few distinct keys) or a delegate to
+        # radix_sort. The estimated auxiliary bytes go to stats["memory_bytes"]
+        n = len(arr)
+        if n == 0:
+            stats["memory_bytes"] = 0
+            self._mark_sorted(arr, stats, 0, n)
+            return
+
+        # Python ints, so the range and offsets of NumPy input cannot overflow its dtype
+        keys = [operator.index(value) for value in arr]
+        min_val = min(keys)
+        max_val = max(keys)
+        strategy = counting_strategy(keys, min_val, max_val)
+        if strategy == "radix":
+            self.radix_sort(arr, stats)
+            stats["memory_bytes"] = (n + (1 << RADIX_BITS_CHOICES[0])) * 8
+            return
+
+        output = [0] * n
+        if strategy == "dense":
+            count = array("q", bytes(8 * (max_val - min_val + 1)))
+
+            # Store count of each element
+            for value in keys:
+                count[value - min_val] += 1
+
             # Change count[i] so that it contains actual position
-            for i in range(1, 10):
+            for i in range(1, len(count)):
                 count[i] += count[i - 1]
-                
+
             # Build the output array
             for i in range(n - 1, -1, -1):
-                index = (arr[i] // exp) % 10
-                output[count[index] - 1] = arr[i]
-                count[index] -= 1
-                stats["swaps"] += 1
-                self.update_callback(arr, stats)
-                
-            # Copy the output array to arr
+                output[count[keys[i] - min_val] - 1] = keys[i]
+                count[keys[i] - min_val] -= 1
+            stats["memory_bytes"] = (len(count) + n) * 8
+        else:
+            histogram = {}
+            for value in keys:
+                histogram[value] = histogram.get(value, 0) + 1
+            keys = list(histogram)
+            lsd_radix_sort(keys)
+            index = 0
+            for key in keys:
+                for _ in range(histogram[key]):
+                    output[index] = key
+                    index += 1
+            # A dict entry holds a hash, a key and a value pointer; plus the key list
+            stats["memory_bytes"] = (4 * len(keys) + n) * 8
+
+        # Copy the output array to arr; each placement counts as a swap
+        for i in range(n):
+            self._write(arr, stats, i, output[i], counted=True)
+
+        self._mark_sorted(arr, stats, 0, n)
+
+    def radix_sort(self, arr: List[int], stats: dict, radix_bits: int = 8) -> None:
+        # LSD radix sort on 2**radix_bits-sized digits. Keys are offset by the
+        # minimum, so negative values sort correctly and narrow ranges need
+        # fewer passes; passes where every key has the same digit are skipped.
+        # Each pass scatters into one scratch buffer allocated up front and is
+        # then copied back so the visualizer can show it
+        if radix_bits not in RADIX_BITS_CHOICES:
+            raise ValueError(f"radix_bits must be one of {RADIX_BITS_CHOICES}")
+        n = len(arr)
+        if n < 2:
+            self._mark_sorted(arr, stats, 0, n)
+            return
+
+        # Python ints, so offsets from the minimum cannot overflow a NumPy dtype
+        keys = [operator.index(value) for value in arr]
+        min_val = min(keys)
+        max_key = max(keys) - min_val
+        radix = 1 << radix_bits
+        mask = radix - 1
+        scratch = [0] * n
+        shift = 0
+        while max_key >> shift:
+            count = [0] * radix
+            for value in keys:
+                count[((value - min_val) >> shift) & mask] += 1
+            if max(count) == n:
+                shift += radix_bits
+                continue
+
+            # Turn the counts into the first output position of each digit
+            position = 0
+            for digit in range(radix):
+                count[digit], position = position, position + count[digit]
+            for value in keys:
+                digit = ((value - min_val) >> shift) & mask
+                scratch[count[digit]] = value
+                count[digit] += 1
+
+            # Copy the pass back to arr; each placement counts as a swap
             for i in range(n):
-                arr[i] = output[i]
-                self.update_callback(arr, stats)
-                
-        max_val = max(arr)
-        exp = 1
-        
-        while max_val // exp > 0:
-            counting_sort_for_radix(exp)
-            exp *= 10
-            
+                self._write(arr, stats, i, scratch[i], counted=True)
+            keys, scratch = scratch, keys
+            shift += radix_bits
+
+        self._mark_sorted(arr, stats, 0, n)
+
     def bucket_sort(self, arr: List[int], stats: dict) -> None:
-        if not arr:
+        # Buckets are bounded by splitters taken from sampled quantiles, so
+        # skewed data still fills them evenly, and only comparisons are used
+        # (float keys and equal values are fine). There are 2**k buckets, so
+        # the binary search over the 2**k - 1 splitters always takes k
+        # comparisons. Buckets live in one flat buffer indexed by offsets and
+        # are each finished with intro sort
+        n = len(arr)
+        if n < 2:
+            self._mark_sorted(arr, stats, 0, n)
             return
-            
-        # Find maximum and minimum values
-        max_val = max(arr)
-        min_val = min(arr)
-        range_of_elements = max_val - min_val
-        
-        # Create buckets
-        bucket_size = range_of_elements / len(arr)
-        buckets = [[] for _ in range(len(arr))]
-        
-        # Distribute elements into buckets
-        for i in range(len(arr)):
-            index = min(int((arr[i] - min_val) / bucket_size), len(arr) - 1)
-            buckets[index].append(arr[i])
-            self.update_callback(arr, stats)
-            
-        # Sort individual buckets
-        for i in range(len(buckets)):
-            if buckets[i]:
-                # Use insertion sort for each bucket
-                for j in range(1, len(buckets[i])):
-                    key = buckets[i][j]
-                    k = j - 1
-                    while k >= 0 and buckets[i][k] > key:
-                        buckets[i][k + 1] = buckets[i][k]
-                        k -= 1
-                        stats["comparisons"] += 1
-                        stats["swaps"] += 1
-                        self.update_callback(arr, stats)
-                    buckets[i][k + 1] = key
-                    
-        # Concatenate all buckets
-        index = 0
-        for bucket in buckets:
-            for item in bucket:
-                arr[index] = item
-                index += 1
-                self.update_callback(arr, stats) 
\ No newline at end of file
+
+        bucket_count = 1 << max(0, (n // BUCKET_SIZE).bit_length() - 1)
+        # Splitters are shown and traced as comparisons with the elements they were taken from
+        positions, _ = bucket_splitter_positions(arr, bucket_count,
+                                                 compare=lambda i, j: self._compare(arr, stats, i, j))
+        splitters = [arr[position] for position in positions]
+
+        # Bucket of every element, found by binary search over the splitters
+        bucket_of = []
+        for i, value in enumerate(arr):
+            low, high = 0, len(splitters)
+            while low < high:
+                middle = (low + high) // 2
+                self._compare(arr, stats, i, positions[middle])
+                if value < splitters[middle]:
+                    high = middle
+                else:
+                    low = middle + 1
+            bucket_of.append(low)
+
+        # Bucket b occupies offsets[b]:offsets[b + 1] of the flat buffer
+        offsets = array("q", bytes(8 * (bucket_count + 1)))
+        for bucket in bucket_of:
+            offsets[bucket + 1] += 1
+        for bucket in range(bucket_count):
+            offsets[bucket + 1] += offsets[bucket]
+        position = array("q", offsets)
+        buffer = [None] * n
+        for value, bucket in zip(arr, bucket_of):
+            buffer[position[bucket]] = value
+            position[bucket] += 1
+
+        # Copy the buckets back to arr; each placement counts as a swap
+        for i in range(n):
+            self._write(arr, stats, i, buffer[i], counted=True)
+
+        for bucket in range(bucket_count):
+            low, high = offsets[bucket], offsets[bucket + 1]
+            if high - low > 1:
+                self._intro_range(arr, stats, low, high - 1)
+            self._mark_sorted(arr, stats, low, high)
+
+        self._mark_sorted(arr, stats, 0, n)
+
+    def _heap_select(self, arr: List[int], stats: dict, low: int, middle: int, high: int,
+                     sort_heap: bool = False) -> None:
+        # Bounded heap selection: leave the middle - low smallest elements of
+        # arr[low..high] (inclusive) in arr[low:middle] as a binary max-heap,
+        # so arr[low] is the largest of them. Each later element costs one
+        # comparison with that root and is sifted in only when smaller, for
+        # O((high - low) log(middle - low)) comparisons; sort_heap then heap
+        # sorts arr[low:middle]
+        def sift_down(root: int, end: int) -> None:
+            while True:
+                child = 2 * root + 1
+                if child >= end:
+                    return
+                if child + 1 < end:
+                    self._compare(arr, stats, low + child, low + child + 1)
+                    if arr[low + child] < arr[low + child + 1]:
+                        child += 1
+                self._compare(arr, stats, low + root, low + child)
+                if arr[low + root] >= arr[low + child]:
+                    return
+                self._swap(arr, stats, low + root, low + child)
+                root = child
+
+        size = middle - low
+        for start in range(size // 2 - 1, -1, -1):
+            sift_down(start, size)
+        for i in range(middle, high + 1):
+            self._compare(arr, stats, i, low)
+            if arr[i] < arr[low]:
+                self._swap(arr, stats, low, i)
+                sift_down(0, size)
+        if sort_heap:
+            for end in range(size - 1, 0, -1):
+                self._swap(arr, stats, low, low + end)
+                self._mark_sorted(arr, stats, low + end, middle)
+                sift_down(0, end)
+
+    def partial_sort(self, arr: List[int], stats: dict, k: int) -> None:
+        # Sort only the k smallest elements into arr[:k]; arr[k:] keeps the
+        # rest in no particular order. A bounded max-heap of the k smallest
+        # seen so far is kept over one scan and then heap sorted: O(n log k)
+        n = len(arr)
+        if not 0 <= k <= n:
+            raise ValueError(f"k must be between 0 and {n}")
+        if k:
+            self._heap_select(arr, stats, 0, k, n - 1, sort_heap=True)
+        self._mark_sorted(arr, stats, 0, k)
+
+    def select_kth(self, arr: List[int], stats: dict, k: int) -> None:
+        # Rearrange arr so arr[k] holds the value sorting would put there, with
+        # nothing larger before it and nothing smaller after it (nth_element).
+        # Floyd-Rivest: a range longer than FLOYD_RIVEST_CUTOFF first selects
+        # k within a sample-sized window around it, so the partition pivot
+        # arr[k] lands very close to rank k and most of the range is discarded
+        # at once; expected n + min(k, n - k) + o(n) comparisons. As in
+        # introselect, a range still open after 2 log2(size) partitions is
+        # finished with a bounded heap. Each pivot is marked as it settles
+        n = len(arr)
+        if not 0 <= k < n:
+            raise ValueError(f"k must be between 0 and {n - 1}")
+
+        def select(left: int, right: int) -> None:
+            depth = 2 * (right - left + 1).bit_length()
+            while right > left:
+                if depth == 0:
+                    self._heap_select(arr, stats, left, k + 1, right)
+                    if k != left:
+                        self._swap(arr, stats, left, k)
+                    return
+                depth -= 1
+                if right - left > FLOYD_RIVEST_CUTOFF:
+                    size = right - left + 1
+                    rank = k - left + 1
+                    z = math.log(size)
+                    s = 0.5 * math.exp(2 * z / 3)
+                    sd = 0.5 * math.sqrt(z * s * (size - s) / size) * (-1 if 2 * rank < size else 1)
+                    select(max(left, int(k - rank * s / size + sd)),
+                           min(right, int(k + (size - rank) * s / size + sd)))
+
+                # Partition arr[left..right] around t = arr[k]. The pivot sits at
+                # one end and the other end holds a value on the far side of it,
+                # so both scans stop without bounds checks
+                if k != left:
+                    self._swap(arr, stats, left, k)
+                t = arr[left]
+                pivot = left
+                self._compare(arr, stats, right, left)
+                if arr[right] > t:
+                    self._swap(arr, stats, left, right)
+                    pivot = right
+                # The first exchange below swaps the two ends
+                pivot = left + right - pivot
+                i, j = left, right
+                while i < j:
+                    self._swap(arr, stats, i, j)
+                    i += 1
+                    j -= 1
+                    while True:
+                        self._compare(arr, stats, i, pivot)
+                        if not arr[i] < t:
+                            break
+                        i += 1
+                    while True:
+                        self._compare(arr, stats, j, pivot)
+                        if not arr[j] > t:
+                            break
+                        j -= 1
+                if pivot == left:
+                    if j != left:
+                        self._swap(arr, stats, left, j)
+                else:
+                    j += 1
+                    if j != right:
+                        self._swap(arr, stats, j, right)
+                self._mark_sorted(arr, stats, j, j + 1)
+
+                if j <= k:
+                    left = j + 1
+                if k <= j:
+                    right = j - 1
+
+        select(0, n - 1)
+        self._mark_sorted(arr, stats, k, k + 1)
@@ -0,0 +1,186 @@
+"""Comparator networks for sorting small fixed-size arrays.
+
+A network is a tuple of layers; each layer is a tuple of (i, j) comparators
+with i < j that touch disjoint positions, so a whole layer can run at once.
+A comparator leaves min(a[i], a[j]) at i and the maximum at j. Networks are
+data-independent: sorting n elements always takes the same comparators.
+
+Networks up to NETWORK_MAX_SIZE inputs are cached, and network_sorter()
+compiles them into straight-line functions with no loops or index
+arithmetic, which the engines use as their small-range base case.
+"""
+import functools
+from typing import Callable, List, Tuple
+
+Comparator = Tuple[int, int]
+Network = Tuple[Tuple[Comparator, ...], ...]
+
+# Networks are cached and compiled for up to this many inputs
+NETWORK_MAX_SIZE = 32
+
+# Best known networks (fewest comparators) for 2..16 inputs, from Knuth's
+# TAOCP vol. 3 and later searches. 15 inputs reuse the 16-input network.
+_BEST_KNOWN = {
+    2: [[(0, 1)]],
+    3: [[(0, 2)], [(0, 1)], [(1, 2)]],
+    4: [[(0, 2), (1, 3)], [(0, 1), (2, 3)], [(1, 2)]],
+    5: [[(0, 3), (1, 4)], [(0, 2), (1, 3)], [(0, 1), (2, 4)], [(1, 2), (3, 4)], [(2, 3)]],
+    6: [[(0, 5), (1, 3), (2, 4)], [(1, 2), (3, 4)], [(0, 3), (2, 5)], [(0, 1), (2, 3), (4, 5)], [(1, 2), (3, 4)]],
+    7: [[(0, 6), (2, 3), (4, 5)], [(0, 2), (1, 4), (3, 6)], [(0, 1), (2, 5), (3, 4)], [(1, 2), (4, 6)],
+        [(2, 3), (4, 5)], [(1, 2), (3, 4), (5, 6)]],
+    8: [[(0, 2), (1, 3), (4, 6), (5, 7)], [(0, 4), (1, 5), (2, 6), (3, 7)], [(0, 1), (2, 3), (4, 5), (6, 7)],
+        [(2, 4), (3, 5)], [(1, 4), (3, 6)], [(1, 2), (3, 4), (5, 6)]],
+    9: [[(0, 3), (1, 7), (2, 5), (4, 8)], [(0, 7), (2, 4), (3, 8), (5, 6)], [(0, 2), (1, 3), (4, 5), (7, 8)],
+        [(1, 4), (3, 6), (5, 7)], [(0, 1), (2, 4), (3, 5), (6, 8)], [(2, 3), (4, 5), (6, 7)],
+        [(1, 2), (3, 4), (5, 6)]],
+    10: [[(0, 8), (1, 9), (2, 7), (3, 5), (4, 6)], [(0, 2), (1, 4), (5, 8), (7, 9)],
+         [(0, 3), (2, 4), (5, 7), (6, 9)], [(0, 1), (3, 6), (8, 9)], [(1, 5), (2, 3), (4, 8), (6, 7)],
+         [(1, 2), (3, 5), (4, 6), (7, 8)], [(2, 3), (4, 5), (6, 7)], [(3, 4), (5, 6)]],
+    11: [[(0, 9), (1, 6), (2, 4), (3, 7), (5, 8)], [(0, 1), (3, 5), (4, 10), (6, 9), (7, 8)],
+         [(1, 3), (2, 5), (4, 7), (8, 10)], [(0, 4), (1, 2), (3, 7), (5, 9), (6, 8)],
+         [(0, 1), (2, 6), (4, 5), (7, 8), (9, 10)], [(2, 4), (3, 6), (5, 7), (8, 9)],
+         [(1, 2), (3, 4), (5, 6), (7, 8)], [(2, 3), (4, 5), (6, 7)]],
+    12: [[(0, 8), (1, 7), (2, 6), (3, 11), (4, 10), (5, 9)], [(0, 1), (2, 5), (3, 4), (6, 9), (7, 8), (10, 11)],
+         [(0, 2), (1, 6), (5, 10), (9, 11)], [(0, 3), (1, 2), (4, 6), (5, 7), (8, 11), (9, 10)],
+         [(1, 4), (3, 5), (6, 8), (7, 10)], [(1, 3), (2, 5), (6, 9), (8, 10)], [(2, 3), (4, 5), (6, 7), (8, 9)],
+         [(4, 6), (5, 7)], [(3, 4), (5, 6), (7, 8)]],
+    13: [[(0, 12), (1, 10), (2, 9), (3, 7), (5, 11), (6, 8)], [(1, 6), (2, 3), (4, 11), (7, 9), (8, 10)],
+         [(0, 4), (1, 2), (3, 6), (7, 8), (9, 10), (11, 12)], [(4, 6), (5, 9), (8, 11), (10, 12)],
+         [(0, 5), (3, 8), (4, 7), (6, 11), (9, 10)], [(0, 1), (2, 5), (6, 9), (7, 8), (10, 11)],
+         [(1, 3), (2, 4), (5, 6), (9, 10)], [(1, 2), (3, 4), (5, 7), (6, 8)], [(2, 3), (4, 5), (6, 7), (8, 9)],
+         [(3, 4), (5, 6)]],
+    14: [[(0, 1), (2, 3), (4, 5), (6, 7), (8, 9), (10, 11), (12, 13)],
+         [(0, 2), (1, 3), (4, 8), (5, 9), (10, 12), (11, 13)],
+         [(0, 4), (1, 2), (3, 7), (5, 8), (6, 10), (9, 13), (11, 12)],
+         [(0, 6), (1, 5), (3, 9), (4, 10), (7, 13), (8, 12)], [(2, 10), (3, 11), (4, 6), (7, 9)],
+         [(1, 3), (2, 8), (5, 11), (6, 7), (10, 12)], [(1, 4), (2, 6), (3, 5), (7, 11), (8, 10), (9, 12)],
+         [(2, 4), (3, 6), (5, 8), (7, 10), (9, 11)], [(3, 4), (5, 6), (7, 8), (9, 10)], [(6, 7)]],
+    16: [[(0, 13), (1, 12), (2, 15), (3, 14), (4, 8), (5, 6), (7, 11), (9, 10)],
+         [(0, 5), (1, 7), (2, 9), (3, 4), (6, 13), (8, 14), (10, 15), (11, 12)],
+         [(0, 1), (2, 3), (4, 5), (6, 8), (7, 9), (10, 11), (12, 13), (14, 15)],
+         [(0, 2), (1, 3), (4, 10), (5, 11), (6, 7), (8, 9), (12, 14), (13, 15)],
+         [(1, 2), (3, 12), (4, 6), (5, 7), (8, 10), (9, 11), (13, 14)],
+         [(1, 4), (2, 6), (5, 8), (7, 10), (9, 13), (11, 14)], [(2, 4), (3, 6), (9, 12), (11, 13)],
+         [(3, 5), (6, 8), (7, 9), (10, 12)], [(3, 4), (5, 6), (7, 8), (9, 10), (11, 12)], [(6, 7), (8, 9)]],
+}
+
+
+def _layers(n: int, layers) -> Network:
+    # Drop comparators that touch padding positions >= n, then empty layers.
+    # Every comparator moves the maximum up, so padding with +inf past n
+    # never moves and those comparators are no-ops.
+    network = []
+    for layer in layers:
+        kept = tuple((i, j) for i, j in layer if j < n)
+        if kept:
+            network.append(kept)
+    return tuple(network)
+
+
+def odd_even_transposition_network(n: int) -> Network:
+    """n rounds alternately comparing (even, odd) and (odd, even) neighbours: n(n-1)/2 comparators"""
+    return _layers(n, ([(i, i + 1) for i in range(start % 2, n - 1, 2)] for start in range(n)))
+
+
+def bitonic_network(n: int) -> Network:
+    """Batcher's bitonic sorter in its one-directional form, depth log2(p)(log2(p)+1)/2 for p = 2**ceil(log2 n)"""
+    size = 1
+    while size < n:
+        size *= 2
+    layers = []
+    block = 2
+    while block <= size:
+        # Fold each block onto its mirror image, then half-clean down to neighbours
+        layers.append([(i, i ^ (block - 1)) for i in range(size) if not i & (block // 2)])
+        distance = block // 4
+        while distance:
+            layers.append([(i, i ^ distance) for i in range(size) if not i & distance])
+            distance //= 2
+        block *= 2
+    return _layers(n, layers)
+
+
+def odd_even_merge_network(n: int) -> Network:
+    """Batcher's odd-even merge sort for any n (Knuth's merge exchange), O(n log^2 n) comparators"""
+    layers = []
+    top = 1
+    while top < n:
+        top *= 2
+    top //= 2
+    p = top
+    while p:
+        # Merge sorted blocks of p: compare i with i + d for every i whose p bit equals r
+        q, r, d = top, 0, p
+        while True:
+            layers.append([(i, i + d) for i in range(n - d) if i & p == r])
+            if q == p:
+                break
+            d, q, r = q - p, q // 2, p
+        p //= 2
+    return _layers(n, layers)
+
+
+def best_network(n: int) -> Network:
+    """Best known network for n <= 16, otherwise Batcher's odd-even merge network"""
+    if n < 2:
+        return ()
+    if n <= 16:
+        return _layers(n, _BEST_KNOWN.get(n, _BEST_KNOWN[16]))
+    return odd_even_merge_network(n)
+
+
+NETWORKS = {
+    "best": best_network,
+    "odd-even-merge": odd_even_merge_network,
+    "bitonic": bitonic_network,
+    "odd-even-transposition": odd_even_transposition_network,
+}
+
+
+def network_size(network: Network) -> int:
+    """Number of comparators, i.e. comparisons made by one run of the network"""
+    return sum(len(layer) for layer in network)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_network(name: str, n: int) -> Network:
+    return NETWORKS[name](n)
+
+
+def get_network(name: str, n: int) -> Network:
+    """Network ``name`` for n inputs; networks up to NETWORK_MAX_SIZE are built once and cached"""
+    if name not in NETWORKS:
+        raise ValueError(f"Unknown sorting network: {name}")
+    if n <= NETWORK_MAX_SIZE:
+        return _cached_network(name, n)
+    return NETWORKS[name](n)
+
+
+@functools.lru_cache(maxsize=None)
+def network_sorter(name: str, n: int) -> Callable[[List, int], int]:
+    """Compile network ``name`` for n inputs into ``sort(arr, lo) -> swaps``.
+
+    The generated function loads arr[lo:lo + n] into locals, runs every
+    comparator as one compare-and-exchange with no loop or indexing, and
+    stores the values back. It returns how many comparators exchanged
+    their inputs; the comparisons made are always network_size().
+    """
+    if n > NETWORK_MAX_SIZE:
+        raise ValueError(f"network sorters are compiled for at most {NETWORK_MAX_SIZE} inputs, not {n}")
+    network = get_network(name, n)
+    if not network:
+        return lambda arr, lo: 0
+    names = ", ".join(f"v{k}" for k in range(n))
+    lines = ["def sort(arr, lo):",
+             f"    {names}, = arr[lo:lo + {n}]",
+             "    swaps = 0"]
+    for layer in network:
+        for i, j in layer:
+            lines += [f"    if v{i} > v{j}:",
+                      f"        v{i}, v{j} = v{j}, v{i}",
+                      "        swaps += 1"]
+    lines += [f"    arr[lo:lo + {n}] = {names},",
+              "    return swaps"]
+    namespace = {}
+    exec(compile("\n".join(lines), f"<{name} network for {n}>", "exec"), namespace)
+    return namespace["sort"]
@@ -1,12 +1,18 @@
 import customtkinter as ctk
-import random
 import time
 import threading
+import queue
 from PIL import Image, ImageDraw
 import numpy as np
 from typing import List, Tuple, Optional
 import math
-from sorting_algorithms import SortingAlgorithms
+from concurrent.futures import ProcessPoolExecutor
+from tkinter import filedialog
+from array_io import load_array, parse_numbers
+from sorting_algorithms import STABLE_ALGORITHMS, SortingAlgorithms
+from benchmark import benchmark_sort, compare_results
+from distributions import DISTRIBUTIONS, generate_array
+from sort_trace import SortTrace, TraceStream, TracePlayer, COMPARE, SWAP, WRITE
 import os
 from datetime import datetime
 
@@ -23,9 +29,15 @@ class SortingVisualizer:
         # Variables
         self.array = []
         self.array_size = ctk.IntVar(value=20)
+        # k for Select Kth (the k-th smallest) and Partial Sort (the k smallest)
+        self.selection_k = ctk.IntVar(value=5)
         self.sorting_speed = ctk.IntVar(value=50)
         self.is_sorting = False
+        # Set while the replay is running, cleared while it is paused
+        self.resume_event = threading.Event()
+        self.resume_event.set()
         self.current_algorithm = ctk.StringVar(value="Bubble Sort")
+        self.input_distribution = ctk.StringVar(value="random")
         self.step_by_step = ctk.BooleanVar(value=False)
         
         # Colors for visualization
@@ -44,8 +56,43 @@ class SortingVisualizer:
         self.initial_array = None
         self.final_array = None
         
-        # Initialize sorting algorithms
-        self.sorting_algorithms = SortingAlgorithms(self.update_visualization)
+        # Highlight state of the bars
+        self.comparing_indices = []
+        self.swapping_indices = []
+        self.sorted_indices = []
+        self.pivot_index = None
+        self.min_index = None
+        
+        # Canvas items created once per array layout by build_bars
+        self.gradient_steps = 5
+        self.gradient_colors = {}
+        self.bar_items = []
+        self.bar_layout = None
+        self.bar_width = 0
+        self.bar_low = 0
+        self.bar_high = 0
+        self.bar_span = 1
+        self.drawn_highlights = set()
+        self.drawn_sorted_range = (0, 0)
+        
+        # Comparison jobs run in worker processes; futures map to (algorithm, size index, size)
+        self.comparison_pool = None
+        self.comparison_futures = {}
+        self.comparison_total = 0
+        
+        # Recorded operations of the current sort and the player replaying them
+        self.trace = None
+        self.player = None
+        self.replay_job = None
+        self.replay_budget = 0.0
+        self.target_fps = 60
+        
+        # Batches of operations flow from the sorting worker to the UI thread
+        # through a bounded queue; the worker blocks when the replay falls behind
+        self.event_queue = None
+        self.queue_capacity = 64
+        self.sorting_done = False
+        self.sort_error = None
         
         self.setup_ui()
         self.generate_random_array()
@@ -188,13 +235,25 @@ class SortingVisualizer:
         self.algorithm_menu = ctk.CTkOptionMenu(
             self.controls_frame,
             values=["Bubble Sort", "Selection Sort", "Insertion Sort", 
-                   "Merge Sort", "Quick Sort", "Heap Sort", 
-                   "Counting Sort", "Radix Sort", "Bucket Sort"],
+                   "Merge Sort", "Bottom Up Merge Sort", "Tim Sort", "Quick Sort", "Intro Sort", "Heap Sort", 
+                   "Network Sort", "Counting Sort", "Radix Sort", "Bucket Sort", "Select Kth", "Partial Sort"],
             variable=self.current_algorithm,
             command=self.on_algorithm_change
         )
         self.algorithm_menu.pack(side="left", padx=5)
         
+        # Input distribution selection
+        self.distribution_label = ctk.CTkLabel(self.controls_frame, text="Input:")
+        self.distribution_label.pack(side="left", padx=5)
+        
+        self.distribution_menu = ctk.CTkOptionMenu(
+            self.controls_frame,
+            values=list(DISTRIBUTIONS),
+            variable=self.input_distribution,
+            command=lambda choice: self.generate_random_array()
+        )
+        self.distribution_menu.pack(side="left", padx=5)
+        
         # Array size slider
         self.size_label = ctk.CTkLabel(self.controls_frame, text="Array Size:")
         self.size_label.pack(side="left", padx=5)
@@ -212,6 +271,23 @@ class SortingVisualizer:
         self.size_value_label = ctk.CTkLabel(self.controls_frame, text=str(self.array_size.get()))
         self.size_value_label.pack(side="left", padx=5)
         
+        # k slider for the selection algorithms
+        self.k_label = ctk.CTkLabel(self.controls_frame, text="k:")
+        self.k_label.pack(side="left", padx=5)
+        
+        self.k_slider = ctk.CTkSlider(
+            self.controls_frame,
+            from_=1,
+            to=100,
+            number_of_steps=99,
+            variable=self.selection_k,
+            command=lambda value: self.k_value_label.configure(text=str(int(value)))
+        )
+        self.k_slider.pack(side="left", padx=5, fill="x", expand=True)
+        
+        self.k_value_label = ctk.CTkLabel(self.controls_frame, text=str(self.selection_k.get()))
+        self.k_value_label.pack(side="left", padx=5)
+        
         # Speed slider
         self.speed_label = ctk.CTkLabel(self.controls_frame, text="Speed:")
         self.speed_label.pack(side="left", padx=5)
@@ -244,6 +320,25 @@ class SortingVisualizer:
         )
         self.sort_btn.pack(side="left", padx=5)
         
+        # Scrub through the recorded sort while paused (Step-by-Step Mode)
+        self.step_back_btn = ctk.CTkButton(
+            self.buttons_frame,
+            text="◀ Step",
+            width=80,
+            state="disabled",
+            command=lambda: self.step_replay(-1)
+        )
+        self.step_back_btn.pack(side="left", padx=5)
+        
+        self.step_forward_btn = ctk.CTkButton(
+            self.buttons_frame,
+            text="Step ▶",
+            width=80,
+            state="disabled",
+            command=lambda: self.step_replay(1)
+        )
+        self.step_forward_btn.pack(side="left", padx=5)
+        
     def setup_custom_array_frame(self):
         """Setup the custom array input frame in the left panel"""
         self.custom_array_frame = ctk.CTkFrame(self.left_panel)
@@ -265,6 +360,13 @@ class SortingVisualizer:
         )
         self.use_custom_array_btn.pack(side="left", padx=5)
         
+        self.load_file_btn = ctk.CTkButton(
+            self.custom_array_frame,
+            text="Load File",
+            command=self.load_array_file
+        )
+        self.load_file_btn.pack(side="left", padx=5)
+        
     def setup_legend_frame(self):
         """Setup the legend frame in the left panel"""
         self.legend_frame = ctk.CTkFrame(self.left_panel)
@@ -370,16 +472,9 @@ class SortingVisualizer:
             custom_array_str = self.custom_array_entry.get().strip()
             if custom_array_str:
                 # Parse the input string into a list of integers
-                custom_array = [int(x.strip()) for x in custom_array_str.split(",") if x.strip()]
+                custom_array = parse_numbers(custom_array_str)
                 if custom_array:
-                    self.array = custom_array
-                    self.array_size.set(len(custom_array))
-                    self.size_value_label.configure(text=str(len(custom_array)))
-                    self.initial_array = self.array.copy()
-                    self.initial_array_value.configure(text=str(self.initial_array))
-                    self.final_array_value.configure(text="[]")
-                    self.draw_array()
-                    self.reset_stats()
+                    self.set_custom_array(custom_array)
                 else:
                     self.show_error("Please enter valid numbers separated by commas.")
             else:
@@ -387,6 +482,35 @@ class SortingVisualizer:
         except ValueError:
             self.show_error("Invalid input. Please enter numbers separated by commas.")
             
+    def set_custom_array(self, values):
+        """Show ``values`` as the array to sort"""
+        self.array = values
+        self.array_size.set(len(values))
+        self.size_value_label.configure(text=str(len(values)))
+        self.initial_array = self.array.copy()
+        self.initial_array_value.configure(text=str(self.initial_array))
+        self.final_array_value.configure(text="[]")
+        self.draw_array()
+        self.reset_stats()
+        
+    def load_array_file(self):
+        """Load the array from a .csv/.txt, .npy or raw int64 binary file"""
+        path = filedialog.askopenfilename(
+            title="Load Array",
+            filetypes=[("Array files", "*.csv *.txt *.npy *.bin"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            values = load_array(path).tolist()
+        except (OSError, ValueError) as e:
+            self.show_error(f"Could not load {os.path.basename(path)}: {e}")
+            return
+        if not values:
+            self.show_error("The file contains no numbers.")
+            return
+        self.set_custom_array(values)
+            
     def show_error(self, message):
         """Show an error message in a popup"""
         error_window = ctk.CTkToplevel(self.window)
@@ -469,13 +593,13 @@ class SortingVisualizer:
             canvas_height = 400
             
         bar_width = canvas_width / len(array)
-        max_height = max(array)
+        low, span = self.get_bar_scale(array)
         
         for i, value in enumerate(array):
             x1 = i * bar_width
             y1 = canvas_height
             x2 = (i + 1) * bar_width - 1
-            y2 = canvas_height - (value / max_height) * (canvas_height - 20)
+            y2 = canvas_height - ((value - low) / span) * (canvas_height - 20)
             
             canvas.create_rectangle(
                 x1, y1, x2, y2,
@@ -485,7 +609,10 @@ class SortingVisualizer:
             
     def generate_random_array(self):
         size = self.array_size.get()
-        self.array = [random.randint(1, 100) for _ in range(size)]
+        distribution = self.input_distribution.get()
+        # Keep uniform values small enough to label the bars
+        params = {"high": 100} if distribution == "random" else {}
+        self.array = generate_array(distribution, size, **params).tolist()
         self.initial_array = self.array.copy()
         self.initial_array_value.configure(text=str(self.initial_array))
         self.final_array_value.configure(text="[]")
@@ -493,9 +620,18 @@ class SortingVisualizer:
         self.draw_array()
         self.reset_stats()
         
-    def draw_array(self):
-        self.canvas.delete("all")
+    def draw_array(self, indices=None):
+        """Draw the array, reusing the canvas items created for it.
+        
+        The bar, number and tile items are created once per array layout.
+        When ``indices`` is given only those bars (plus any whose highlight
+        changed since the last frame) are moved and recoloured, so a frame
+        costs O(1) canvas updates instead of recreating 7n items.
+        """
         if not self.array:
+            self.canvas.delete("all")
+            self.bar_items = []
+            self.bar_layout = None
             return
             
         canvas_width = self.canvas.winfo_width()
@@ -505,78 +641,153 @@ class SortingVisualizer:
             canvas_width = 800
             canvas_height = 400
             
-        bar_width = canvas_width / len(self.array)
-        max_height = max(self.array)
+        layout = (len(self.array), canvas_width, canvas_height)
+        if (indices is None or layout != self.bar_layout
+                or any(not self.bar_low <= self.array[i] <= self.bar_high for i in indices)):
+            self.build_bars(canvas_width, canvas_height)
+            return
+            
+        # Bars whose highlight may have changed since the previous frame
+        highlighted = self.get_highlighted_indices()
+        dirty = set(indices) | self.drawn_highlights | highlighted
+        
+        sorted_range = self.get_sorted_range()
+        if sorted_range != self.drawn_sorted_range:
+            old_lo, old_hi = self.drawn_sorted_range
+            new_lo, new_hi = sorted_range
+            dirty.update(set(range(old_lo, old_hi)) ^ set(range(new_lo, new_hi)))
+            
+        for i in dirty:
+            self.update_bar(i)
+            
+        self.drawn_highlights = highlighted
+        self.drawn_sorted_range = sorted_range
+        self.state_indicator.configure(text=f"Current State: {self.get_current_state()}")
+        
+    def build_bars(self, canvas_width, canvas_height):
+        """Create the canvas items for every bar of the current array"""
+        self.canvas.delete("all")
+        self.bar_layout = (len(self.array), canvas_width, canvas_height)
+        self.bar_width = canvas_width / len(self.array)
+        self.bar_low, self.bar_span = self.get_bar_scale(self.array)
+        self.bar_high = max(self.array)
+        self.bar_items = []
         
         # Draw color tiles for current state
         tile_height = 25
         tile_y = 10
-        tile_width = bar_width * 0.8
-        tile_spacing = bar_width * 0.2
-        
-        # Track current state for the indicator
-        current_state = "Normal"
+        tile_width = self.bar_width * 0.8
         
-        for i, value in enumerate(self.array):
-            x1 = i * bar_width
-            y1 = canvas_height
-            x2 = (i + 1) * bar_width - 1
-            y2 = canvas_height - (value / max_height) * (canvas_height - 60)  # More space for numbers
+        for i in range(len(self.array)):
+            x1 = i * self.bar_width
+            x2 = (i + 1) * self.bar_width - 1
             
-            # Determine bar color based on its state
-            color = self.colors["normal"]
-            if hasattr(self, 'comparing_indices') and i in self.comparing_indices:
-                color = self.colors["comparing"]
-                current_state = "Comparing"
-            elif hasattr(self, 'swapping_indices') and i in self.swapping_indices:
-                color = self.colors["swapping"]
-                current_state = "Swapping"
-            elif hasattr(self, 'sorted_indices') and i in self.sorted_indices:
-                color = self.colors["sorted"]
-                current_state = "Sorted"
-            elif hasattr(self, 'pivot_index') and i == self.pivot_index:
-                color = self.colors["pivot"]
-                current_state = "Pivot"
-            elif hasattr(self, 'min_index') and i == self.min_index:
-                color = self.colors["min"]
-                current_state = "Minimum"
+            # Gradient segments of the bar; coordinates are set in update_bar
+            segments = [
+                self.canvas.create_rectangle(x1, 0, x2, 0, outline="")
+                for _ in range(self.gradient_steps)
+            ]
             
-            # Draw the bar with gradient effect
-            gradient_steps = 5
-            step_height = (y1 - y2) / gradient_steps
-            for step in range(gradient_steps):
-                step_y1 = y1 - step * step_height
-                step_y2 = y1 - (step + 1) * step_height
-                # Create a slightly darker gradient
-                gradient_color = self.adjust_color(color, 1 - (step * 0.1))
-                self.canvas.create_rectangle(
-                    x1, step_y1, x2, step_y2,
-                    fill=gradient_color,
-                    outline=""
-                )
-            
-            # Draw the number on top of the bar with better visibility
-            text_x = x1 + bar_width / 2
-            text_y = y2 - 20
-            self.canvas.create_text(
-                text_x, text_y,
-                text=str(value),
+            # Number on top of the bar
+            text = self.canvas.create_text(
+                x1 + self.bar_width / 2, 0,
                 fill=self.colors["text"],
                 font=("Arial", 11, "bold")
             )
             
-            # Draw color tile with border
-            tile_x = x1 + (bar_width - tile_width) / 2
-            self.canvas.create_rectangle(
+            # Color tile with border
+            tile_x = x1 + (self.bar_width - tile_width) / 2
+            tile = self.canvas.create_rectangle(
                 tile_x, tile_y,
                 tile_x + tile_width, tile_y + tile_height,
-                fill=color,
                 outline=self.colors["text"],
                 width=1
             )
-        
-        # Update state indicator
-        self.state_indicator.configure(text=f"Current State: {current_state}")
+            self.bar_items.append((segments, text, tile))
+            self.update_bar(i)
+            
+        self.drawn_highlights = self.get_highlighted_indices()
+        self.drawn_sorted_range = self.get_sorted_range()
+        self.state_indicator.configure(text=f"Current State: {self.get_current_state()}")
+        
+    def get_bar_scale(self, array):
+        """(low, span) so a bar is (value - low) / span of the full height.
+        
+        Bars grow from 0, or from the minimum when there are negative values,
+        so negative and all-negative arrays still draw upright.
+        """
+        low = min(0, min(array))
+        return low, (max(array) - low) or 1
+        
+    def update_bar(self, i):
+        """Move and recolour the existing canvas items of bar ``i``"""
+        segments, text, tile = self.bar_items[i]
+        value = self.array[i]
+        canvas_height = self.bar_layout[2]
+        x1 = i * self.bar_width
+        x2 = (i + 1) * self.bar_width - 1
+        y1 = canvas_height
+        y2 = canvas_height - ((value - self.bar_low) / self.bar_span) * (canvas_height - 60)  # More space for numbers
+        color = self.get_bar_color(i)
+        
+        # Draw the bar with gradient effect
+        gradient = self.gradient_colors.get(color)
+        if gradient is None:
+            # Create a slightly darker gradient
+            gradient = [self.adjust_color(color, 1 - (step * 0.1)) for step in range(self.gradient_steps)]
+            self.gradient_colors[color] = gradient
+        step_height = (y1 - y2) / self.gradient_steps
+        for step, segment in enumerate(segments):
+            self.canvas.coords(segment, x1, y1 - step * step_height, x2, y1 - (step + 1) * step_height)
+            self.canvas.itemconfigure(segment, fill=gradient[step])
+            
+        self.canvas.coords(text, x1 + self.bar_width / 2, y2 - 20)
+        self.canvas.itemconfigure(text, text=str(value))
+        self.canvas.itemconfigure(tile, fill=color)
+        
+    def get_bar_color(self, i):
+        """Color of bar ``i`` for the current highlight state"""
+        if i in self.comparing_indices:
+            return self.colors["comparing"]
+        if i in self.swapping_indices:
+            return self.colors["swapping"]
+        if i in self.sorted_indices:
+            return self.colors["sorted"]
+        if i == self.pivot_index:
+            return self.colors["pivot"]
+        if i == self.min_index:
+            return self.colors["min"]
+        return self.colors["normal"]
+        
+    def get_current_state(self):
+        """Name of the highlight state shown by the state indicator"""
+        if self.comparing_indices:
+            return "Comparing"
+        if self.swapping_indices:
+            return "Swapping"
+        if self.sorted_indices:
+            return "Sorted"
+        if self.pivot_index is not None:
+            return "Pivot"
+        if self.min_index is not None:
+            return "Minimum"
+        return "Normal"
+        
+    def get_highlighted_indices(self):
+        """Indices currently drawn in a non-normal, non-sorted color"""
+        highlighted = set(self.comparing_indices) | set(self.swapping_indices)
+        for index in (self.pivot_index, self.min_index):
+            if index is not None:
+                highlighted.add(index)
+        return highlighted
+        
+    def get_sorted_range(self):
+        """The sorted highlight as a (lo, hi) range"""
+        if isinstance(self.sorted_indices, range):
+            return (self.sorted_indices.start, self.sorted_indices.stop)
+        if self.sorted_indices:
+            return (min(self.sorted_indices), max(self.sorted_indices) + 1)
+        return (0, 0)
         
     def adjust_color(self, hex_color, factor):
         """Adjust color brightness for gradient effect"""
@@ -598,30 +809,6 @@ class SortingVisualizer:
         # Convert back to hex
         return f"#{r:02x}{g:02x}{b:02x}"
         
-    def update_visualization(self, arr, stats, state=None):
-        self.array = arr.copy()
-        self.stats = stats
-        
-        # Update state information
-        if state:
-            self.comparing_indices = state.get('comparing', [])
-            self.swapping_indices = state.get('swapping', [])
-            self.sorted_indices = state.get('sorted', [])
-            self.pivot_index = state.get('pivot', None)
-            self.min_index = state.get('min', None)
-        else:
-            # Reset state
-            self.comparing_indices = []
-            self.swapping_indices = []
-            self.sorted_indices = []
-            self.pivot_index = None
-            self.min_index = None
-            
-        self.draw_array()
-        self.update_stats()
-        self.window.update()
-        time.sleep(1 / (self.sorting_speed.get() * 0.5 + 1))
-        
     def start_sorting(self):
         if self.is_sorting:
             return
@@ -630,6 +817,7 @@ class SortingVisualizer:
         self.sort_btn.configure(state="disabled")
         self.generate_btn.configure(state="disabled")
         self.use_custom_array_btn.configure(state="disabled")
+        self.load_file_btn.configure(state="disabled")
         self.status_value.configure(text="Sorting...")
         
         # Reset stats
@@ -646,33 +834,215 @@ class SortingVisualizer:
         self.swaps_value.configure(text="0")
         self.time_value.configure(text="0.000 s")
         
-        # Start sorting in a separate thread
-        thread = threading.Thread(target=self.sort_array)
-        thread.start()
-        
-    def sort_array(self):
-        algorithm = self.current_algorithm.get()
-        arr = self.array.copy()
-        
-        # Get the appropriate sorting method
-        sort_method = getattr(self.sorting_algorithms, algorithm.lower().replace(" ", "_"))
-        
-        # Execute the sorting algorithm
-        sort_method(arr, self.stats)
-        
+        # Step-by-Step Mode starts paused so the replay can be stepped manually
+        self.resume_event.set()
+        if self.step_by_step.get():
+            self.pause_sorting()
+            
+        # The worker streams operations into the queue; the UI thread replays them
+        algorithm = self.current_algorithm.get()
+        # Selections only put part of the array in its final place
+        k = min(self.selection_k.get(), len(self.array))
+        if algorithm == "Select Kth":
+            options, self.result_range = {"k": k - 1}, range(k - 1, k)
+        elif algorithm == "Partial Sort":
+            options, self.result_range = {"k": k}, range(k)
+        else:
+            options, self.result_range = {}, range(len(self.array))
+        self.trace = SortTrace()
+        self.player = TracePlayer(self.array, self.trace)
+        self.replay_budget = 0.0
+        self.event_queue = queue.Queue(maxsize=self.queue_capacity)
+        self.sorting_done = False
+        self.sort_error = None
+        self.final_array = None
+        self.sorting_thread = threading.Thread(
+            target=self.sort_array,
+            args=(algorithm, self.array.copy(), options),
+            daemon=True
+        )
+        self.sorting_thread.start()
+        
+        if self.resume_event.is_set():
+            self.replay_step()
+            
+    def sort_array(self, algorithm, arr, options):
+        """Worker thread: run the algorithm and stream its operations to the UI.
+        
+        Must not touch any Tk widget or variable; everything it produces is
+        handed over through self.event_queue, ending with a None sentinel.
+        """
+        stream = TraceStream(self.event_queue)
+        try:
+            # Get the appropriate sorting method
+            recorder = SortingAlgorithms(trace=stream)
+            sort_method = getattr(recorder, algorithm.lower().replace(" ", "_"))
+            
+            # Execute the sorting algorithm
+            sort_method(arr, self.stats, **options)
+            stream.flush()
+            
+            self.stats["end_time"] = time.time()
+            self.final_array = arr
+        except Exception as e:
+            self.sort_error = e
+        finally:
+            self.event_queue.put(None)
+            
+    def load_trace_batches(self, needed):
+        """Move batches from the worker queue into the trace.
+        
+        Only pulls until ``needed`` unplayed operations are available, so a
+        paused or slow replay leaves the queue full and the worker blocked.
+        """
+        while not self.sorting_done and len(self.trace) - self.player.position < needed:
+            try:
+                batch = self.event_queue.get_nowait()
+            except queue.Empty:
+                return
+            if batch is None:
+                self.sorting_done = True
+            else:
+                self.trace.extend(batch)
+                
+    def get_ops_per_frame(self):
+        """Map the speed slider to recorded operations applied per frame.
+        
+        The scale is exponential: speed 30 shows one operation per frame,
+        every 5 steps doubles it, so speed 1 is about one operation per
+        second and speed 100 replays over a million operations per second.
+        """
+        return 2 ** ((self.sorting_speed.get() - 30) / 5)
+        
+    def replay_step(self):
+        """Render one frame, applying as many operations as the speed allows"""
+        self.replay_job = None
+        if self.player is None or not self.resume_event.is_set():
+            return
+            
+        frame_start = time.perf_counter()
+        
+        # Coalesce all operations of this frame into a single redraw
+        self.replay_budget += self.get_ops_per_frame()
+        self.load_trace_batches(int(self.replay_budget))
+        touched = set()
+        event = None
+        while self.replay_budget >= 1:
+            next_event = self.player.step_forward()
+            if next_event is None:
+                # The worker has not produced more yet; don't bank the missed frames
+                self.replay_budget %= 1
+                break
+            event = next_event
+            touched.update(self.get_event_indices(event))
+            self.replay_budget -= 1
+            
+        if event is not None:
+            self.show_replay_frame(event, touched)
+            
+        if self.player.at_end and self.sorting_done:
+            self.finish_sorting()
+            return
+            
+        # Keep a steady frame rate regardless of how long this frame took
+        frame_ms = 1000 / self.target_fps
+        elapsed_ms = (time.perf_counter() - frame_start) * 1000
+        self.replay_job = self.window.after(max(1, int(frame_ms - elapsed_ms)), self.replay_step)
+        
+    def step_replay(self, direction):
+        """Move the paused replay one operation forward or backward"""
+        if self.player is None or self.resume_event.is_set():
+            return
+            
+        if direction > 0:
+            self.load_trace_batches(1)
+            event = self.player.step_forward()
+            if event is None:
+                if self.sorting_done:
+                    self.finish_sorting()
+                return
+        else:
+            undone = self.player.step_backward()
+            # Highlight the operation that produced the state now shown
+            event = self.player.trace.event(self.player.position - 1) if self.player.position else None
+            self.show_replay_frame(event, self.get_event_indices(undone))
+            return
+        self.show_replay_frame(event)
+        
+    def get_event_indices(self, event):
+        """Indices whose bars an operation changed or highlighted"""
+        if event is None:
+            return []
+        op, a, b, _ = event
+        if op in (COMPARE, SWAP):
+            return [a, b]
+        if op == WRITE:
+            return [a]
+        return []
+        
+    def get_compare_run(self, event):
+        """Indices to show as compared for a COMPARE event: the pair itself, or
+        for a sorting-network comparator every comparator of its layer so far,
+        so a layer (all its comparisons, then its swaps) lights up together"""
+        _, a, b, layer_index = event
+        indices = [a, b]
+        trace = self.player.trace
+        for k in range(self.player.position - layer_index, self.player.position - 1):
+            _, i, j, _ = trace.event(k)
+            indices += [i, j]
+        return indices
+        
+    def show_replay_frame(self, event, touched=None):
+        """Draw the player's current array with the highlights for an event"""
+        self.comparing_indices = []
+        self.swapping_indices = []
+        self.pivot_index = None
+        self.min_index = None
+        
+        if event is not None:
+            op, a, b, _ = event
+            if op == COMPARE:
+                self.comparing_indices = self.get_compare_run(event)
+            elif op == SWAP:
+                self.swapping_indices = [a, b]
+            elif op == WRITE:
+                self.swapping_indices = [a]
+                
+        sorted_range = self.player.sorted_range
+        self.sorted_indices = range(*sorted_range) if sorted_range else []
+        
+        self.array = self.player.array
+        if touched is None:
+            touched = self.get_event_indices(event)
+        self.draw_array(touched)
+        self.comparisons_value.configure(text=str(self.player.comparisons))
+        self.swaps_value.configure(text=str(self.player.swaps))
+        
+    def finish_sorting(self):
+        """Show the final state once the replay has reached the end"""
         self.is_sorting = False
-        self.stats["end_time"] = time.time()
-        self.final_array = arr.copy()
-        self.final_array_value.configure(text=str(self.final_array))
-        self.update_stats()
-        self.status_value.configure(text="Sorted!")
         self.sort_btn.configure(state="normal")
         self.generate_btn.configure(state="normal")
         self.use_custom_array_btn.configure(state="normal")
+        self.load_file_btn.configure(state="normal")
+        self.step_back_btn.configure(state="disabled")
+        self.step_forward_btn.configure(state="disabled")
+        
+        if self.sort_error is not None:
+            self.status_value.configure(text="Error")
+            self.show_error(f"{self.current_algorithm.get()} failed: {self.sort_error}")
+            return
+            
+        self.array = self.final_array.copy()
+        self.final_array_value.configure(text=str(self.final_array))
+        self.update_stats()
+        self.status_value.configure(text="Sorted!" if len(self.result_range) == len(self.array) else "Selected!")
         
         # Mark all elements as sorted
-        self.sorted_indices = list(range(len(arr)))
-        self.draw_array()
+        self.comparing_indices = []
+        self.swapping_indices = []
+        self.sorted_indices = self.result_range
+        self.draw_array([])
         
     def update_stats(self):
         """Update statistics display with better formatting"""
@@ -720,6 +1090,7 @@ class SortingVisualizer:
         """Update the algorithm information display with better formatting"""
         algorithm = self.current_algorithm.get()
         info = self.get_algorithm_info(algorithm)
+        stable = algorithm.lower().replace(" ", "_") in STABLE_ALGORITHMS
         
         # Clear the text box
         self.algorithm_info.delete("0.0", "end")
@@ -742,6 +1113,9 @@ Time Complexity:
 Space Complexity:
   {info['space']}
 
+Stable:
+  {"Yes, equal elements keep their order" if stable else "No, equal elements may be reordered"}
+
 """
         # Add array information if available
         if self.initial_array:
@@ -805,8 +1179,8 @@ Space Complexity:
             "Merge Sort": {
                 "name": "Merge Sort",
                 "description": "A divide-and-conquer algorithm that divides the input array into two halves.",
-                "steps": """1. Divide array into two halves
-2. Recursively sort each half
+                "steps": """1. Divide array into two halves until they hold 16 or fewer elements
+2. Sort those with a sorting network
 3. Merge sorted halves
 4. Compare elements from both halves
 5. Place smaller element in result""",
@@ -832,13 +1206,74 @@ Space Complexity:
                 },
                 "space": "O(log n)"
             },
+            "Bottom Up Merge Sort": {
+                "name": "Bottom Up Merge Sort",
+                "description": "An iterative merge sort that reuses one buffer and skips runs already in order.",
+                "steps": """1. Insertion sort blocks of 16 elements
+2. Merge neighbouring runs, doubling the run width each pass
+3. Skip the merge when the two runs are already in order
+4. Gallop (exponential search) when one run keeps winning
+5. Alternate between the array and a single buffer of n slots""",
+                "time": {
+                    "best": "O(n)",
+                    "average": "O(n log n)",
+                    "worst": "O(n log n)"
+                },
+                "space": "O(n)"
+            },
+            "Tim Sort": {
+                "name": "Tim Sort",
+                "description": "An adaptive merge sort that reuses the order already present in the data.",
+                "steps": """1. Find ascending runs; reverse strictly descending ones
+2. Extend short runs to a minimum length with binary insertion
+3. Push runs on a stack, merging while the length invariants fail
+4. Skip the parts of two runs that are already in place
+5. Gallop when one run keeps winning the merge""",
+                "time": {
+                    "best": "O(n)",
+                    "average": "O(n log n)",
+                    "worst": "O(n log n)"
+                },
+                "space": "O(n)"
+            },
+            "Intro Sort": {
+                "name": "Intro Sort",
+                "description": "A production-grade quicksort that guards against its worst cases.",
+                "steps": """1. Pick the pivot as a median of three (ninther for large ranges)
+2. Partition into less, equal and greater parts
+3. Push the larger part on a stack, continue with the smaller
+4. Sort ranges of 16 or fewer elements with a sorting network
+5. Switch to heap sort when the depth exceeds 2·log n""",
+                "time": {
+                    "best": "O(n)",
+                    "average": "O(n log n)",
+                    "worst": "O(n log n)"
+                },
+                "space": "O(log n)"
+            },
+            "Network Sort": {
+                "name": "Network Sort",
+                "description": "Runs a fixed network of compare-exchange steps that sorts any input.",
+                "steps": """1. Pick the best known network for up to 16 elements,
+   otherwise build Batcher's odd-even merge network
+2. Each layer compares disjoint pairs of positions
+3. Swap every pair that is out of order
+4. Move on to the next layer; the steps never depend on the data""",
+                "time": {
+                    "best": "O(n log² n)",
+                    "average": "O(n log² n)",
+                    "worst": "O(n log² n)"
+                },
+                "space": "O(1)"
+            },
             "Heap Sort": {
                 "name": "Heap Sort",
                 "description": "Converts the array into a max-heap and extracts elements.",
                 "steps": """1. Build max heap from array
 2. Swap root with last element
 3. Reduce heap size by 1
-4. Heapify the root
+4. Sift the root down: move the hole to a leaf along the larger
+   children, then let the value climb back up (Floyd)
 5. Repeat until heap is empty""",
                 "time": {
                     "best": "O(n log n)",
@@ -850,25 +1285,25 @@ Space Complexity:
             "Counting Sort": {
                 "name": "Counting Sort",
                 "description": "Counts occurrences of each element.",
-                "steps": """1. Find maximum element
-2. Create count array
-3. Store count of each element
-4. Modify count array for positions
-5. Build output array""",
+                "steps": """1. Find minimum and maximum; compare the range k with n
+2. Small range: count each element in a dense array
+3. Wide range with few distinct keys: count in a hash map
+4. Otherwise hand the array to radix sort
+5. Build output array from the counts""",
                 "time": {
                     "best": "O(n + k)",
                     "average": "O(n + k)",
                     "worst": "O(n + k)"
                 },
-                "space": "O(n + k)"
+                "space": "O(n), with k at most 4n in the dense case"
             },
             "Radix Sort": {
                 "name": "Radix Sort",
                 "description": "Sorts numbers by processing individual digits.",
-                "steps": """1. Find maximum number
-2. Count digits in maximum
-3. Sort by each digit
-4. Use counting sort for digits
+                "steps": """1. Subtract the minimum so every key is non-negative
+2. Split keys into 8-bit digits, least significant first
+3. Count each digit value (skip the pass if all are equal)
+4. Scatter into a scratch buffer in digit order
 5. Repeat for all digits""",
                 "time": {
                     "best": "O(nk)",
@@ -880,17 +1315,46 @@ Space Complexity:
             "Bucket Sort": {
                 "name": "Bucket Sort",
                 "description": "Distributes elements into buckets and sorts them.",
-                "steps": """1. Create empty buckets
-2. Insert elements into buckets
-3. Sort individual buckets
-4. Concatenate sorted buckets
-5. Return sorted array""",
+                "steps": """1. Sample the array and pick bucket bounds at its quantiles
+2. Find each element's bucket by binary search
+3. Count bucket sizes and lay buckets out back to back
+4. Scatter elements into their bucket's slots
+5. Sort each bucket with intro sort""",
                 "time": {
-                    "best": "O(n + k)",
-                    "average": "O(n + k)",
-                    "worst": "O(n²)"
+                    "best": "O(n log k)",
+                    "average": "O(n log n)",
+                    "worst": "O(n log n)"
                 },
                 "space": "O(n + k)"
+            },
+            "Select Kth": {
+                "name": "Select Kth (Floyd-Rivest)",
+                "description": "Finds the k-th smallest element without sorting the array.",
+                "steps": """1. On large ranges, first select k within a small sampled window
+2. Partition the range around the element at position k
+3. Mark the pivot, which is now in its final place
+4. Keep only the side that contains position k
+5. Fall back to a bounded heap if the range shrinks too slowly""",
+                "time": {
+                    "best": "O(n)",
+                    "average": "O(n)",
+                    "worst": "O(n log n)"
+                },
+                "space": "O(log log n)"
+            },
+            "Partial Sort": {
+                "name": "Partial Sort",
+                "description": "Sorts only the k smallest elements to the front using a bounded heap.",
+                "steps": """1. Build a max-heap of the first k elements
+2. Compare every later element with the heap's largest
+3. If smaller, replace the largest and sift it down
+4. Heap sort the k elements left in the heap""",
+                "time": {
+                    "best": "O(n + k log k)",
+                    "average": "O(n log k)",
+                    "worst": "O(n log k)"
+                },
+                "space": "O(1)"
             }
         }
         return info.get(algorithm, info["Bubble Sort"])
@@ -909,19 +1373,29 @@ Space Complexity:
                 self.resume_sorting()
                 
     def pause_sorting(self):
-        """Pause the sorting process"""
-        if hasattr(self, 'sorting_thread') and self.sorting_thread.is_alive():
-            self.is_paused = True
+        """Pause the replay; the step buttons then scrub through the trace"""
+        if self.is_sorting:
+            self.resume_event.clear()
+            if self.replay_job is not None:
+                self.window.after_cancel(self.replay_job)
+                self.replay_job = None
             self.status_value.configure(text="Paused")
+            self.step_back_btn.configure(state="normal")
+            self.step_forward_btn.configure(state="normal")
             
     def resume_sorting(self):
-        """Resume the sorting process"""
-        if hasattr(self, 'sorting_thread') and self.sorting_thread.is_alive():
-            self.is_paused = False
+        """Resume the replay"""
+        self.resume_event.set()
+        if self.is_sorting:
             self.status_value.configure(text="Sorting...")
+            self.step_back_btn.configure(state="disabled")
+            self.step_forward_btn.configure(state="disabled")
+            self.replay_step()
             
     def run(self):
         self.window.mainloop()
+        if self.comparison_pool is not None:
+            self.comparison_pool.shutdown(wait=False, cancel_futures=True)
 
     def setup_comparison_tab(self):
         """Setup the comparison tab"""
@@ -934,6 +1408,7 @@ Space Complexity:
         # Algorithm selection for comparison
         self.alg1_var = ctk.StringVar(value="Bubble Sort")
         self.alg2_var = ctk.StringVar(value="Quick Sort")
+        self.comparison_distribution = ctk.StringVar(value="random")
         
         # First algorithm selection
         alg1_frame = ctk.CTkFrame(controls_frame)
@@ -942,8 +1417,8 @@ Space Complexity:
         ctk.CTkLabel(alg1_frame, text="Algorithm 1:", font=("Arial", 14, "bold")).pack(pady=5)
         self.alg1_menu = ctk.CTkOptionMenu(
             alg1_frame,
-            values=["Bubble Sort", "Quick Sort", "Merge Sort", "Heap Sort", 
-                   "Insertion Sort", "Selection Sort"],
+            values=["Bubble Sort", "Quick Sort", "Intro Sort", "Merge Sort", "Bottom Up Merge Sort", "Tim Sort", "Heap Sort", 
+                   "Network Sort", "Insertion Sort", "Selection Sort"],
             variable=self.alg1_var
         )
         self.alg1_menu.pack(pady=5)
@@ -955,8 +1430,8 @@ Space Complexity:
         ctk.CTkLabel(alg2_frame, text="Algorithm 2:", font=("Arial", 14, "bold")).pack(pady=5)
         self.alg2_menu = ctk.CTkOptionMenu(
             alg2_frame,
-            values=["Bubble Sort", "Quick Sort", "Merge Sort", "Heap Sort", 
-                   "Insertion Sort", "Selection Sort"],
+            values=["Bubble Sort", "Quick Sort", "Intro Sort", "Merge Sort", "Bottom Up Merge Sort", "Tim Sort", "Heap Sort", 
+                   "Network Sort", "Insertion Sort", "Selection Sort"],
             variable=self.alg2_var
         )
         self.alg2_menu.pack(pady=5)
@@ -973,6 +1448,27 @@ Space Complexity:
         self.size_entry.pack(pady=5)
         self.size_entry.insert("0", "10,50,100,500")
         
+        # Input distribution for the test arrays
+        dist_frame = ctk.CTkFrame(controls_frame)
+        dist_frame.pack(side="left", padx=10, pady=5, fill="x", expand=True)
+        
+        ctk.CTkLabel(dist_frame, text="Input:", font=("Arial", 14, "bold")).pack(pady=5)
+        self.comparison_dist_menu = ctk.CTkOptionMenu(
+            dist_frame,
+            values=list(DISTRIBUTIONS),
+            variable=self.comparison_distribution
+        )
+        self.comparison_dist_menu.pack(pady=5)
+        
+        # Timed repetitions per algorithm and size
+        repeats_frame = ctk.CTkFrame(controls_frame)
+        repeats_frame.pack(side="left", padx=10, pady=5, fill="x", expand=True)
+        
+        ctk.CTkLabel(repeats_frame, text="Repetitions:", font=("Arial", 14, "bold")).pack(pady=5)
+        self.repeats_entry = ctk.CTkEntry(repeats_frame, width=80)
+        self.repeats_entry.pack(pady=5)
+        self.repeats_entry.insert("0", "5")
+        
         # Start comparison button
         self.compare_btn = ctk.CTkButton(
             controls_frame,
@@ -982,6 +1478,15 @@ Space Complexity:
         )
         self.compare_btn.pack(side="left", padx=10, pady=5)
         
+        self.cancel_compare_btn = ctk.CTkButton(
+            controls_frame,
+            text="Cancel",
+            command=self.cancel_comparison,
+            state="disabled",
+            font=("Arial", 14, "bold")
+        )
+        self.cancel_compare_btn.pack(side="left", padx=10, pady=5)
+        
         # Comparison results
         results_frame = ctk.CTkFrame(tab)
         results_frame.pack(fill="both", expand=True, padx=10, pady=5)
@@ -992,6 +1497,10 @@ Space Complexity:
             font=("Arial", 20, "bold")
         ).pack(pady=10)
         
+        self.comparison_progress = ctk.CTkProgressBar(results_frame)
+        self.comparison_progress.pack(fill="x", padx=10, pady=5)
+        self.comparison_progress.set(0)
+        
         self.comparison_results = ctk.CTkTextbox(
             results_frame,
             font=("Arial", 14),
@@ -1000,8 +1509,8 @@ Space Complexity:
         self.comparison_results.pack(fill="both", expand=True, padx=10, pady=5)
         
     def start_comparison(self):
-        """Start comparing two sorting algorithms"""
-        if self.is_sorting:
+        """Start comparing two sorting algorithms in worker processes"""
+        if self.is_sorting or self.comparison_futures:
             self.show_error("Please wait for current sorting to complete")
             return
             
@@ -1025,156 +1534,105 @@ Space Complexity:
                 raise ValueError("Array sizes must be positive")
             if any(size > 10000 for size in test_sizes):
                 raise ValueError("Array sizes must be less than 10000")
+            repeats = int(self.repeats_entry.get().strip() or 5)
+            if repeats <= 0:
+                raise ValueError("Repetitions must be positive")
         except ValueError as e:
             self.show_error(str(e))
             return
             
-        # Disable comparison button during comparison
+        # Toggle buttons during comparison
         self.compare_btn.configure(state="disabled")
+        self.cancel_compare_btn.configure(state="normal")
+        self.comparison_progress.set(0)
         
         # Update status
         self.comparison_results.delete("0.0", "end")
         self.comparison_results.insert("0.0", "Starting comparison...\n")
+        distribution = self.comparison_distribution.get()
         self.comparison_results.insert("end", f"Testing sizes: {', '.join(map(str, test_sizes))}\n")
+        self.comparison_results.insert("end", f"Input distribution: {distribution}\n")
         self.comparison_results.insert("end", f"Algorithm 1: {alg1}\n")
         self.comparison_results.insert("end", f"Algorithm 2: {alg2}\n")
         self.comparison_results.insert("end", "\nRunning comparison...\n")
-        self.window.update()
         
-        try:
-            # Initialize results
-            results = {
-                alg1: {"times": [], "comparisons": [], "swaps": []},
-                alg2: {"times": [], "comparisons": [], "swaps": []}
+        # Initialize results, one slot per size so jobs can finish in any order
+        self.comparison_sizes = test_sizes
+        self.comparison_results_data = {
+            alg: {
+                "times": [None] * len(test_sizes),
+                "comparisons": [None] * len(test_sizes),
+                "swaps": [None] * len(test_sizes),
+                "runs": [None] * len(test_sizes)
             }
+            for alg in (alg1, alg2)
+        }
+        
+        # Submit one job per (algorithm, size); both algorithms get the same input
+        if self.comparison_pool is None:
+            self.comparison_pool = ProcessPoolExecutor()
+        self.comparison_futures = {}
+        for idx, size in enumerate(test_sizes):
+            test_array = generate_array(distribution, size).tolist()
+            for alg in (alg1, alg2):
+                method_name = alg.lower().replace(" ", "_")
+                future = self.comparison_pool.submit(benchmark_sort, method_name, test_array, repeats)
+                self.comparison_futures[future] = (alg, idx, size)
+        self.comparison_total = len(self.comparison_futures)
+        
+        self.window.after(100, self.poll_comparison)
+        
+    def poll_comparison(self):
+        """Collect finished comparison jobs and report progress"""
+        if not self.comparison_futures:
+            return
             
-            # Store original stats
-            original_stats = self.stats.copy() if hasattr(self, 'stats') else None
-            
-            # Run comparison for each size
-            total_sizes = len(test_sizes)
-            for idx, size in enumerate(test_sizes, 1):
-                # Update progress
+        results = self.comparison_results_data
+        for future in [f for f in self.comparison_futures if f.done()]:
+            alg, idx, size = self.comparison_futures.pop(future)
+            try:
+                run = future.result()
+            except Exception as e:
+                self.cancel_comparison()
+                error_msg = f"Error during comparison: {str(e)}"
+                self.show_error(error_msg)
                 self.comparison_results.delete("0.0", "end")
-                self.comparison_results.insert("0.0", f"Progress: {idx}/{total_sizes} sizes\n")
-                self.comparison_results.insert("end", f"Current size: {size}\n")
-                self.comparison_results.insert("end", f"Algorithm 1: {alg1}\n")
-                self.comparison_results.insert("end", f"Algorithm 2: {alg2}\n\n")
-                self.window.update()
-                
-                # Generate test array
-                test_array = [random.randint(1, 1000) for _ in range(size)]
-                
-                # Test first algorithm
-                self.comparison_results.insert("end", f"Running {alg1}...\n")
-                self.window.update()
-                
-                self.current_algorithm.set(alg1)
-                arr1 = test_array.copy()
-                stats1 = {
-                    "comparisons": 0,
-                    "swaps": 0,
-                    "start_time": time.time(),
-                }
-                self.stats = stats1
+                self.comparison_results.insert("0.0", f"Comparison failed.\nError: {error_msg}\nPlease try again.")
+                return
                 
-                # Custom callback to track only major steps
-                def update_callback1(arr, stats, state=None):
-                    if state and ("swapping" in state or "sorted" in state):
-                        # Only update UI for swaps or when elements are marked as sorted
-                        if "swapping" in state:
-                            self.comparison_results.insert("end", f"Swapping indices {state['swapping']}\n")
-                        elif "sorted" in state and len(state['sorted']) > 0:
-                            self.comparison_results.insert("end", f"Marked {len(state['sorted'])} elements as sorted\n")
-                        self.window.update()
-                    self.update_visualization(arr, stats, state)
-                
-                # Temporarily replace update callback
-                original_callback = self.sorting_algorithms.update_callback
-                self.sorting_algorithms.update_callback = update_callback1
-                
-                sort_method1 = getattr(self.sorting_algorithms, alg1.lower().replace(" ", "_"))
-                sort_method1(arr1, stats1)
-                stats1["end_time"] = time.time()
-                time1 = stats1["end_time"] - stats1["start_time"]  # Now in seconds
-                
-                # Restore original callback
-                self.sorting_algorithms.update_callback = original_callback
-                
-                self.comparison_results.insert("end", f"\nCompleted {alg1} in {time1:.3f} s\n")
-                self.comparison_results.insert("end", f"Total comparisons: {stats1['comparisons']}\n")
-                self.comparison_results.insert("end", f"Total swaps: {stats1['swaps']}\n\n")
-                self.window.update()
-                
-                # Test second algorithm
-                self.comparison_results.insert("end", f"Running {alg2}...\n")
-                self.window.update()
-                
-                self.current_algorithm.set(alg2)
-                arr2 = test_array.copy()
-                stats2 = {
-                    "comparisons": 0,
-                    "swaps": 0,
-                    "start_time": time.time(),
-                }
-                self.stats = stats2
-                
-                # Custom callback to track only major steps
-                def update_callback2(arr, stats, state=None):
-                    if state and ("swapping" in state or "sorted" in state):
-                        # Only update UI for swaps or when elements are marked as sorted
-                        if "swapping" in state:
-                            self.comparison_results.insert("end", f"Swapping indices {state['swapping']}\n")
-                        elif "sorted" in state and len(state['sorted']) > 0:
-                            self.comparison_results.insert("end", f"Marked {len(state['sorted'])} elements as sorted\n")
-                        self.window.update()
-                    self.update_visualization(arr, stats, state)
-                
-                # Temporarily replace update callback
-                self.sorting_algorithms.update_callback = update_callback2
-                
-                sort_method2 = getattr(self.sorting_algorithms, alg2.lower().replace(" ", "_"))
-                sort_method2(arr2, stats2)
-                stats2["end_time"] = time.time()
-                time2 = stats2["end_time"] - stats2["start_time"]  # Now in seconds
-                
-                # Restore original callback
-                self.sorting_algorithms.update_callback = original_callback
-                
-                self.comparison_results.insert("end", f"\nCompleted {alg2} in {time2:.3f} s\n")
-                self.comparison_results.insert("end", f"Total comparisons: {stats2['comparisons']}\n")
-                self.comparison_results.insert("end", f"Total swaps: {stats2['swaps']}\n\n")
-                self.window.update()
-                
-                # Store results
-                for alg, stats in [(alg1, stats1), (alg2, stats2)]:
-                    results[alg]["times"].append(stats["end_time"] - stats["start_time"])
-                    results[alg]["comparisons"].append(stats["comparisons"])
-                    results[alg]["swaps"].append(stats["swaps"])
-                
-                # Add a small delay to allow UI updates
-                time.sleep(0.1)
-            
-            # Restore original stats
-            self.stats = original_stats if original_stats else {"comparisons": 0, "swaps": 0, "start_time": None, "end_time": None}
-            self.update_stats()
-            
-            # Display results
-            self.comparison_results.insert("end", "\nComparison completed!\n")
-            self.comparison_results.insert("end", "Generating final results...\n")
-            self.window.update()
-            self.display_comparison_results(results, test_sizes)
+            results[alg]["times"][idx] = run.median
+            results[alg]["comparisons"][idx] = run.counter.comparisons
+            results[alg]["swaps"][idx] = run.counter.swaps
+            results[alg]["runs"][idx] = run
+            self.comparison_results.insert(
+                "end",
+                f"Completed {alg} (size {size}): median {run.median:.6f} s over {run.repeats} runs, "
+                f"{run.counter.comparisons:,} comparisons, {run.counter.swaps:,} swaps\n"
+            )
             
-        except Exception as e:
-            error_msg = f"Error during comparison: {str(e)}"
-            self.show_error(error_msg)
-            self.comparison_results.delete("0.0", "end")
-            self.comparison_results.insert("0.0", f"Comparison failed.\nError: {error_msg}\nPlease try again.")
-        finally:
-            # Re-enable comparison button
-            self.compare_btn.configure(state="normal")
-            self.window.update()
+        done = self.comparison_total - len(self.comparison_futures)
+        self.comparison_progress.set(done / self.comparison_total)
+        
+        if self.comparison_futures:
+            self.window.after(100, self.poll_comparison)
+            return
             
+        self.compare_btn.configure(state="normal")
+        self.cancel_compare_btn.configure(state="disabled")
+        self.display_comparison_results(results, self.comparison_sizes)
+        
+    def cancel_comparison(self):
+        """Cancel the running comparison and discard its pending jobs"""
+        if self.comparison_pool is not None:
+            # Jobs already running finish in the background; their results are ignored
+            self.comparison_pool.shutdown(wait=False, cancel_futures=True)
+            self.comparison_pool = None
+        if self.comparison_futures:
+            self.comparison_futures = {}
+            self.comparison_results.insert("end", "\nComparison cancelled.\n")
+        self.compare_btn.configure(state="normal")
+        self.cancel_compare_btn.configure(state="disabled")
+        
     def display_comparison_results(self, results, sizes):
         """Display the comparison results with better formatting"""
         text = "Algorithm Comparison Results\n"
@@ -1189,15 +1647,19 @@ Space Complexity:
             avg_comparisons = sum(data['comparisons']) / len(data['comparisons'])
             avg_swaps = sum(data['swaps']) / len(data['swaps'])
             
-            text += f"Average Time: {avg_time:.3f} s\n"
+            text += f"Average Median Time: {avg_time:.6f} s\n"
             text += f"Average Comparisons: {avg_comparisons:,.0f}\n"
             text += f"Average Swaps: {avg_swaps:,.0f}\n\n"
             
             # Add detailed results for each size
             text += "Detailed Results:\n"
             for i, size in enumerate(sizes):
-                text += f"\nArray Size: {size}\n"
-                text += f"  Time: {data['times'][i]:.3f} s\n"
+                run = data['runs'][i]
+                text += f"\nArray Size: {size} ({run.repeats} runs after {run.warmup} warmup)\n"
+                text += f"  Median Time: {run.median:.6f} s\n"
+                text += f"  p95 Time: {run.p95:.6f} s\n"
+                text += f"  Std Dev: {run.stddev:.6f} s\n"
+                text += f"  95% CI (mean): [{run.ci_low:.6f}, {run.ci_high:.6f}] s\n"
                 text += f"  Comparisons: {data['comparisons'][i]:,}\n"
                 text += f"  Swaps: {data['swaps'][i]:,}\n"
             text += "\n" + "=" * 30 + "\n\n"
@@ -1206,12 +1668,19 @@ Space Complexity:
         text += "Comparison Summary:\n"
         text += "-" * 20 + "\n"
         
-        # Compare times
+        # Compare times per size; only call a winner when the confidence intervals don't overlap
         alg1, alg2 = list(results.keys())
-        time_diff = results[alg1]["times"][-1] - results[alg2]["times"][-1]
-        faster = alg2 if time_diff > 0 else alg1
-        text += f"Faster Algorithm: {faster}\n"
-        text += f"Time Difference: {abs(time_diff):.3f} s\n\n"
+        for i, size in enumerate(sizes):
+            run1 = results[alg1]["runs"][i]
+            run2 = results[alg2]["runs"][i]
+            faster = compare_results(run1, run2)
+            if faster is None:
+                text += f"Size {size}: no significant difference\n"
+            else:
+                faster_name = alg1 if faster is run1 else alg2
+                speedup = max(run1.median, run2.median) / max(min(run1.median, run2.median), 1e-12)
+                text += f"Size {size}: {faster_name} faster ({speedup:.2f}x by median)\n"
+        text += "\n"
         
         # Compare operations
         comp_diff = results[alg1]["comparisons"][-1] - results[alg2]["comparisons"][-1]
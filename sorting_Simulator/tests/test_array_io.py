@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from array_io import load_array, save_array, sort_file
+from headless_sorting import HeadlessSortingAlgorithms
+from sorting_algorithms import PARTIAL_SORTS
+
+ALGORITHMS = sorted(name for name in dir(HeadlessSortingAlgorithms) if name.endswith("_sort")
+                    and name not in PARTIAL_SORTS)
+# Algorithms that only take integer keys
+INTEGER_ALGORITHMS = {"counting_sort", "radix_sort"}
+
+
+def _values(dtype: str) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    if dtype == "int64":
+        return rng.integers(-1000, 1000, 600, dtype=np.int64)
+    return np.round(rng.standard_normal(600), 2)
+
+
+@pytest.mark.parametrize("dtype", ["int64", "float64"])
+@pytest.mark.parametrize("extension", [".bin", ".npy"])
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_sort_file_keeps_values(tmp_path, algorithm, extension, dtype):
+    path = str(tmp_path / f"values{extension}")
+    values = _values(dtype)
+    save_array(path, values, dtype)
+
+    if dtype == "float64" and algorithm in INTEGER_ALGORITHMS:
+        with pytest.raises(TypeError):
+            sort_file(path, dtype, algorithm)
+        # A failed sort must leave the file as it was
+        assert np.array_equal(load_array(path, dtype), values)
+        return
+
+    sort_file(path, dtype, algorithm)
+    assert np.array_equal(load_array(path, dtype), np.sort(values))
+
+
+@pytest.mark.parametrize("dtype", ["int64", "float64"])
+def test_sort_file_default_algorithm(tmp_path, dtype):
+    path = str(tmp_path / "values.bin")
+    values = _values(dtype)
+    save_array(path, values, dtype)
+    sort_file(path, dtype)
+    assert np.array_equal(load_array(path, dtype), np.sort(values))
+
+
+@pytest.mark.parametrize("algorithm", sorted(PARTIAL_SORTS) + ["select_kth", "no_such_sort"])
+def test_sort_file_rejects_other_methods(tmp_path, algorithm):
+    path = str(tmp_path / "values.bin")
+    values = _values("int64")
+    save_array(path, values, "int64")
+    with pytest.raises(ValueError, match="Unknown sorting algorithm"):
+        sort_file(path, "int64", algorithm)
+    assert np.array_equal(load_array(path, "int64"), values)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from batch_sorting import UNKNOWN_COMPARISONS, sort_ragged, sort_rows, to_ragged
+from sorting_networks import NETWORKS
+
+
+@pytest.mark.parametrize("network", list(NETWORKS))
+@pytest.mark.parametrize("width", [1, 2, 5, 16, 17])
+def test_sort_rows_matches_np_sort(network, width):
+    rows = np.random.default_rng(width).integers(-50, 50, (40, width))
+    expected = np.sort(rows, axis=1)
+    sort_rows(rows, network)
+    np.testing.assert_array_equal(rows, expected)
+
+
+def test_sort_rows_keeps_nan():
+    rows = np.array([[3.0, np.nan, 1.0, 2.0], [4.0, 3.0, 2.0, 1.0]])
+    comparisons = sort_rows(rows)
+    np.testing.assert_array_equal(rows, [[1.0, 2.0, 3.0, np.nan], [1.0, 2.0, 3.0, 4.0]])
+    assert comparisons[0] == UNKNOWN_COMPARISONS
+    assert comparisons[1] > 0
+
+
+def test_sort_ragged_keeps_nan():
+    arrays = [np.array([3.0, np.nan, 1.0]), np.array([2.0, 1.0]), np.array([np.nan]), np.array([]),
+              np.arange(20.0)[::-1]]
+    values, offsets = to_ragged(arrays)
+    comparisons = sort_ragged(values, offsets)
+    for row, array in enumerate(arrays):
+        np.testing.assert_array_equal(values[offsets[row]:offsets[row + 1]], np.sort(array))
+    assert comparisons[0] == UNKNOWN_COMPARISONS
+    assert comparisons[1] == 1
@@ -0,0 +1,22 @@
+import random
+
+import pytest
+
+from benchmark import HEADLESS_SPEEDUP_FLOORS, measure_headless_speedup
+from sorting_algorithms import PARTIAL_SORTS, SortingAlgorithms
+
+# The floors are measured on 2000 elements, 500 for the O(n^2) sorts
+QUADRATIC_ALGORITHMS = {"bubble_sort", "selection_sort", "insertion_sort"}
+
+
+def test_every_instrumented_algorithm_has_a_speedup_floor():
+    assert set(HEADLESS_SPEEDUP_FLOORS) == {name for name in dir(SortingAlgorithms)
+                                            if name.endswith("_sort") and name not in PARTIAL_SORTS}
+
+
+@pytest.mark.parametrize("algorithm", sorted(HEADLESS_SPEEDUP_FLOORS))
+def test_headless_speedup_floor(algorithm):
+    rng = random.Random(0)
+    size = 500 if algorithm in QUADRATIC_ALGORITHMS else 2000
+    data = [rng.randint(0, 10 ** 6) for _ in range(size)]
+    assert measure_headless_speedup(algorithm, data) >= HEADLESS_SPEEDUP_FLOORS[algorithm]
@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from sort_trace import COMPARE, SortTrace, TracePlayer
+from sorting_algorithms import PARTIAL_SORTS, SortingAlgorithms
+from sorting_networks import get_network
+
+
+def _compare_layer_indices(algorithm: str, arr: list) -> list:
+    trace = SortTrace()
+    getattr(SortingAlgorithms(trace=trace), algorithm)(arr, {"comparisons": 0, "swaps": 0})
+    events = (trace.event(k) for k in range(len(trace)))
+    return [layer_index for op, _, _, layer_index in events if op == COMPARE]
+
+
+def test_network_comparators_carry_their_layer_index():
+    network = get_network("best", 8)
+    expected = [index for layer in network for index in range(1, len(layer) + 1)]
+    assert _compare_layer_indices("network_sort", [5, 3, 8, 1, 9, 2, 7, 4]) == expected
+
+
+def test_other_comparisons_have_no_layer_index():
+    assert set(_compare_layer_indices("selection_sort", [3, 2, 1, 0, 5, 4])) == {0}
+    assert set(_compare_layer_indices("bubble_sort", [0, 1, 2, 3])) == {0}
+
+
+@pytest.mark.parametrize("algorithm", sorted(name for name in dir(SortingAlgorithms)
+                                             if name.endswith("_sort") and name not in PARTIAL_SORTS))
+def test_replay_counts_match_stats(algorithm):
+    rng = random.Random(0)
+    values = [rng.randint(0, 500) for _ in range(300)]
+    trace = SortTrace()
+    stats = {"comparisons": 0, "swaps": 0}
+    getattr(SortingAlgorithms(trace=trace), algorithm)(list(values), stats)
+    player = TracePlayer(values, trace)
+    player.seek(len(trace))
+    assert (player.comparisons, player.swaps) == (stats["comparisons"], stats["swaps"])
+    assert player.array == sorted(values)
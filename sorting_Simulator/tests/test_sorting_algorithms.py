@@ -0,0 +1,59 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from headless_sorting import HeadlessSortingAlgorithms
+from sorting_algorithms import PARTIAL_SORTS, SortingAlgorithms, counting_strategy
+
+ALGORITHMS = sorted(name for name in dir(SortingAlgorithms) if name.endswith("_sort")
+                    and name not in PARTIAL_SORTS)
+# Algorithms that only take integer keys
+INTEGER_ALGORITHMS = {"counting_sort", "radix_sort"}
+
+
+def _stats() -> dict:
+    return {"comparisons": 0, "swaps": 0}
+
+
+@pytest.mark.parametrize("dtype", ["int64", "int32", "float64"])
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_sorts_numpy_arrays(algorithm, dtype):
+    if dtype == "float64" and algorithm in INTEGER_ALGORITHMS:
+        pytest.skip("integer keys only")
+    rng = np.random.default_rng(0)
+    if dtype == "float64":
+        values = np.round(rng.standard_normal(500), 2)
+    else:
+        values = rng.integers(-1000, 1000, 500).astype(dtype)
+    arr = values.copy()
+    getattr(SortingAlgorithms(), algorithm)(arr, _stats())
+    np.testing.assert_array_equal(arr, np.sort(values))
+
+
+def _counting_input(strategy: str, dtype: str) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    info = np.iinfo(dtype)
+    if strategy == "dense":
+        # A narrow range against the top of the dtype
+        return rng.integers(max(info.min, info.max - 1000), info.max, 500, endpoint=True).astype(dtype)
+    wide = rng.integers(info.min, info.max, 500 if strategy == "radix" else 8, endpoint=True).astype(dtype)
+    return wide if strategy == "radix" else rng.choice(wide, 500)
+
+
+@pytest.mark.parametrize("engine", [SortingAlgorithms, HeadlessSortingAlgorithms])
+@pytest.mark.parametrize("dtype", ["uint8", "int32"])
+@pytest.mark.parametrize("strategy", ["dense", "hash", "radix"])
+def test_counting_sort_numpy_range_does_not_overflow(strategy, dtype, engine):
+    values = _counting_input(strategy, dtype)
+    if strategy != "dense" and dtype == "uint8":
+        pytest.skip("a uint8 range is always dense")
+    assert counting_strategy(values.tolist(), int(values.min()), int(values.max())) == strategy
+    arr = values.copy()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        if engine is SortingAlgorithms:
+            engine().counting_sort(arr, _stats())
+        else:
+            engine().counting_sort(arr)
+    np.testing.assert_array_equal(arr, np.sort(values))
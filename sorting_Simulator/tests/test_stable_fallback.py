@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from headless_sorting import HeadlessSortingAlgorithms
+from parallel_sorting import PARALLEL_MIN_CHUNK, ParallelSortingAlgorithms, shutdown_pool
+from sorting_algorithms import SortingAlgorithms
+
+
+def test_fallback_rejects_options_it_cannot_honor():
+    with pytest.raises(TypeError, match="arity"):
+        SortingAlgorithms().heap_sort([3, 1, 2], {"comparisons": 0, "swaps": 0}, arity=4, stable=True)
+    with pytest.raises(TypeError, match="arity"):
+        HeadlessSortingAlgorithms().heap_sort([3, 1, 2], arity=4, stable=True)
+    with pytest.raises(TypeError, match="bucket_algorithm"):
+        ParallelSortingAlgorithms().parallel_sample_sort([3, 1, 2], bucket_algorithm="tim_sort", stable=True)
+    with pytest.raises(ValueError, match="chunk_algorithm"):
+        ParallelSortingAlgorithms().parallel_merge_sort([3, 1, 2], chunk_algorithm="heap_sort", stable=True)
+
+
+def test_parallel_fallback_stays_parallel():
+    values = np.random.default_rng(0).integers(0, 100, 2 * PARALLEL_MIN_CHUNK)
+    arr = values.tolist()
+    try:
+        counter = ParallelSortingAlgorithms().parallel_sample_sort(arr, workers=2, stable=True)
+    finally:
+        shutdown_pool()
+    assert arr == sorted(values.tolist())
+    assert counter.extra["workers"] == 2
+    assert "imbalance" not in counter.extra